@@ -86,6 +86,16 @@ setup(
         'six',
         'python-dateutil'
     ],
+    extras_require={
+        'orjson': ['orjson'],
+        'pandas': ['pandas'],
+        'yaml': ['PyYAML'],
+    },
+    entry_points={
+        'console_scripts': [
+            'tg-option-validate=tg_option_container.cli:main',
+        ],
+    },
     zip_safe=False,
     classifiers=[
         'Development Status :: 3 - Alpha',
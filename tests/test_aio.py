@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+
+from tg_option_container import InvalidOption, Option, OptionContainer
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+
+    try:
+        return loop.run_until_complete(coro)
+
+    finally:
+        loop.close()
+
+
+class Tracker(object):
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+    async def lookup(self, value):
+        self.running += 1
+        self.max_running = max(self.running, self.max_running)
+
+        await asyncio.sleep(0.01)
+
+        self.running -= 1
+
+        return value
+
+    async def exists(self, value):
+        await self.lookup(value)
+
+        return value != 'missing'
+
+
+def test_avalidate():
+    tracker = Tracker()
+
+    class Child(OptionContainer):
+        props = [
+            Option.string('host', 'some.where', clean=tracker.lookup),
+        ]
+
+    class Parent(OptionContainer):
+        props = [
+            Option.string('first', 'a', clean=tracker.lookup),
+            Option.string('second', 'b', validators=tracker.exists),
+            Option.integer('port', 8080),
+            Option.nested('child', Child),
+            Option.list('children', [], inner_type=Child),
+        ]
+
+    inst = run(Parent.avalidate(second='c', children=[{'host': 'x'}, {'host': 'y'}]))
+
+    assert isinstance(inst, Parent)
+    assert inst.as_dict() == {
+        'first': 'a',
+        'second': 'c',
+        'port': 8080,
+        'child': {'host': 'some.where'},
+        'children': [{'host': 'x'}, {'host': 'y'}],
+    }
+
+    # Coroutine cleaners and validators of all fields (including nested ones) must run concurrently
+    assert tracker.max_running == 5
+
+    # Nested containers must be marked as children
+    with pytest.raises(NotImplementedError):
+        inst['child'].set('host', 'other.place')
+
+
+def test_avalidate_errors():
+    tracker = Tracker()
+
+    class Child(OptionContainer):
+        props = [
+            Option.string('host', 'some.where', validators=tracker.exists),
+        ]
+
+    class Parent(OptionContainer):
+        props = [
+            Option.string('name', 'a', validators=tracker.exists),
+            Option.nested('child', Child),
+        ]
+
+    # Unknown keys are rejected
+    with pytest.raises(InvalidOption) as exc_info:
+        run(Parent.avalidate(nanny=1))
+
+    assert str(exc_info.value) == 'Invalid key nanny for Parent'
+
+    # Coroutine validators can reject values
+    with pytest.raises(InvalidOption) as exc_info:
+        run(Parent.avalidate(name='missing'))
+
+    assert str(exc_info.value) == 'Invalid value `missing` for option `name`'
+
+    # Sync validators still work
+    with pytest.raises(InvalidOption) as exc_info:
+        run(Parent.avalidate(name=1))
+
+    assert exc_info.value.format_params['key'] == 'name'
+
+    # Key path is added to nested errors
+    with pytest.raises(InvalidOption) as exc_info:
+        run(Parent.avalidate(child={'host': 'missing'}))
+
+    assert str(exc_info.value) == 'child:Invalid value `missing` for option `host`'
+
+
+def test_avalidate_rules():
+    from tg_option_container import Rule
+
+    class Range(OptionContainer):
+        props = [
+            Option.integer('low', 0),
+            Option.integer('high', 10),
+        ]
+
+        rules = [
+            Rule(['low', 'high'], lambda low, high: low <= high),
+        ]
+
+    assert run(Range.avalidate(low=5))['low'] == 5
+
+    with pytest.raises(InvalidOption):
+        run(Range.avalidate(low=50))
+
+
+def test_avalidate_metrics():
+    from tg_option_container import metrics
+
+    class Child(OptionContainer):
+        props = [
+            Option.integer('port', 1),
+        ]
+
+    class Parent(OptionContainer):
+        props = [
+            Option.nested('child', Child),
+        ]
+
+    registry = metrics.enable()
+
+    try:
+        run(Parent.avalidate(child={'port': 2}))
+
+        with pytest.raises(InvalidOption):
+            run(Parent.avalidate(child={'port': 'x'}))
+
+        snapshot = registry.snapshot()
+
+    finally:
+        metrics.disable()
+
+    assert snapshot['validations'] == {'child': 2, 'port': 2}
+    assert sorted(snapshot['failures']) == ['child', 'port']
+    assert snapshot['sets'] == {'Parent': 2, 'Child': 2}
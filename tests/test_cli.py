@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from tg_option_container import Option, OptionContainer
+from tg_option_container.cli import import_container, main, run
+
+
+class Limits(OptionContainer):
+    props = [
+        Option.integer('timeout', 30),
+    ]
+
+
+class Settings(OptionContainer):
+    props = [
+        Option.string('host', 'some.where'),
+        Option.integer('port', 8080),
+        Option.nested('limits', Limits),
+    ]
+
+
+@pytest.fixture
+def files(tmpdir):
+    jsonl = tmpdir.join('settings.jsonl')
+    jsonl.write('\n'.join([
+        json.dumps({'host': 'a'}),
+        json.dumps({'port': 'x'}),
+        '',
+        '{broken',
+        json.dumps({'limits': {'timeout': 'x'}}),
+        json.dumps([1]),
+    ]))
+
+    document = tmpdir.join('settings.json')
+    document.write(json.dumps([{'host': 'b'}, {'nanny': 1}, {'port': 1}]))
+
+    single = tmpdir.join('single.json')
+    single.write(json.dumps({'host': 'c'}))
+
+    return [str(jsonl), str(document), str(single)]
+
+
+def test_import_container():
+    assert import_container('tests.test_cli:Settings') is Settings
+
+    with pytest.raises(ValueError):
+        import_container('tests.test_cli')
+
+    with pytest.raises(AttributeError):
+        import_container('tests.test_cli:Nanny')
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_run(files, workers, capsys):
+    summary = run('tests.test_cli:Settings', files, workers=workers, chunk_size=2, max_errors=3)
+
+    assert summary['records'] == 9
+    assert summary['invalid'] == 5
+    assert summary['errors_by_option'] == {'port': 1, 'limits': 1, '<json>': 1, '<record>': 1, 'nanny': 1}
+
+    out = capsys.readouterr()[0]
+    lines = out.splitlines()
+
+    # Only the first errors are printed (in order)
+    assert lines[0].startswith('{0}:2: Expected type'.format(files[0]))
+    assert lines[1].startswith('{0}:4: '.format(files[0]))
+    assert lines[2] == '{0}:5: limits:Expected type {1} for option `timeout`, provided type is {2}.'.format(files[0], int, str)
+    assert lines[3].startswith('Validated 9 records in')
+    assert lines[3].endswith(', 5 invalid')
+
+
+def test_main(files, capsys):
+    assert main(['tests.test_cli:Settings', files[2], '-j', '1']) == 0
+    assert main(['tests.test_cli:Settings'] + files + ['--workers', '1', '--max-errors', '0']) == 1
+
+    out = capsys.readouterr()[0]
+    assert 'invalid' in out
+
+    with pytest.raises(SystemExit):
+        main(['tests.test_cli:Nanny', files[2]])
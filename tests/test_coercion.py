@@ -0,0 +1,131 @@
+import datetime
+
+import pytest
+
+from dateutil.tz import tzutc
+
+from tg_option_container import InvalidOption, Option, OptionContainer
+from tg_option_container.coercion import get_parser, parse_bool, parse_datetime
+
+
+class Limits(OptionContainer):
+    props = [
+        Option.integer('timeout', 30),
+    ]
+
+
+class Settings(OptionContainer):
+    coerce = True
+
+    props = [
+        Option.string('host', 'some.where'),
+        Option.integer('port', 8080, min_value=1),
+        Option.boolean('debug', False),
+        Option('ratio', 0.5, expected_type=float),
+        Option.iso8601('started', '2018-03-01T12:00:00Z'),
+        Option.list('hosts', [], inner_type=str),
+        Option.list('ports', [], inner_type=Option.integer('port', 0)),
+        Option.list('limits', [], inner_type=Limits),
+        Option.nested('main', Limits),
+        Option.string('level', 'info', choices=['info', 'debug']),
+    ]
+
+
+def test_coercion():
+    inst = Settings(
+        host='other.place', port='8000', debug='yes', ratio='0.25', started='2020-01-02T03:04:05+00:00',
+        hosts='a, b,c', ports='1,2', limits='[{"timeout": 1}]', main='{"timeout": 5}', level='debug',
+    )
+
+    assert inst['host'] == 'other.place'
+    assert inst['port'] == 8000
+    assert inst['debug'] is True
+    assert inst['ratio'] == 0.25
+    assert inst['started'] == datetime.datetime(2020, 1, 2, 3, 4, 5, tzinfo=tzutc())
+    assert inst['hosts'] == ['a', 'b', 'c']
+    assert inst['ports'] == [1, 2]
+    assert inst['limits'][0]['timeout'] == 1
+    assert inst['main']['timeout'] == 5
+    assert inst['level'] == 'debug'
+
+    # Values of other types are validated as usual
+    assert Settings(port=1, debug=False, hosts=[])['port'] == 1
+
+    inst.set('port', '9000')
+    assert inst['port'] == 9000
+
+    # Parsers are selected once per class
+    assert sorted(Settings._coercers.keys()) == ['debug', 'hosts', 'limits', 'main', 'port', 'ports', 'ratio', 'started']
+    assert Limits._coercers == {}
+
+
+def test_coercion_errors():
+    with pytest.raises(InvalidOption) as exc_info:
+        Settings(port='x')
+
+    assert str(exc_info.value) == "Cannot convert 'x' to {0} for option `port`.".format(int)
+
+    with pytest.raises(InvalidOption) as exc_info:
+        Settings(port='0')
+
+    assert exc_info.value.format_params['min_value'] == 1
+
+    with pytest.raises(InvalidOption) as exc_info:
+        Settings(ports='1,x')
+
+    assert exc_info.value.format_params['key'] == 'ports'
+
+    with pytest.raises(InvalidOption):
+        Settings(debug='maybe')
+
+    with pytest.raises(InvalidOption):
+        Settings(main='{')
+
+    with pytest.raises(InvalidOption):
+        Settings(started='not a date')
+
+    # Containers without coerce validate strings as before
+    with pytest.raises(InvalidOption):
+        Limits(timeout='1')
+
+
+def test_coercion_columnar():
+    class CoercedLimits(OptionContainer):
+        coerce = True
+
+        props = [
+            Option.integer('timeout', 30),
+            Option.boolean('enabled', True),
+        ]
+
+    class Parent(OptionContainer):
+        props = [
+            Option.list('limits', [], inner_type=CoercedLimits),
+            Option.list('columns', [], inner_type=CoercedLimits, columnar=True),
+        ]
+
+    rows = [{'timeout': '5', 'enabled': 'no'}, {'timeout': 6}]
+    inst = Parent(limits=rows, columns=rows)
+
+    assert [x.as_dict() for x in inst['limits']] == inst['columns'].as_list()
+    assert list(inst['columns'].column('timeout')) == [5, 6]
+    assert inst['columns'][0]['enabled'] is False
+
+    with pytest.raises(InvalidOption) as exc_info:
+        Parent(columns=[{'timeout': '1'}, {'timeout': 'x'}])
+
+    assert str(exc_info.value) == "columns[1]:Cannot convert 'x' to {0} for option `timeout`.".format(int)
+
+
+def test_parsers():
+    assert parse_bool(' TRUE ') is True
+    assert parse_bool('off') is False
+    assert parse_bool('') is False
+
+    assert parse_datetime('2016-05-09 16:00:00 +02:00').utcoffset() == datetime.timedelta(hours=2)
+    assert parse_datetime('2016-05-09T16:00:00Z').utcoffset() == datetime.timedelta(0)
+
+    assert get_parser(Option.string('a', '')) is None
+    assert get_parser(Option('a', None)) is None
+    assert get_parser(Option.list('a', [], inner_type=int))('') == []
+    assert get_parser(Option.list('a', [], inner_type=int))('[1, 2]') == [1, 2]
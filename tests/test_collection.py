@@ -0,0 +1,113 @@
+import datetime
+
+import pytest
+import pytz
+
+from tg_option_container import ContainerCollection, InvalidOption, Option, OptionContainer
+
+
+class Limits(OptionContainer):
+    props = [
+        Option.integer('timeout', 30),
+    ]
+
+
+class Tenant(OptionContainer):
+    props = [
+        Option.string('name', None),
+        Option.integer('verbosity', 0, choices=[0, 1, 2, 3]),
+        Option.iso8601('created', '2016-01-01T00:00:00Z'),
+        Option.nested('limits', Limits),
+    ]
+
+
+def date(year, month=1, day=1):
+    return datetime.datetime(year, month, day, tzinfo=pytz.UTC)
+
+
+@pytest.fixture
+def tenants():
+    return [
+        Tenant(name='a', verbosity=3, created=date(2016, 2)),
+        Tenant(name='b', verbosity=1, created=date(2016, 5), limits={'timeout': 10}),
+        Tenant(name='c', verbosity=3, created=date(2017, 1), limits={'timeout': 60}),
+        Tenant(name='d', verbosity=0, created=date(2015, 1)),
+    ]
+
+
+@pytest.mark.parametrize('indexes', [
+    None,
+    ['name', 'verbosity', 'limits__timeout'],
+    {'verbosity': 'sorted', 'created': 'sorted', 'limits__timeout': 'sorted'},
+])
+def test_filter(tenants, indexes):
+    collection = ContainerCollection(Tenant, indexes=indexes, items=tenants)
+    a, b, c, d = tenants
+
+    assert len(collection) == 4
+    assert list(collection) == tenants
+    assert a in collection
+
+    assert collection.filter() == tenants
+    assert collection.filter(verbosity=3) == [a, c]
+    assert collection.filter(verbosity__exact=3, name='c') == [c]
+    assert collection.filter(verbosity__in=[0, 1]) == [b, d]
+    assert collection.filter(verbosity__gt=1) == [a, c]
+    assert collection.filter(verbosity__gte=1) == [a, b, c]
+    assert collection.filter(verbosity__lt=1) == [d]
+    assert collection.filter(verbosity__lte=1) == [b, d]
+    assert collection.filter(verbosity__range=(1, 2)) == [b]
+    assert collection.filter(verbosity=2) == []
+    assert collection.count(verbosity=3) == 2
+
+    # Nested fields
+    assert collection.filter(limits__timeout=30) == [a, d]
+    assert collection.filter(limits__timeout__gte=30, verbosity=3) == [a, c]
+
+    # Date ranges
+    assert collection.filter(created__range=(date(2016), date(2016, 12, 31))) == [a, b]
+    assert collection.filter(created__lt=date(2016)) == [d]
+
+    # Removing
+    collection.remove(a)
+    assert a not in collection
+    assert collection.filter(verbosity=3) == [c]
+    assert collection.filter(created__gte=date(2016)) == [b, c]
+
+    with pytest.raises(KeyError):
+        collection.remove(a)
+
+    # Modified containers must be reindexed
+    b.set('verbosity', 3)
+    collection.reindex(b)
+    assert collection.filter(verbosity=3) == [b, c]
+    assert collection.filter(verbosity__lt=3) == [d]
+
+
+def test_indexes(tenants):
+    collection = ContainerCollection(Tenant, items=tenants)
+
+    # Indexes can be added later
+    collection.add_index('verbosity', 'sorted')
+    assert collection.filter(verbosity__gte=3) == [tenants[0], tenants[2]]
+
+    # Adding the same container twice is a no-op
+    collection.add(tenants[0])
+    assert len(collection) == 4
+
+    # Invalid field names
+    with pytest.raises(InvalidOption):
+        collection.add_index('nanny')
+
+    with pytest.raises(InvalidOption):
+        collection.add_index('name__foo')
+
+    with pytest.raises(InvalidOption):
+        collection.filter(limits__nanny=1)
+
+    with pytest.raises(AssertionError):
+        collection.add_index('name', 'btree')
+
+    # Only instances of container_cls can be added
+    with pytest.raises(InvalidOption):
+        collection.add(Limits())
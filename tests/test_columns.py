@@ -0,0 +1,172 @@
+import copy
+import json
+import pickle
+
+from array import array
+
+import pytest
+
+from tg_option_container import InvalidOption, Option, OptionContainer
+from tg_option_container.columns import ColumnarListValidator, ContainerColumns, ContainerRow
+
+
+class Target(OptionContainer):
+    props = [
+        Option.string('host', 'some.where'),
+    ]
+
+
+class Rule(OptionContainer):
+    props = [
+        Option.integer('priority', 0, min_value=0),
+        Option('weight', 1.0, expected_type=float),
+        Option.string('action', 'allow', choices=['allow', 'deny']),
+        Option.boolean('enabled', True),
+        Option.nested('target', Target),
+    ]
+
+
+class Firewall(OptionContainer):
+    props = [
+        Option.list('rules', [], inner_type=Rule, columnar=True),
+    ]
+
+
+def test_columnar_list():
+    assert isinstance(Firewall.defs['rules'].validators[0], ColumnarListValidator)
+
+    inst = Firewall(rules=[
+        {'priority': 1, 'action': 'deny'},
+        {'priority': 2, 'weight': 0.5, 'target': {'host': 'other.place'}},
+        Rule(priority=3, enabled=False),
+    ])
+
+    rules = inst['rules']
+
+    assert isinstance(rules, ContainerColumns)
+    assert len(rules) == 3
+
+    # Numeric columns are stored in arrays
+    assert rules.column('priority') == array('q', [1, 2, 3])
+    assert rules.column('weight') == array('d', [1.0, 0.5, 1.0])
+    assert rules.column('enabled') == [True, True, False]
+
+    # Items are returned as row proxies
+    row = rules[1]
+    assert isinstance(row, ContainerRow)
+    assert row['priority'] == 2
+    assert row['target']['host'] == 'other.place'
+    assert rules[-1]['enabled'] is False
+    assert [x['action'] for x in rules] == ['deny', 'allow', 'allow']
+    assert [x['priority'] for x in rules[1:]] == [2, 3]
+
+    with pytest.raises(IndexError):
+        rules[3]
+
+    with pytest.raises(KeyError):
+        row['nanny']
+
+    assert row.to_container().as_dict() == Rule(priority=2, weight=0.5, target={'host': 'other.place'}).as_dict()
+
+    # Nested containers are marked as children
+    with pytest.raises(NotImplementedError):
+        row['target'].set('host', 'x')
+
+    # as_dict, representation, json and views work
+    assert inst.as_dict()['rules'][0] == {'priority': 1, 'weight': 1.0, 'action': 'deny', 'enabled': True, 'target': {'host': 'some.where'}}
+    assert 'priority: 2' in str(inst)
+    assert json.loads(inst.to_json(backend='json').decode('utf-8')) == inst.as_dict()
+    assert inst.as_mapping()['rules'][1]['target']['host'] == 'other.place'
+
+    # Copying, pickling and trusted construction
+    assert copy.deepcopy(inst)['rules'] == rules
+    assert pickle.loads(pickle.dumps(rules)) == rules
+    assert Firewall.from_trusted(inst.as_dict())['rules'] == rules
+    assert Firewall(rules=rules)['rules'] is rules
+
+    # Default is an empty column store
+    assert len(Firewall()['rules']) == 0
+
+
+def test_columnar_list_validation():
+    with pytest.raises(InvalidOption) as exc_info:
+        Firewall(rules=[{'priority': 1}, {'priority': 'x'}])
+
+    assert str(exc_info.value) == 'rules[1]:Expected type {0} for option `priority`, provided type is {1}.'.format(int, str)
+
+    with pytest.raises(InvalidOption) as exc_info:
+        Firewall(rules=[{'priority': 1}, {'priority': -1}])
+
+    assert str(exc_info.value) == 'rules[1]:Ensure value for option `priority` is greater than or equal to 0'
+
+    with pytest.raises(InvalidOption) as exc_info:
+        Firewall(rules=[{'action': 'allow'}, {'action': 'deny'}, {'action': 'x'}])
+
+    assert exc_info.value.format_params['index'] == 2
+
+    with pytest.raises(InvalidOption) as exc_info:
+        Firewall(rules=[{'target': {'host': 1}}])
+
+    assert str(exc_info.value).startswith('rules[0]:target:')
+
+    with pytest.raises(InvalidOption) as exc_info:
+        Firewall(rules=[{'nanny': 1}])
+
+    assert str(exc_info.value) == 'rules[0]:Invalid key nanny for Rule'
+
+    with pytest.raises(InvalidOption):
+        Firewall(rules='x')
+
+    with pytest.raises(AssertionError):
+        Option.list('rules', [], inner_type=int, columnar=True)
+
+
+def test_columnar_list_rules():
+    from tg_option_container.types import Rule as ContainerRule
+
+    class Range(OptionContainer):
+        props = [
+            Option.integer('low', 0),
+            Option.integer('high', 10),
+        ]
+
+        rules = [
+            ContainerRule(['low', 'high'], lambda low, high: low <= high),
+        ]
+
+    class Ranges(OptionContainer):
+        props = [
+            Option.list('ranges', [], inner_type=Range, columnar=True),
+        ]
+
+    assert len(Ranges(ranges=[{'low': 1}, {'high': 20}])['ranges']) == 2
+
+    with pytest.raises(InvalidOption) as exc_info:
+        Ranges(ranges=[{'low': 1}, {'low': 20}])
+
+    assert str(exc_info.value) == 'ranges[1]:Values of low, high are not valid together'
+
+
+def test_columnar_list_defaults_are_cleaned_once():
+    class Item(OptionContainer):
+        props = [
+            Option.integer('x', 1, clean=lambda value: value + 1),
+            Option.integer('y', 5),
+        ]
+
+    class Items(OptionContainer):
+        props = [
+            Option.list('items', [], inner_type=Item, columnar=True),
+        ]
+
+    assert Item()['x'] == 2
+
+    inst = Items(items=[{'y': 1}, {'x': 5}])
+
+    # Default cells are already cleaned, provided cells are cleaned once
+    assert list(inst['items'].column('x')) == [2, 6]
+    assert Items.from_trusted(inst.as_dict())['items'] == inst['items']
+    assert list(Items(items=[{}, {}])['items'].column('x')) == [2, 2]
+
+    with pytest.raises(InvalidOption):
+        Items(items=[{}, {'y': 'x'}])
@@ -0,0 +1,166 @@
+import datetime
+
+import pytest
+import pytz
+
+from tg_option_container import InvalidOption, Option, OptionContainer
+
+
+pd = pytest.importorskip('pandas')
+
+
+class Limits(OptionContainer):
+    props = [
+        Option.integer('timeout', 30),
+    ]
+
+
+class Event(OptionContainer):
+    props = [
+        Option.string('name', None),
+        Option.integer('level', 0, min_value=0, max_value=5),
+        Option.string('kind', 'info', choices=['info', 'error']),
+        Option.boolean('handled', False),
+        Option.iso8601('created', '2016-01-01T00:00:00Z'),
+        Option.nested('limits', Limits),
+    ]
+
+
+def test_validate_frame():
+    frame = pd.DataFrame({
+        'name': ['a', 'b', 'c', None],
+        'level': [1, 2, 7, 3],
+        'kind': ['info', 'x', 'error', 'info'],
+        'created': ['2016-05-09T16:00:00Z', '2016-05-09 16:00:00 +03:00', '2016-05-09T16:00:00Z', 'not a date'],
+    }, index=[10, 11, 12, 13])
+
+    result = Event.validate_frame(frame)
+
+    assert not result
+    assert list(result.invalid) == [False, True, True, True]
+    assert list(result.valid) == [True, False, False, False]
+
+    errors = sorted([(x['row'], x['option']) for x in result.errors])
+    assert errors == [(11, 'kind'), (12, 'level'), (13, 'created'), (13, 'name')]
+
+    messages = dict([((x['row'], x['option']), x['error']) for x in result.errors])
+    assert messages[(12, 'level')] == 'Ensure value for option `level` is less than or equal to 5'
+
+    # Valid rows construct valid containers
+    for row in frame[result.valid].to_dict('records'):
+        Event(**row)
+
+    # Typed columns
+    frame = pd.DataFrame({
+        'name': pd.Series(['a', 'b'], dtype='string'),
+        'level': pd.Series([1, 2], dtype='int64'),
+        'handled': pd.Series([True, False]),
+        'created': pd.Series([datetime.datetime(2016, 1, 1, tzinfo=pytz.UTC)] * 2),
+        'limits': [{'timeout': 1}, {'timeout': 'x'}],
+    })
+
+    result = Event.validate_frame(frame)
+    assert list(result.invalid) == [False, True]
+    assert [x['option'] for x in result.errors] == ['limits']
+
+    # Wrong dtypes
+    result = Event.validate_frame(pd.DataFrame({'name': ['a'], 'level': [1.5], 'handled': [1]}))
+    assert sorted([x['option'] for x in result.errors]) == ['handled', 'level']
+
+    # Missing columns with invalid defaults
+    result = Event.validate_frame(pd.DataFrame({'level': [1, 2]}))
+    assert list(result.invalid) == [True, True]
+    assert [x['option'] for x in result.errors] == ['name', 'name']
+
+    # Unknown columns
+    with pytest.raises(InvalidOption):
+        Event.validate_frame(pd.DataFrame({'nanny': [1]}))
+
+
+def test_validate_frame_duplicate_index():
+    frame = pd.DataFrame({'name': ['a', 'b', 'c'], 'level': [1, 7, 2]}, index=[0, 0, 1])
+    result = Event.validate_frame(frame)
+
+    # Only the invalid row is flagged, errors report its label
+    assert list(result.invalid) == [False, True, False]
+    assert [(x['row'], x['option']) for x in result.errors] == [(0, 'level')]
+
+
+def test_validate_frame_rules():
+    from tg_option_container import Rule
+
+    class Range(OptionContainer):
+        props = [
+            Option.integer('lo', 0),
+            Option.integer('hi', 10),
+            Option.string('name', 'x'),
+        ]
+
+        rules = [
+            Rule(['lo', 'hi'], lambda lo, hi: lo <= hi),
+        ]
+
+    frame = pd.DataFrame({
+        'lo': [1, 50, 50, 'x'],
+        'hi': [5, 10, 60, 5],
+    }, index=['a', 'b', 'c', 'd'])
+
+    result = Range.validate_frame(frame)
+
+    assert list(result.invalid) == [False, True, False, True]
+    assert [(x['row'], x['option']) for x in result.errors] == [('d', 'lo'), ('b', 'lo, hi')]
+    assert result.errors[1]['error'] == 'Values of lo, hi are not valid together'
+
+    with pytest.raises(InvalidOption):
+        Range(lo=50, hi=10)
+
+    # Defaults are used for missing columns
+    result = Range.validate_frame(pd.DataFrame({'lo': [5, 20]}))
+    assert list(result.invalid) == [False, True]
+
+
+def test_validate_frame_coercion():
+    class Coerced(OptionContainer):
+        coerce = True
+
+        props = [
+            Option.integer('level', 0, max_value=5),
+            Option.boolean('handled', False),
+        ]
+
+    frame = pd.DataFrame({'level': ['1', '7', 'x'], 'handled': ['yes', 'no', 'no']})
+    result = Coerced.validate_frame(frame)
+
+    assert list(result.invalid) == [False, True, True]
+    assert [x['option'] for x in result.errors] == ['level', 'level']
+
+    for row in frame[result.valid].to_dict('records'):
+        Coerced(**row)
+
+
+def test_to_frame():
+    containers = [Event(name='a'), Event(name='b', level=2, limits={'timeout': 1})]
+
+    frame = Event.to_frame(containers)
+
+    assert list(frame.columns) == list(Event.defs.keys())
+    assert list(frame['name']) == ['a', 'b']
+    assert list(frame['level']) == [0, 2]
+    assert list(frame['limits']) == [{'timeout': 30}, {'timeout': 1}]
+
+    # Round trip
+    assert Event.validate_frame(frame)
+    assert [Event(**row).as_dict() for row in frame.to_dict('records')] == [x.as_dict() for x in containers]
+
+
+def test_to_frame_columns():
+    class Log(OptionContainer):
+        props = [
+            Option.list('events', [], inner_type=Event, columnar=True),
+        ]
+
+    inst = Log(events=[{'name': 'a', 'level': 1}, {'name': 'b', 'level': 2}])
+
+    frame = Event.to_frame(inst['events'])
+    assert list(frame['level']) == [1, 2]
+    assert list(frame['name']) == ['a', 'b']
@@ -0,0 +1,125 @@
+import threading
+import time
+
+import pytest
+
+from tg_option_container import InvalidOption, Option, OptionContainer, metrics
+
+
+class Child(OptionContainer):
+    props = [
+        Option.string('host', 'some.where'),
+    ]
+
+
+class Settings(OptionContainer):
+    props = [
+        Option.integer('port', 8080, min_value=1),
+        Option.nested('child', Child),
+    ]
+
+
+@pytest.fixture
+def registry():
+    registry = metrics.enable()
+
+    yield registry
+
+    metrics.disable()
+
+
+def test_metrics(registry):
+    inst = Settings(port=1)
+
+    with pytest.raises(InvalidOption):
+        Settings(port=0)
+
+    with pytest.raises(InvalidOption):
+        inst.set('port', 'x')
+
+    inst.set(('child', 'host'), 'other.place')
+
+    snapshot = registry.snapshot()
+
+    # Pre-validated defaults are not validated again
+    assert snapshot['validations'] == {'port': 3, 'host': 1}
+    assert snapshot['failures'] == {
+        'port': {
+            'Ensure value for option `{key}` is greater than or equal to {min_value}': 1,
+            '{prepend}Expected type {expected_type} for option `{key}`, provided type is {value_type}.{append}': 1,
+        },
+    }
+    assert snapshot['sets'] == {'Settings': 3, 'Child': 1}
+    assert snapshot['seconds']['Settings'] > 0
+
+    text = registry.to_prometheus()
+
+    assert '# TYPE tg_option_container_validations_total counter\n' in text
+    assert 'tg_option_container_validations_total{option="port"} 3\n' in text
+    assert ('tg_option_container_failures_total{error="Ensure value for option `{key}` is greater than or equal to {min_value}",'
+            'option="port"} 1\n') in text
+    assert 'tg_option_container_sets_total{container="Child"} 1\n' in text
+    assert 'tg_option_container_set_seconds_total{container="Settings"} ' in text
+
+    registry.reset()
+    assert registry.snapshot()['validations'] == {}
+
+
+def test_metrics_self_time(registry):
+    def slow(value):
+        time.sleep(0.05)
+
+        return value
+
+    class SlowChild(OptionContainer):
+        props = [
+            Option.string('host', 'some.where', clean=slow),
+        ]
+
+    class Parent(OptionContainer):
+        props = [
+            Option.nested('child', SlowChild),
+        ]
+
+    registry.reset()
+    Parent(child={'host': 'other.place'})
+
+    seconds = registry.snapshot()['seconds']
+
+    # Time spent in nested containers is not counted for the parent
+    assert seconds['SlowChild'] >= 0.05
+    assert seconds['Parent'] < 0.05
+
+
+def test_metrics_threads(registry):
+    def work():
+        for _ in range(100):
+            Settings(port=1)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    # Counters of all threads are merged
+    assert registry.snapshot()['validations'] == {'port': 400}
+    assert registry.snapshot()['sets'] == {'Settings': 400}
+
+
+def test_metrics_disabled():
+    assert metrics.registry is None
+
+    registry = metrics.MetricsRegistry()
+    Settings(port=1)
+
+    assert registry.snapshot()['validations'] == {}
+
+
+def test_prometheus_escaping():
+    registry = metrics.MetricsRegistry()
+    registry.record_option('a"b', ValueError('x'))
+
+    assert 'tg_option_container_failures_total{error="ValueError",option="a\\"b"} 1' in registry.to_prometheus()
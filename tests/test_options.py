@@ -1,14 +1,26 @@
+import copy
 import datetime
 import decimal
+import io
+import pickle
+import sys
+import threading
 
 from gettext import gettext as _
 
 import pytest
 import pytz
 
-from tg_option_container import InvalidOption, Option, OptionContainer
-from tg_option_container.types import (ChoicesValidator, MaxValueValidator, MinValueValidator, TypeValidator, Undefined, clean_datetime,
-                                       clean_option_container)
+from tg_option_container import InvalidOption, Option, OptionContainer, Rule
+from tg_option_container.types import (AdaptiveOrder, BooleanValidator, ChoicesValidator, IntegerValidator, MaxValueValidator, MinValueValidator,
+                                       RangeValidator, StringValidator, TypeValidator, Undefined, ValidationCache, clean_datetime,
+                                       clean_option_container, freeze_value)
+
+try:
+    from collections.abc import Mapping, Sequence
+
+except ImportError:
+    from collections import Mapping, Sequence
 
 try:
     from unittest.mock import Mock, patch
@@ -17,6 +29,20 @@ except ImportError:
     from mock import Mock, patch
 
 
+class PickleChild(OptionContainer):
+    props = [
+        Option.string('host', 'some.where'),
+    ]
+
+
+class PickleParent(OptionContainer):
+    props = [
+        Option.nested('child', PickleChild),
+        Option.list('children', [], inner_type=PickleChild),
+        Option.integer('port', 8080),
+    ]
+
+
 def assert_datetime_equal(a, b):
     aa = a.astimezone(pytz.utc)
     bb = b.astimezone(pytz.utc)
@@ -259,6 +285,70 @@ def test_max_value_validator():
     assert str(validator) == '<MaxValueValidator max_value=0>'
 
 
+def test_range_validator():
+    validator = RangeValidator(0, 10)
+
+    assert validator(0) is True
+    assert validator(10) is True
+
+    with pytest.raises(InvalidOption) as exc_info:
+        validator(-1)
+
+    assert exc_info.value.format_params['min_value'] == 0
+
+    with pytest.raises(InvalidOption) as exc_info:
+        validator(11)
+
+    assert exc_info.value.format_params['max_value'] == 10
+    assert str(validator) == '<RangeValidator min_value=0 max_value=10>'
+
+    # Options with both bounds use a single RangeValidator
+    assert [type(x) for x in Option.integer('a', 0, min_value=0, max_value=10).validators] == [IntegerValidator, RangeValidator]
+    assert [type(x) for x in Option.integer('a', 0, min_value=0).validators] == [IntegerValidator, MinValueValidator]
+    assert [type(x) for x in Option.integer('a', 0, max_value=0).validators] == [IntegerValidator, MaxValueValidator]
+
+
+def test_builtin_type_validators():
+    assert isinstance(Option.integer('a', 0).validators[0], IntegerValidator)
+    assert isinstance(Option.boolean('a', False).validators[0], BooleanValidator)
+    assert isinstance(Option.string('a', '').validators[0], StringValidator)
+    assert type(Option.integer('a', 0, expected_type=(int, float)).validators[0]) is TypeValidator
+
+    validator = IntegerValidator()
+    assert validator(1) is True
+    assert validator(2 ** 100) is True
+    assert validator.accepts(1) and not validator.accepts(True) and not validator.accepts(1.0)
+
+    # bool is a subclass of int but not accepted as one
+    for value in [True, False, 1.0, '1', None]:
+        with pytest.raises(InvalidOption) as exc_info:
+            validator(value)
+
+        assert exc_info.value.format_params['expected_type'] == int
+        assert exc_info.value.format_params['value_type'] == type(value)
+
+    validator = BooleanValidator()
+    assert validator(True) is True
+    assert validator(False) is True
+
+    for value in [0, 1, None, 'true']:
+        with pytest.raises(InvalidOption):
+            validator(value)
+
+    class Text(str):
+        pass
+
+    validator = StringValidator(prepend='john', append='dorian')
+    assert validator('a') is True
+    assert validator(Text('a')) is True
+
+    with pytest.raises(InvalidOption) as exc_info:
+        validator(1)
+
+    exc_info.value.add_params(key='a')
+    assert str(exc_info.value) == 'john Expected type {0} for option `a`, provided type is {1}. dorian'.format(str, int)
+
+
 def test_choices_validator():
     validator = ChoicesValidator(('a', 'b'))
 
@@ -660,3 +750,1038 @@ def test_nested_containers():
         inst.set(('name', 'foo'), 'yolo')
 
     assert str(exc_info.value) == _('Key {key} for {identifier} is not a nested container').format(key='name', identifier=inst.identifier)
+
+
+def test_from_trusted():
+    created = datetime.datetime(2016, 5, 9, 16, 0, 0, tzinfo=pytz.UTC)
+
+    class Child(OptionContainer):
+        props = [
+            Option.string('host', 'some.where'),
+            Option.iso8601('created', '2016-05-09T16:00:00Z'),
+        ]
+
+    class Parent(OptionContainer):
+        props = [
+            Option.nested('child', Child),
+            Option.list('children', [], inner_type=Child),
+            Option.integer('port', 8080),
+        ]
+
+    source = Parent(child={'host': 'other.place', 'created': created}, children=[{'host': 'a'}, {'host': 'b'}])
+
+    # Constructing from as_dict output must result in an equal container
+    with patch('tg_option_container.types.Option.validate') as fn_mock:
+        inst = Parent.from_trusted(source.as_dict())
+
+        # Cleaners and validators must not be executed for trusted data
+        assert not fn_mock.called
+
+    assert inst.as_dict() == source.as_dict()
+    assert isinstance(inst['child'], Child)
+    assert all([isinstance(x, Child) for x in inst['children']])
+    assert inst['child']['created'] is created
+
+    # Nested containers must be marked as children
+    with pytest.raises(NotImplementedError):
+        inst['child'].set('host', 'other.place')
+
+    inst.set(('child', 'host'), 'last.place')
+    assert inst['child']['host'] == 'last.place'
+
+    # Missing keys are set to defaults
+    inst = Parent.from_trusted({'port': 80})
+    assert inst['port'] == 80
+    assert inst['child']['host'] == 'some.where'
+    assert inst['children'] == []
+
+    # Unknown keys are still rejected
+    with pytest.raises(InvalidOption) as exc_info:
+        Parent.from_trusted({'nanny': 1})
+
+    assert str(exc_info.value) == str(_('Invalid key {key} for {identifier}')).format(key='nanny', identifier='Parent')
+
+    with pytest.raises(InvalidOption):
+        Parent.from_trusted({'child': {'nanny': 1}})
+
+
+def test_pickle_and_copy():
+    inst = PickleParent(child={'host': 'other.place'}, children=[{'host': 'a'}], port=80)
+
+    # Only the class reference and values should be serialized
+    state = inst.__getstate__()
+    assert state == {'values': inst._values}
+    assert inst['child'].__getstate__() == {'values': inst['child']._values, '_parent': True}
+
+    for restored in [pickle.loads(pickle.dumps(inst)), copy.deepcopy(inst)]:
+        assert isinstance(restored, PickleParent)
+        assert restored.as_dict() == inst.as_dict()
+        assert restored.definitions is PickleParent.defs
+        assert restored['child'] is not inst['child']
+        assert restored['children'][0] is not inst['children'][0]
+
+        # Nested containers must still be marked as children
+        with pytest.raises(NotImplementedError):
+            restored['child'].set('host', 'other.place')
+
+        restored.set(('child', 'host'), 'last.place')
+        assert restored['child']['host'] == 'last.place'
+        assert inst['child']['host'] == 'other.place'
+
+    # Shallow copies share nested containers until they are modified
+    shallow = copy.copy(inst)
+    assert shallow._values is not inst._values
+    assert shallow['child'] is inst['child']
+
+    shallow.set(('child', 'host'), 'last.place')
+    assert shallow['child']['host'] == 'last.place'
+    assert inst['child']['host'] == 'other.place'
+
+
+def test_clone():
+    class Leaf(OptionContainer):
+        props = [
+            Option.string('host', 'some.where'),
+        ]
+
+    class Branch(OptionContainer):
+        props = [
+            Option.nested('left', Leaf),
+            Option.nested('right', Leaf),
+        ]
+
+    class Root(OptionContainer):
+        props = [
+            Option.nested('branch', Branch),
+            Option.nested('other', Branch),
+            Option.integer('port', 8080),
+        ]
+
+    inst = Root()
+    clone = inst.clone({('branch', 'left', 'host'): 'other.place', 'port': 80})
+
+    assert clone['branch']['left']['host'] == 'other.place'
+    assert clone['port'] == 80
+    assert inst['branch']['left']['host'] == 'some.where'
+    assert inst['port'] == 8080
+
+    # Only containers on the modified path are copied
+    assert clone['branch'] is not inst['branch']
+    assert clone['branch']['left'] is not inst['branch']['left']
+    assert clone['branch']['right'] is inst['branch']['right']
+    assert clone['other'] is inst['other']
+
+    # Modifying either tree must not leak into the other one
+    inst.set(('other', 'right', 'host'), 'magic.avenue')
+    assert inst['other']['right']['host'] == 'magic.avenue'
+    assert clone['other']['right']['host'] == 'some.where'
+
+    clone.set(('branch', 'right', 'host'), 'last.place')
+    assert clone['branch']['right']['host'] == 'last.place'
+    assert inst['branch']['right']['host'] == 'some.where'
+
+    # Validation is still executed for changed values
+    with pytest.raises(InvalidOption):
+        inst.clone({('branch', 'left', 'host'): 1})
+
+    assert inst['branch']['left']['host'] == 'some.where'
+
+
+def test_update():
+    class A(OptionContainer):
+        props = [
+            Option.integer('low', 0),
+            Option.integer('high', 10),
+            Option.nested('child', PickleChild),
+        ]
+
+    inst = A()
+    inst.update({'low': 1, 'high': 5, ('child', 'host'): 'other.place'})
+    assert inst.as_dict() == {'low': 1, 'high': 5, 'child': {'host': 'other.place'}}
+
+    # Either all or none of the changes are applied
+    with pytest.raises(InvalidOption):
+        inst.update({'low': 2, 'high': 'x'})
+
+    assert inst['low'] == 1
+
+    # Update is not allowed on nested containers
+    with pytest.raises(NotImplementedError):
+        inst['child'].update({'host': 'last.place'})
+
+
+def test_thread_safe():
+    class Settings(OptionContainer):
+        thread_safe = True
+
+        props = [
+            Option.integer('low', 0),
+            Option.integer('high', 0),
+            Option.nested('child', PickleChild),
+        ]
+
+    inst = Settings()
+
+    # Values are never modified in place
+    values = inst._values
+    child = inst['child']
+
+    inst.set('low', 1)
+    inst.set(('child', 'host'), 'other.place')
+
+    assert inst['low'] == 1
+    assert inst['child']['host'] == 'other.place'
+    assert values['low'] == 0
+    assert child['host'] == 'some.where'
+
+    # Setting values on nested containers is still not allowed
+    with pytest.raises(NotImplementedError):
+        inst['child'].set('host', 'last.place')
+
+    # Snapshots share the values
+    snapshot = inst.snapshot()
+    assert snapshot._values is inst._values
+
+    inst.set('low', 2)
+    assert snapshot['low'] == 1
+
+    # The lock is not part of the state
+    assert inst.__getstate__() == {'values': inst._values}
+
+    # Readers always see a consistent view of values while another thread writes
+    errors = []
+    done = threading.Event()
+
+    def writer():
+        for i in range(500):
+            inst.update({'low': i, 'high': i, ('child', 'host'): str(i)})
+
+        done.set()
+
+    def reader():
+        while not done.is_set():
+            view = inst.snapshot()
+
+            if not (view['low'] == view['high'] and view['child']['host'] == str(view['low'])):
+                errors.append(view.as_dict())
+
+    inst.update({'low': 0, 'high': 0, ('child', 'host'): '0'})
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(4)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert inst['low'] == inst['high'] == 499
+
+
+def test_freeze_value():
+    assert freeze_value({'a': [1, 2], 'b': {'c': 'd'}}) == freeze_value({'b': {'c': 'd'}, 'a': [1, 2]})
+    assert freeze_value({'a': [1, 2]}) != freeze_value({'a': [2, 1]})
+
+    # Equal values of different types must not collide
+    assert freeze_value(1) != freeze_value(True)
+    assert freeze_value(1) != freeze_value(1.0)
+
+    with pytest.raises(TypeError):
+        freeze_value({'a': {1, 2}})
+
+
+def test_validation_cache():
+    cache = ValidationCache(maxsize=2)
+
+    assert cache.get('a') is None
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+
+    # b is the least recently used item
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+
+    assert cache.stats() == {'hits': 2, 'misses': 2, 'evictions': 1, 'size': 2, 'maxsize': 2}
+
+    cache.clear()
+    assert len(cache) == 0
+
+    assert isinstance(Option('foo', None, cache=True).cache, ValidationCache)
+    assert Option('foo', None, cache=10).cache.maxsize == 10
+    assert Option('foo', None, cache=cache).cache is cache
+    assert Option('foo', None).cache is None
+
+
+def test_cached_validation():
+    clean_mock = Mock(side_effect=lambda x: x)
+
+    class Child(OptionContainer):
+        props = [
+            Option.string('host', 'some.where', clean=clean_mock),
+        ]
+
+    class Parent(OptionContainer):
+        props = [
+            Option.nested('child', Child, cache=10),
+            Option.string('level', 'info', choices=['info', 'debug'], cache=10),
+            Option.list('tags', [], cache=10),
+        ]
+
+    first = Parent(child={'host': 'other.place'}, level='debug')
+    clean_mock.reset_mock()
+
+    second = Parent(child={'host': 'other.place'}, level='debug')
+
+    # Equal raw values return the cached result
+    assert not clean_mock.called
+    assert second['child'] is first['child']
+    assert Parent.defs['child'].cache.stats()['hits'] == 1
+    assert Parent.defs['level'].cache.stats()['hits'] == 1
+
+    # Unhashable values are not cached
+    Parent(tags=['a'])
+    assert len(Parent.defs['tags'].cache) == 0
+
+    # Errors are not cached
+    with pytest.raises(InvalidOption):
+        Parent(level='warning')
+
+    with pytest.raises(InvalidOption):
+        Parent(level='warning')
+
+    # Modifying a cached container must not affect other parents
+    second.set(('child', 'host'), 'last.place')
+    assert second['child']['host'] == 'last.place'
+    assert first['child']['host'] == 'other.place'
+    assert Parent(child={'host': 'other.place'})['child']['host'] == 'other.place'
+
+
+def test_defaults_are_validated_once():
+    clean_mock = Mock(side_effect=lambda x: x)
+
+    class Child(OptionContainer):
+        props = [
+            Option.string('host', 'some.where'),
+        ]
+
+    class A(OptionContainer):
+        props = [
+            Option.string('host', 'some.where', clean=clean_mock),
+            Option.string('user', None),
+            Option.nested('child', Child),
+            Option.list('tags', ['a']),
+            Option.list('items', list),
+        ]
+
+    # Defaults are validated on class creation
+    assert clean_mock.call_count == 1
+    assert A._shared_defaults['host'] == 'some.where'
+    assert A._copied_defaults == {'tags': ['a']}
+
+    # Invalid and callable defaults are validated per instance
+    assert 'user' not in A._shared_defaults
+    assert 'items' not in A._shared_defaults
+
+    first = A(user='john')
+    second = A(user='mary')
+
+    # Provided values come first, then the defaults in definition order
+    assert list(first) == ['user', 'host', 'child', 'tags', 'items']
+
+    assert clean_mock.call_count == 1
+    assert first['host'] == second['host'] == 'some.where'
+
+    # Invalid defaults still raise if the value is not provided
+    with pytest.raises(InvalidOption):
+        A()
+
+    # Mutable defaults are copied
+    assert first['tags'] == ['a']
+    assert first['tags'] is not second['tags']
+
+    # Callable defaults are resolved for each instance
+    assert first['items'] == []
+    assert first['items'] is not second['items']
+
+    # Default nested containers are shared until they are modified
+    assert first['child'] is second['child']
+
+    first.set(('child', 'host'), 'other.place')
+    assert first['child']['host'] == 'other.place'
+    assert second['child']['host'] == 'some.where'
+
+    with pytest.raises(NotImplementedError):
+        second['child'].set('host', 'other.place')
+
+
+def test_default_nested_containers_with_mutable_values():
+    class C(OptionContainer):
+        props = [
+            Option.list('l', default=list, inner_type=int),
+        ]
+
+    class P(OptionContainer):
+        props = [
+            Option.nested('c', C),
+        ]
+
+    # Nested defaults with mutable values are copied for each instance
+    assert 'c' not in P._shared_defaults
+
+    first, second = P(), P()
+    assert first['c'] is not second['c']
+
+    first['c']['l'].append(3)
+
+    assert first['c']['l'] == [3]
+    assert second['c']['l'] == []
+    assert P()['c']['l'] == []
+
+
+def test_overridden_set():
+    from tg_option_container import Rule
+
+    class Base(OptionContainer):
+        props = [
+            Option.string('name', 'x'),
+            Option.integer('low', 0),
+            Option.integer('high', 10),
+        ]
+
+        rules = [
+            Rule(['low', 'high'], lambda low, high: low <= high),
+        ]
+
+        def set(self, key, value):
+            if key == 'name':
+                value = value.lower()
+
+            return super(Base, self).set(key, value)
+
+    class Parent(OptionContainer):
+        props = [
+            Option.nested('child', Base),
+        ]
+
+    assert not OptionContainer._overrides_set
+    assert Base._overrides_set
+
+    # Constructor values are passed to the overridden set, rules are checked once all values are known
+    assert Base(name='ABC', low=20, high=30)['name'] == 'abc'
+    assert Parent(child={'name': 'ABC'})['child']['name'] == 'abc'
+
+    with pytest.raises(InvalidOption):
+        Base(low=20)
+
+    inst = Base()
+    inst.set('name', 'DEF')
+    assert inst['name'] == 'def'
+
+    with pytest.raises(InvalidOption):
+        inst.set('low', 20)
+
+
+def test_sparse():
+    class A(OptionContainer):
+        sparse = True
+
+        props = [
+            Option.string('host', 'some.where'),
+            Option.integer('port', 8080),
+            Option.list('tags', ['a']),
+            Option.nested('child', PickleChild),
+        ]
+
+    inst = A(port=80)
+
+    # Only provided values and defaults which can't be shared are stored on the instance
+    assert inst._values == {'port': 80, 'tags': ['a']}
+
+    # Construction only visits the defaults which need per-instance work
+    assert A._instance_defaults == ('tags', )
+
+    # Shared nested defaults can't be modified directly
+    with pytest.raises(NotImplementedError):
+        inst['child'].set('host', 'other.place')
+
+    assert inst['host'] == 'some.where'
+    assert inst['port'] == 80
+    assert len(inst) == 4
+    assert dict(inst) == {
+        'host': 'some.where',
+        'port': 80,
+        'tags': ['a'],
+        'child': inst['child'],
+    }
+    assert inst.as_dict() == {
+        'host': 'some.where',
+        'port': 80,
+        'tags': ['a'],
+        'child': {'host': 'some.where'},
+    }
+
+    with pytest.raises(KeyError):
+        inst.get('nanny')
+
+    # Setting values stores them on the instance
+    inst.set('host', 'other.place')
+    assert inst._values['host'] == 'other.place'
+    assert A()['host'] == 'some.where'
+
+    # Nested defaults are copied when modified
+    inst.set(('child', 'host'), 'other.place')
+    assert inst['child']['host'] == 'other.place'
+    assert A()['child']['host'] == 'some.where'
+    assert len(inst) == 4
+
+    # Shallow copies and pickling keep working
+    assert copy.copy(inst).as_dict() == inst.as_dict()
+    assert copy.deepcopy(inst).as_dict() == inst.as_dict()
+    assert str(inst) == str(copy.copy(inst))
+
+
+def test_mapping():
+    class A(OptionContainer):
+        props = [
+            Option.string('host', 'some.where'),
+            Option.nested('child', PickleChild),
+            Option.list('children', [], inner_type=PickleChild),
+        ]
+
+    inst = A(children=[{'host': 'a'}, {'host': 'b'}])
+
+    assert isinstance(inst, Mapping)
+    assert set(inst) == {'host', 'child', 'children'}
+    assert set(inst.keys()) == {'host', 'child', 'children'}
+    assert ('host', 'some.where') in inst.items()
+    assert 'some.where' in inst.values()
+    assert 'host' in inst
+    assert 'nanny' not in inst
+    assert inst.get('nanny', 'x') == 'x'
+    assert inst.get('nanny', None) is None
+
+    with pytest.raises(KeyError):
+        inst.get('nanny')
+
+    with pytest.raises(KeyError):
+        inst['nanny']
+
+    # Equality follows Mapping semantics
+    assert inst == dict(inst)
+    assert dict(inst) == inst
+    assert inst == A(children=[{'host': 'a'}, {'host': 'b'}])
+    assert inst != A()
+    assert inst != 'x'
+
+    # Mapping views
+    view = inst.as_mapping()
+
+    assert isinstance(view, Mapping)
+    assert len(view) == 3
+    assert view['host'] == 'some.where'
+    assert isinstance(view['child'], Mapping)
+    assert view['child']['host'] == 'some.where'
+    assert isinstance(view['children'], Sequence)
+    assert len(view['children']) == 2
+    assert view['children'][1]['host'] == 'b'
+    assert [x['host'] for x in view['children'][:1]] == ['a']
+
+    # Views are not copies
+    inst.set(('child', 'host'), 'other.place')
+    assert view['child']['host'] == 'other.place'
+
+    # Views are read-only
+    with pytest.raises(TypeError):
+        view['host'] = 'other.place'
+
+    with pytest.raises(AttributeError):
+        view['child'].set('host', 'other.place')
+
+
+def test_rules():
+    calls = []
+
+    def ordered(low, high):
+        calls.append((low, high))
+
+        return low <= high
+
+    class Timeouts(OptionContainer):
+        props = [
+            Option.integer('min_timeout', 1),
+            Option.integer('max_timeout', 30),
+            Option.integer('retries', 3),
+        ]
+
+        rules = [
+            Rule(['min_timeout', 'max_timeout'], ordered, _('`{min_timeout}` must be less than or equal to `{max_timeout}`')),
+        ]
+
+    class ExtendedTimeouts(Timeouts):
+        props = [
+            Option.integer('connect_timeout', 5),
+        ]
+
+        rules = [
+            Rule(['connect_timeout', 'max_timeout'], lambda connect, high: connect <= high),
+        ]
+
+    class Parent(OptionContainer):
+        props = [
+            Option.nested('timeouts', Timeouts),
+            Option.integer('deadline', 60),
+        ]
+
+        rules = [
+            Rule(['timeouts', 'deadline'], lambda timeouts, deadline: timeouts['max_timeout'] <= deadline),
+        ]
+
+    # Rules are checked once per construction (the nested default of Parent was already validated)
+    del calls[:]
+    inst = Timeouts(min_timeout=5)
+    assert calls == [(5, 30)]
+
+    with pytest.raises(InvalidOption) as exc_info:
+        Timeouts(min_timeout=50)
+
+    assert str(exc_info.value) == '`50` must be less than or equal to `30`'
+    assert exc_info.value.format_params['key'] == 'min_timeout, max_timeout'
+
+    # Only rules reading the changed key are evaluated
+    del calls[:]
+    inst.set('retries', 10)
+    assert calls == []
+
+    inst.set('max_timeout', 10)
+    assert calls == [(5, 10)]
+
+    # Invalid values are not stored
+    with pytest.raises(InvalidOption):
+        inst.set('max_timeout', 1)
+
+    assert inst['max_timeout'] == 10
+
+    # Related keys can be changed together
+    inst.update({'min_timeout': 50, 'max_timeout': 100})
+    assert inst['min_timeout'] == 50
+
+    with pytest.raises(InvalidOption):
+        inst.clone({'min_timeout': 500})
+
+    # Rules are inherited
+    assert len(ExtendedTimeouts._rules) == 2
+    assert ExtendedTimeouts._rule_deps['max_timeout'] == [0, 1]
+
+    with pytest.raises(InvalidOption) as exc_info:
+        ExtendedTimeouts(connect_timeout=40)
+
+    assert str(exc_info.value) == 'Values of connect_timeout, max_timeout are not valid together'
+
+    # Rules of the parent are checked when a nested key is set, the child is not modified if they fail
+    parent = Parent()
+
+    with pytest.raises(InvalidOption) as exc_info:
+        parent.set(('timeouts', 'max_timeout'), 100)
+
+    # Errors of the parent's rules are not prefixed with the key of the child
+    assert str(exc_info.value) == 'Values of timeouts, deadline are not valid together'
+    assert parent['timeouts']['max_timeout'] == 30
+
+    class GrandParent(OptionContainer):
+        props = [
+            Option.nested('parent', Parent),
+        ]
+
+    with pytest.raises(InvalidOption) as exc_info:
+        GrandParent().set(('parent', 'timeouts', 'max_timeout'), 100)
+
+    assert str(exc_info.value) == 'parent:Values of timeouts, deadline are not valid together'
+
+    parent.set(('timeouts', 'max_timeout'), 50)
+    assert parent['timeouts']['max_timeout'] == 50
+
+    # Rules of the child are checked too
+    with pytest.raises(InvalidOption) as exc_info:
+        parent.set(('timeouts', 'min_timeout'), 55)
+
+    assert str(exc_info.value) == 'timeouts:`55` must be less than or equal to `50`'
+
+    with pytest.raises(InvalidOption):
+        Parent(timeouts={'max_timeout': 100})
+
+    with pytest.raises(AssertionError):
+        class Invalid(OptionContainer):
+            props = []
+
+            rules = [
+                Rule('nanny', lambda nanny: True),
+            ]
+
+
+def test_validate_fields():
+    calls = []
+
+    def track(value):
+        calls.append(value)
+
+        return value
+
+    class Database(OptionContainer):
+        props = [
+            Option.string('host', 'localhost', clean=track),
+            Option.integer('port', 5432),
+        ]
+
+    class Settings(OptionContainer):
+        props = [
+            Option.integer('timeout', 30),
+            Option.integer('retries', 3),
+            Option.nested('database', Database),
+            Option.nested('replica', Database),
+        ]
+
+    del calls[:]
+    inst = Settings.validate_fields({'timeout': 10, 'retries': 'x', 'database': {'host': 'db', 'port': 'x'}}, ['timeout', ('database', 'host')])
+
+    # Only requested options are validated
+    assert calls == ['db']
+    assert dict(inst) == {'timeout': 10, 'database': inst['database']}
+    assert dict(inst['database']) == {'host': 'db'}
+
+    # Other options are validated when accessed
+    assert inst['replica']['host'] == 'localhost'
+    assert 'replica' in inst
+
+    with pytest.raises(InvalidOption) as exc_info:
+        inst['retries']
+
+    assert exc_info.value.format_params['key'] == 'retries'
+
+    # Invalid values are not replaced by the default once they were read
+    with pytest.raises(InvalidOption):
+        inst['retries']
+
+    assert 'retries' not in inst.as_dict()
+
+    with pytest.raises(InvalidOption):
+        inst['database']['port']
+
+    # Invalid keys and values of requested fields
+    with pytest.raises(InvalidOption):
+        Settings.validate_fields({'nanny': 1}, ['timeout'])
+
+    with pytest.raises(InvalidOption):
+        Settings.validate_fields({}, ['nanny'])
+
+    with pytest.raises(InvalidOption):
+        Settings.validate_fields({}, [('timeout', 'x')])
+
+    with pytest.raises(InvalidOption) as exc_info:
+        Settings.validate_fields({'database': {'port': 'x'}}, [('database', 'port')])
+
+    assert str(exc_info.value).startswith('database:Expected type')
+
+    # Full paths take precedence over partial ones
+    inst = Settings.partial([('database', 'host'), 'database'], database={'port': 1})
+    assert dict(inst['database']) == {'host': 'localhost', 'port': 1}
+
+    # Pending values survive copying and pickling
+    inst = Settings.partial(['timeout'], retries=5)
+    assert copy.copy(inst)['retries'] == 5
+    assert inst.as_dict() == {'timeout': 30}
+
+    inst = PickleParent.partial(['port'], child={'host': 'other.place'})
+    assert pickle.loads(pickle.dumps(inst))['child']['host'] == 'other.place'
+
+
+def test_validate_fields_sparse():
+    class A(OptionContainer):
+        sparse = True
+
+        props = [
+            Option.integer('a', 1),
+            Option.integer('b', 2),
+            Option.integer('c', 3),
+        ]
+
+    inst = A.validate_fields({'a': 10, 'b': 20}, ['a'])
+
+    # Pending values are not replaced by class level defaults
+    assert len(inst) == 2
+    assert 'b' not in inst
+    assert dict(inst) == {'a': 10, 'c': 3}
+
+    assert inst['b'] == 20
+    assert len(inst) == 3
+    assert dict(inst) == {'a': 10, 'b': 20, 'c': 3}
+
+    # Invalid pending values are validated on access
+    inst = A.validate_fields({'a': 10, 'b': 'bad'}, ['a'])
+
+    with pytest.raises(InvalidOption):
+        inst['b']
+
+
+def test_nested_error_order():
+    class C(OptionContainer):
+        props = [
+            Option.integer('n', 0),
+        ]
+
+    class M(OptionContainer):
+        props = [
+            Option.integer('a', 0),
+            Option.nested('c', C),
+            Option.integer('b', 0),
+        ]
+
+    class P(OptionContainer):
+        props = [
+            Option.nested('m', M),
+            Option.list('items', [], inner_type=M),
+        ]
+
+    # Values are validated in the order they are provided, like recursive construction does
+    with pytest.raises(InvalidOption) as exc_info:
+        P(m={'a': 'bad', 'c': {'n': 'bad'}})
+
+    assert exc_info.value.format_params['key'] == 'm'
+    assert str(exc_info.value).startswith('m:Expected type')
+    assert '`a`' in str(exc_info.value)
+
+    with pytest.raises(InvalidOption) as exc_info:
+        P(m={'c': {'n': 'bad'}, 'b': 'bad'})
+
+    assert str(exc_info.value).startswith('m:c:Expected type')
+
+    with pytest.raises(InvalidOption) as exc_info:
+        P(items=[{'c': {'n': 1}}, {'c': {'n': 'bad'}}])
+
+    assert exc_info.value.format_params['key'] == 'items'
+    assert '`n`' in str(exc_info.value)
+    assert P(items=[{'c': {'n': 1}}])['items'][0]['c']['n'] == 1
+
+
+def test_deep_trees():
+    depth = sys.getrecursionlimit() + 50
+
+    classes = [type('Level{0}'.format(depth), (OptionContainer, ), {'props': [Option.integer('value', 0)]})]
+
+    for level in reversed(range(depth)):
+        classes.append(type('Level{0}'.format(level), (OptionContainer, ), {
+            'props': [
+                Option.integer('value', 0),
+                Option.nested('child', classes[-1]),
+            ],
+        }))
+
+    root_cls = classes[-1]
+
+    data = {'value': 1}
+
+    for level in range(depth):
+        data = {'value': 1, 'child': data}
+
+    def walk(tree):
+        # Comparing the trees directly would hit the recursion limit
+        values = []
+
+        while tree is not None:
+            values.append((sorted(tree.keys()), tree['value']))
+            tree = tree.get('child')
+
+        return values
+
+    inst = root_cls(**data)
+    assert walk(inst.as_dict()) == walk(data)
+
+    # Set deep keys
+    path = ('child', ) * depth + ('value', )
+    inst.set(path, 2)
+
+    leaf = inst
+    for key in path[:-1]:
+        leaf = leaf[key]
+
+    assert leaf['value'] == 2
+
+    with pytest.raises(InvalidOption) as exc_info:
+        inst.set(path, 'x')
+
+    assert str(exc_info.value).startswith('child:' * depth + 'Expected type')
+
+    with pytest.raises(InvalidOption) as exc_info:
+        inst.set(path[:-1] + ('nanny', ), 1)
+
+    assert str(exc_info.value) == '{0}Invalid key nanny for Level{1}'.format('child:' * depth, depth)
+
+    # Errors of deep values are prefixed with their path
+    leaf_data = data
+    for key in path[:-1]:
+        leaf_data = leaf_data[key]
+
+    leaf_data['value'] = 'x'
+
+    with pytest.raises(InvalidOption) as exc_info:
+        root_cls(**data)
+
+    assert str(exc_info.value).startswith('child:' * depth + 'Expected type')
+
+    assert str(inst).count('<Level') == depth + 1
+    assert walk(inst.clone({path: 3}).as_dict())[-1] == (['value'], 3)
+    assert walk(inst.as_dict())[-1] == (['value'], 2)
+
+
+def test_representation_of_lists():
+    inst = PickleParent(children=[{'host': 'a'}, {'host': 'b'}])
+
+    assert str(inst).splitlines()[0] == '<PickleParent>:'
+    assert '\t\t0: <PickleChild>:\n\t\t\thost: a\n\t\t1: <PickleChild>:\n\t\t\thost: b' in str(inst)
+    assert '\tchildren: \n\t\t' in str(PickleParent())
+
+
+def test_bounded_representation():
+    class Limited(PickleParent):
+        representation_limits = {'max_items': 1}
+
+    inst = PickleParent(child={'host': 'x' * 100}, children=[{'host': str(i)} for i in range(1000)])
+
+    full = inst.representation()
+
+    # Limits
+    assert '\t\t0: <PickleChild>:\n\t\t\thost: 0\n\t\t1: <PickleChild>:' in full
+    assert '... (998 more)' in inst.representation(max_items=2)
+    assert '2: <PickleChild>' not in inst.representation(max_items=2)
+    assert 'child: <PickleChild>: ...' in inst.representation(max_depth=0)
+
+    truncated = inst.representation(max_length=50)
+    assert truncated == full[:50] + '... (truncated)'
+
+    # Lists of other values
+    class Tags(OptionContainer):
+        props = [
+            Option.list('tags', [], inner_type=int),
+        ]
+
+    assert Tags(tags=list(range(5))).representation(max_items=2) == '<Tags>:\n\ttags: [0, 1, ... (3 more)]'
+    assert Tags(tags=list(range(5))).representation() == '<Tags>:\n\ttags: [0, 1, 2, 3, 4]'
+
+    # Streaming
+    out = io.StringIO()
+    inst.write_representation(out)
+    assert out.getvalue() == full
+
+    out = io.StringIO()
+    inst.write_representation(out, max_depth=0, max_items=1)
+    assert out.getvalue() == inst.representation(max_depth=0, max_items=1)
+
+    # Limits used by __str__
+    assert str(inst) == full
+    assert '... (999 more)' in str(Limited(children=[{'host': str(i)} for i in range(1000)]))
+
+
+def test_adaptive_validators():
+    calls = []
+
+    def expensive(value):
+        calls.append(value)
+
+        return True
+
+    def often_fails(value):
+        if value % 2:
+            raise InvalidOption('Odd value for `{key}`')
+
+        return True
+
+    option = Option.integer('a', 0, validators=[expensive, often_fails], min_value=0, adaptive=True)
+
+    assert isinstance(option.adaptive, AdaptiveOrder)
+    assert option.adaptive.validators == option.validators
+
+    option.adaptive.reorder_every = 8
+    option.adaptive.sample_every = 1
+
+    for value in range(64):
+        try:
+            option.validate(value * 2 + (value % 4 != 0))
+
+        except InvalidOption:
+            pass
+
+    # The type validator stays first, the frequently failing validator runs before the expensive one
+    order = option.adaptive.validators
+    assert isinstance(order[0], IntegerValidator)
+    assert order.index(often_fails) < order.index(expensive)
+    assert option.validators[1] is expensive
+
+    # In strict mode the expensive validator is only run for failing values since it's declared first
+    del calls[:]
+    with pytest.raises(InvalidOption):
+        option.validate(1)
+
+    assert calls == [1]
+
+    # Failing values don't reach the expensive validator in non-strict mode
+    option.adaptive.strict = False
+
+    del calls[:]
+    with pytest.raises(InvalidOption):
+        option.validate(1)
+
+    assert calls == []
+
+    # Strict mode raises the error of the first failing validator in declaration order
+    option = Option.integer('a', 0, validators=[often_fails], min_value=10, adaptive=True)
+    option.adaptive.order = [0, 2, 1]
+
+    with pytest.raises(InvalidOption) as exc_info:
+        option.validate(3)
+
+    assert exc_info.value.message == 'Odd value for `{key}`'
+
+    option = Option.integer('a', 0, validators=[often_fails], min_value=10, adaptive=True, adaptive_strict=False)
+    option.adaptive.order = [0, 2, 1]
+
+    with pytest.raises(InvalidOption) as exc_info:
+        option.validate(3)
+
+    assert exc_info.value.format_params['min_value'] == 10
+
+    with pytest.raises(InvalidOption):
+        option.validate('x')
+
+    assert option.validate(12) == 12
+
+
+def test_interning():
+    level = ''.join(['in', 'fo'])
+
+    # Options with choices return the choice objects
+    option = Option.string('level', 'info', choices=['info', 'debug'])
+    assert option.intern is True
+    assert option.validate(level) is option.validators[0].choices[0]
+
+    # Choices are matched by type too
+    option = Option('flag', 1, choices=[1, True])
+    assert option.validate(True) is True
+    assert option.validate(1) == 1 and option.validate(1) is not True
+
+    # Strings are interned, other immutable values are deduplicated
+    option = Option.string('name', '', intern=True)
+    assert option.validate(''.join(['a', 'b'])) is option.validate(''.join(['a', 'b']))
+
+    option = Option('ratio', 0.5, intern=True)
+    assert option.validate(float('1.5')) is option.validate(float('1.5'))
+    assert option.validate([1]) == [1]
+
+    # Interning is off by default for other options
+    option = Option.string('name', '')
+    assert option.intern is False
+    assert option.validate(''.join(['a', 'b'])) is not option.validate(''.join(['a', 'b']))
+
+    assert ChoicesValidator(['a']).canonical('b') == 'b'
+    assert ChoicesValidator(['a']).canonical({}) == {}
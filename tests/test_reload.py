@@ -0,0 +1,168 @@
+import json
+import os
+import time
+
+import pytest
+
+from tg_option_container import InvalidOption, Option, OptionContainer
+from tg_option_container.reload import ConfigLoader, rebuild
+
+
+class Worker(OptionContainer):
+    props = [
+        Option.string('name', 'default'),
+        Option.integer('threads', 4),
+    ]
+
+
+class Database(OptionContainer):
+    props = [
+        Option.string('host', 'localhost'),
+        Option.nested('primary', Worker),
+    ]
+
+
+class Settings(OptionContainer):
+    props = [
+        Option.integer('timeout', 30),
+        Option.nested('database', Database),
+        Option.nested('cache', Worker),
+        Option.list('workers', [], inner_type=Worker),
+    ]
+
+
+def _write(path, data):
+    path.write(json.dumps(data))
+
+    # Make sure the modification is detected even on filesystems with coarse timestamps
+    stat = os.stat(str(path))
+    os.utime(str(path), (stat.st_atime, stat.st_mtime + 10))
+
+
+def test_rebuild_reuses_unchanged_subtrees():
+    data = {
+        'database': {'host': 'db', 'primary': {'name': 'p'}},
+        'cache': {'threads': 2},
+        'workers': [{'name': 'a'}, {'name': 'b'}],
+    }
+    first = rebuild(Settings, data)
+
+    changed = dict(data, timeout=10, database={'host': 'db2', 'primary': {'name': 'p'}}, workers=[{'name': 'b'}, {'name': 'c'}])
+    second = rebuild(Settings, changed, first, data)
+
+    assert second['timeout'] == 10
+    assert second['database']['host'] == 'db2'
+    assert second.as_dict() == Settings(**changed).as_dict()
+
+    # Unchanged subtrees are shared
+    assert second['cache'] is first['cache']
+    assert second['database'] is not first['database']
+    assert second['database']['primary'] is first['database']['primary']
+    assert second['workers'][0] is first['workers'][1]
+    assert second['workers'][1] is not first['workers'][0]
+
+    # The previous container is not modified
+    assert first['timeout'] == 30
+    assert first['database']['host'] == 'db'
+
+    # Removed keys fall back to defaults
+    third = rebuild(Settings, {'cache': {'threads': 2}}, second, changed)
+    assert third.as_dict() == Settings(cache={'threads': 2}).as_dict()
+
+    # Shared children are copied before they are modified
+    second.set(('cache', 'threads'), 8)
+    assert first['cache']['threads'] == 2
+
+
+def test_rebuild_errors():
+    first = rebuild(Settings, {'database': {'primary': {}}})
+
+    with pytest.raises(InvalidOption) as exc_info:
+        rebuild(Settings, {'database': {'primary': {'threads': 'x'}}}, first, {'database': {'primary': {}}})
+
+    assert str(exc_info.value).startswith('database:primary:Expected type')
+
+    with pytest.raises(InvalidOption):
+        rebuild(Settings, {'nanny': 1}, first, {})
+
+    # Values which are equal but of a different type are not treated as unchanged
+    previous = rebuild(Settings, {'timeout': 1, 'cache': {'threads': 1}})
+
+    with pytest.raises(InvalidOption):
+        rebuild(Settings, {'timeout': True, 'cache': {'threads': 1}}, previous, {'timeout': 1, 'cache': {'threads': 1}})
+
+    with pytest.raises(InvalidOption):
+        rebuild(Settings, {'timeout': 1, 'cache': {'threads': 1.0}}, previous, {'timeout': 1, 'cache': {'threads': 1}})
+
+
+def test_config_loader(tmpdir):
+    path = tmpdir.join('settings.json')
+    _write(path, {'timeout': 5, 'cache': {'threads': 2}})
+
+    reloaded = []
+    errors = []
+
+    loader = ConfigLoader(Settings, str(path), on_reload=reloaded.append, on_error=errors.append)
+    first = loader.container
+
+    assert first['timeout'] == 5
+    assert reloaded == [first]
+    assert loader.check() is False
+
+    _write(path, {'timeout': 6, 'cache': {'threads': 2}})
+    assert loader.check() is True
+    assert loader.container['timeout'] == 6
+    assert loader.container['cache'] is first['cache']
+
+    # Invalid data keeps the previous container
+    current = loader.container
+    _write(path, {'timeout': 'x'})
+
+    assert loader.check() is False
+    assert loader.container is current
+    assert len(errors) == 1 and isinstance(errors[0], InvalidOption)
+
+    # Touching the file without changing the data does not replace the container
+    _write(path, {'timeout': 6, 'cache': {'threads': 2}})
+    assert loader.check() is False
+    assert loader.container is current
+
+    # Changing the type of a value is detected (and validated)
+    _write(path, {'timeout': 6.0, 'cache': {'threads': 2}})
+    assert loader.check() is False
+    assert loader.container is current
+    assert len(errors) == 2 and isinstance(errors[1], InvalidOption)
+
+
+def test_config_loader_thread(tmpdir):
+    path = tmpdir.join('settings.json')
+    _write(path, {'timeout': 5})
+
+    loader = ConfigLoader(Settings, str(path), interval=0.01)
+    loader.start()
+
+    try:
+        _write(path, {'timeout': 7})
+
+        for _ in range(500):
+            if loader.container['timeout'] == 7:
+                break
+
+            time.sleep(0.01)
+
+        assert loader.container['timeout'] == 7
+
+    finally:
+        loader.stop()
+
+
+def test_config_loader_yaml(tmpdir):
+    pytest.importorskip('yaml')
+
+    path = tmpdir.join('settings.yml')
+    path.write('timeout: 3\ndatabase:\n  host: db\n')
+
+    loader = ConfigLoader(Settings, str(path))
+
+    assert loader.container['timeout'] == 3
+    assert loader.container['database']['host'] == 'db'
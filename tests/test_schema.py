@@ -0,0 +1,128 @@
+import gc
+import weakref
+
+import pytest
+
+from tg_option_container import InvalidOption, OptionContainer, build_container, schema, types
+from tg_option_container.schema import clear_cache, spec_hash
+from tg_option_container.types import IntegerValidator, MinValueValidator, shared_validator
+
+
+SPEC = {
+    'sparse': True,
+    'props': [
+        {'name': 'port', 'type': 'integer', 'default': 8080, 'min_value': 1},
+        {'name': 'ratio', 'type': 'float', 'default': 0.5},
+        {'name': 'debug', 'type': 'boolean', 'default': False},
+        {'name': 'level', 'type': 'string', 'default': 'info', 'choices': ['info', 'debug']},
+        {'name': 'started', 'type': 'iso8601', 'default': '2018-03-01T12:00:00Z'},
+        {'name': 'extra', 'default': None},
+        {'name': 'hosts', 'type': 'list', 'default': [], 'inner_type': 'string'},
+        {'name': 'workers', 'type': 'list', 'default': [], 'inner_type': {
+            'name': 'Worker', 'props': [{'name': 'threads', 'type': 'integer', 'default': 1}],
+        }},
+        {'name': 'database', 'type': 'nested', 'spec': {
+            'props': [{'name': 'host', 'type': 'string', 'default': 'localhost'}],
+        }},
+    ],
+}
+
+
+def test_build_container():
+    Settings = build_container('Settings', SPEC)
+
+    assert issubclass(Settings, OptionContainer)
+    assert Settings.__name__ == 'Settings'
+    assert Settings.sparse is True
+
+    inst = Settings(port=1, hosts=['a'], workers=[{'threads': 2}], database={'host': 'db'})
+
+    assert inst['port'] == 1
+    assert inst['ratio'] == 0.5
+    assert inst['level'] == 'info'
+    assert inst['extra'] is None
+    assert inst['hosts'] == ['a']
+    assert inst['workers'][0]['threads'] == 2
+    assert type(inst['workers'][0]).__name__ == 'Worker'
+    assert inst['database']['host'] == 'db'
+    assert type(inst['database']).__name__ == 'database'
+
+    for invalid in [{'port': 0}, {'ratio': 1}, {'level': 'x'}, {'hosts': [1]}, {'database': {'host': 1}}]:
+        with pytest.raises(InvalidOption):
+            Settings(**invalid)
+
+
+def test_build_container_cache():
+    Settings = build_container('Settings', SPEC)
+
+    # Key order does not matter
+    reordered = dict(reversed(list(SPEC.items())))
+    assert spec_hash(reordered) == spec_hash(SPEC)
+    assert build_container('Settings', reordered) is Settings
+
+    # Different names, bases and specs get different classes
+    assert build_container('Other', SPEC) is not Settings
+    assert build_container('Settings', {'props': []}) is not Settings
+
+    class Base(OptionContainer):
+        pass
+
+    assert issubclass(build_container('Settings', SPEC, base=Base), Base)
+
+    clear_cache()
+    assert build_container('Settings', SPEC) is not Settings
+
+
+def test_build_container_shared_nested():
+    first = build_container('TenantA', SPEC)
+    second = build_container('TenantB', SPEC)
+
+    # Classes of different names are not shared, but their nested classes are
+    assert first is not second
+    assert first.defs['database']._container_cls is second.defs['database']._container_cls
+    assert first.defs['workers']._container_cls is second.defs['workers']._container_cls
+
+    # Names are not part of the key when named=False
+    assert build_container('TenantC', SPEC, named=False) is build_container('TenantD', SPEC, named=False)
+
+
+def test_build_container_garbage_collection():
+    spec = {'props': [{'name': 'child', 'type': 'nested', 'spec': {'name': 'Collected', 'props': []}}]}
+
+    container_cls = build_container('Collected', spec)
+    nested = weakref.ref(container_cls.defs['child']._container_cls)
+
+    schema._cache.clear()
+    del container_cls
+
+    # Parents are collected first, which releases the shared validators of their nested classes
+    gc.collect()
+    gc.collect()
+
+    # Shared validators don't keep runtime generated classes alive
+    assert nested() is None
+
+    build_container('Collected', spec)
+    clear_cache()
+
+    assert len(types._shared_validators) == 0
+
+
+def test_build_container_errors():
+    with pytest.raises(TypeError):
+        build_container('Invalid', {'props': [{'name': 'a', 'type': 'nanny'}]})
+
+    with pytest.raises(TypeError):
+        build_container('Invalid', {'props': [{'name': 'a', 'type': 'list', 'default': [], 'inner_type': 'nanny'}]})
+
+
+def test_shared_validators():
+    A = build_container('A', {'props': [{'name': 'port', 'type': 'integer', 'default': 1, 'min_value': 1}]})
+    B = build_container('B', {'props': [{'name': 'count', 'type': 'integer', 'default': 1, 'min_value': 1}]})
+
+    assert A.defs['port'].validators[0] is B.defs['count'].validators[0]
+    assert A.defs['port'].validators[1] is B.defs['count'].validators[1]
+
+    assert shared_validator(IntegerValidator, '', '') is shared_validator(IntegerValidator, '', '')
+    assert shared_validator(MinValueValidator, 1) is not shared_validator(MinValueValidator, 1.0)
+    assert shared_validator(MinValueValidator, True) is not shared_validator(MinValueValidator, 1)
@@ -0,0 +1,91 @@
+import datetime
+import decimal
+import io
+import json
+
+import pytest
+import pytz
+
+from tg_option_container import Option, OptionContainer
+from tg_option_container.serialization import iter_json, orjson
+
+
+class Child(OptionContainer):
+    props = [
+        Option.string('host', 'some.where'),
+        Option.iso8601('created', '2016-05-09T16:00:00Z'),
+    ]
+
+
+class Parent(OptionContainer):
+    props = [
+        Option.nested('child', Child),
+        Option.list('children', [], inner_type=Child),
+        Option.list('tags', ['a', 'b']),
+        Option('extra', {'nested': [1, {'x': None}]}),
+        Option.string('name', u'Jüri'),
+        Option('price', decimal.Decimal('1.5')),
+    ]
+
+
+def expected_dict(inst):
+    result = inst.as_dict()
+    result['child']['created'] = result['child']['created'].isoformat()
+    result['children'] = [dict(x, created=x['created'].isoformat()) for x in result['children']]
+    result['price'] = str(result['price'])
+
+    return result
+
+
+BACKENDS = ['json'] + (['orjson'] if orjson is not None else [])
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_to_json(backend):
+    inst = Parent(children=[{'host': 'a'}, {'host': 'b', 'created': datetime.datetime(2017, 1, 1, tzinfo=pytz.UTC)}])
+
+    result = inst.to_json(backend=backend, default=str)
+
+    assert isinstance(result, bytes)
+    assert json.loads(result.decode('utf-8')) == expected_dict(inst)
+
+    # Sorted keys
+    result = inst.to_json(backend=backend, default=str, sort_keys=True)
+    assert result.decode('utf-8') == json.dumps(expected_dict(inst), sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+    # Streaming to text and binary files
+    text = io.StringIO()
+    assert inst.to_json(text, backend=backend, default=str) is None
+    assert json.loads(text.getvalue()) == expected_dict(inst)
+
+    binary = io.BytesIO()
+    inst.to_json(binary, backend=backend, default=str)
+    assert json.loads(binary.getvalue().decode('utf-8')) == expected_dict(inst)
+
+    # Unknown types raise TypeError without `default`
+    with pytest.raises(TypeError):
+        inst.to_json(backend=backend)
+
+
+def test_backends_match():
+    class Values(OptionContainer):
+        props = [
+            Option('mapping', {1: 'a', 'b': 2}),
+            Option('huge', 2 ** 70),
+            Option('flags', (True, None)),
+        ]
+
+    inst = Values()
+    results = [inst.to_json(backend=backend) for backend in BACKENDS]
+
+    assert json.loads(results[0].decode('utf-8')) == {'mapping': {'1': 'a', 'b': 2}, 'huge': 2 ** 70, 'flags': [True, None]}
+    assert all([result == results[0] for result in results])
+
+
+def test_iter_json_streams_chunks():
+    inst = Parent(children=[{'host': str(i)} for i in range(100)], price=decimal.Decimal(1))
+
+    chunks = list(iter_json(inst, default=str))
+
+    assert len(chunks) > 100
+    assert json.loads(''.join(chunks)) == expected_dict(inst)
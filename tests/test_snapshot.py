@@ -0,0 +1,111 @@
+import datetime
+import multiprocessing
+import os
+
+import pytest
+
+from tg_option_container import Option, OptionContainer
+from tg_option_container.snapshot import SnapshotList, SnapshotView, freeze, open_snapshot
+
+
+class Worker(OptionContainer):
+    props = [
+        Option.string('name', 'default'),
+        Option.integer('threads', 4),
+    ]
+
+
+class Settings(OptionContainer):
+    props = [
+        Option.string('host', 'some.where'),
+        Option.integer('port', 8080),
+        Option('ratio', 0.5),
+        Option.boolean('debug', False),
+        Option('secret', None),
+        Option.iso8601('started', '2018-03-01T12:00:00Z'),
+        Option.nested('main', Worker),
+        Option.list('workers', [], inner_type=Worker),
+        Option.list('tags', ['a', 'b']),
+        Option('extra', {'ünicode': 1, 'big': 2 ** 70}),
+    ]
+
+
+def _read_port(path, queue):
+    queue.put(open_snapshot(path)['main']['threads'])
+
+
+def test_freeze_and_open(tmpdir):
+    path = str(tmpdir.join('settings.snapshot'))
+    settings = Settings(main={'threads': 8}, workers=[{'name': 'a'}, {'name': 'b', 'threads': 1}])
+
+    freeze(settings, path)
+    snapshot = open_snapshot(path)
+
+    assert isinstance(snapshot, SnapshotView)
+    assert len(snapshot) == len(settings)
+    assert sorted(snapshot) == sorted(settings.keys())
+
+    assert snapshot['host'] == 'some.where'
+    assert snapshot['port'] == 8080
+    assert snapshot['ratio'] == 0.5
+    assert snapshot['debug'] is False
+    assert snapshot['secret'] is None
+    assert snapshot['started'] == settings['started']
+    assert isinstance(snapshot['started'], datetime.datetime)
+    assert snapshot.get('nanny') is None
+    assert 'host' in snapshot and 'nanny' not in snapshot
+
+    with pytest.raises(KeyError):
+        snapshot['nanny']
+
+    assert isinstance(snapshot['main'], SnapshotView)
+    assert snapshot['main']['threads'] == 8
+    assert snapshot['main']['name'] == 'default'
+
+    assert isinstance(snapshot['workers'], SnapshotList)
+    assert len(snapshot['workers']) == 2
+    assert snapshot['workers'][-1]['threads'] == 1
+    assert [worker['name'] for worker in snapshot['workers']] == ['a', 'b']
+    assert snapshot['tags'] == ['a', 'b']
+    assert snapshot['tags'][:1] == ['a']
+
+    with pytest.raises(IndexError):
+        snapshot['tags'][2]
+
+    assert snapshot['extra']['ünicode'] == 1
+    assert snapshot['extra']['big'] == 2 ** 70
+
+    assert snapshot.as_dict() == settings.as_dict()
+
+
+def test_shared_between_processes(tmpdir):
+    path = str(tmpdir.join('settings.snapshot'))
+    freeze(Settings(main={'threads': 16}), path)
+
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_read_port, args=(path, queue))
+    process.start()
+    process.join()
+
+    assert queue.get(timeout=5) == 16
+
+
+def test_replace_keeps_open_snapshots(tmpdir):
+    path = str(tmpdir.join('settings.snapshot'))
+
+    freeze(Settings(port=1), path)
+    old = open_snapshot(path)
+
+    freeze(Settings(port=2), path)
+
+    assert old['port'] == 1
+    assert open_snapshot(path)['port'] == 2
+    assert os.listdir(str(tmpdir)) == ['settings.snapshot']
+
+
+def test_invalid_snapshot(tmpdir):
+    path = tmpdir.join('invalid.snapshot')
+    path.write('this is not a snapshot at all')
+
+    with pytest.raises(ValueError):
+        open_snapshot(str(path))
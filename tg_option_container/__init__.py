@@ -1,11 +1,13 @@
+from tg_option_container.collection import ContainerCollection
 from tg_option_container.container import OptionContainer
-from tg_option_container.types import InvalidOption, Option, Undefined
+from tg_option_container.schema import build_container
+from tg_option_container.types import InvalidOption, Option, Rule, Undefined
 
 
 __name__ = 'tg-option-container'
 __title__ = 'TG Option Container'
 __description__ = 'Container for dictionary-like validated data structures'
-__version__ = '0.4.0'
+__version__ = '0.5.0'
 __author__ = 'Thorgate'
 __url__ = 'https://github.com/thorgate/tg-option-container'
 __email__ = 'code@thorgate.eu'
@@ -16,8 +18,11 @@ NAME = __name__
 VERSION = __version__
 
 __all__ = [
+    'ContainerCollection',
     'InvalidOption',
     'Option',
     'OptionContainer',
+    'Rule',
     'Undefined',
+    'build_container',
 ]
@@ -0,0 +1,164 @@
+"""asyncio support for validating option containers
+
+Note:
+    This module requires python 3.5+, it's only imported when `OptionContainer.avalidate` is used.
+"""
+import asyncio
+import inspect
+
+from gettext import gettext as _
+
+from tg_option_container import metrics
+from tg_option_container.container import OptionContainer, _new_container
+from tg_option_container.types import InvalidOption, ListValidator, Option, Undefined
+
+
+async def _resolve(result):
+    if inspect.isawaitable(result):
+        return await result
+
+    return result
+
+
+async def _clean_container(container_cls, value):
+    try:
+        return await validate_container(container_cls, value)
+
+    except InvalidOption as e:
+        # Same format as `clean_option_container` uses
+        raise InvalidOption('{key}:{inner}', inner=str(e))
+
+
+async def _clean_list(list_validator, value):
+    # This is just a sanity check, the validator reports the error. Columnar lists are validated synchronously.
+    if not isinstance(value, list) or list_validator.columnar:
+        return list_validator.clean(value)
+
+    expected_type = list_validator.expected_type
+
+    if inspect.isclass(expected_type) and issubclass(expected_type, OptionContainer):
+        # Expected type is an OptionContainer, lets construct all of the items concurrently
+        items = [_resolve(x) if isinstance(x, expected_type) else validate_container(expected_type, x) for x in value]
+
+        return list(await asyncio.gather(*items))
+
+    elif isinstance(expected_type, Option):
+        # Expected type is an Option, lets use it to validate our value
+        return list(await asyncio.gather(*[validate_option(expected_type, x) for x in value]))
+
+    return list_validator.clean(value)
+
+
+async def validate_option(option, value):
+    """Clean and validate the provided value against `option`
+
+    Works the same way as `Option.validate` but awaits coroutine cleaners and validators. Nested containers and lists
+    of containers are validated via `validate_container` so their coroutine callables also run concurrently.
+
+    Args:
+        option (Option): Option to validate against
+        value: Value to validate
+
+    Returns:
+        The cleaned value
+    """
+    registry = metrics.registry
+
+    if registry is None:
+        return await _validate_option(option, value)
+
+    try:
+        result = await _validate_option(option, value)
+
+    except Exception as e:
+        registry.record_option(option.name, e)
+
+        raise
+
+    registry.record_option(option.name)
+
+    return result
+
+
+async def _validate_option(option, value):
+    value = option._nvl(value)
+
+    for clean in option.clean:
+        container_cls = getattr(clean, 'container_cls', None)
+
+        if container_cls is not None and isinstance(value, dict):
+            value = await _clean_container(container_cls, value)
+
+        elif isinstance(getattr(clean, '__self__', None), ListValidator):
+            value = await _clean_list(clean.__self__, value)
+
+        else:
+            value = await _resolve(clean(value))
+
+    for validator in option.validators:
+        if not await _resolve(validator(value)):
+            raise InvalidOption('Invalid value `{value}` for option `{key}`', value=value)
+
+    if option.intern:
+        return option.intern_value(value)
+
+    return value
+
+
+async def _validate_key(inst, key, value):
+    try:
+        return await validate_option(inst.definitions[key], inst._coerce(key, value))
+
+    except InvalidOption as e:
+        # Add key param here, since Options don't know their key
+        e.add_params(key=key)
+
+        raise
+
+    finally:
+        registry = metrics.registry
+
+        # Only counted, time spent awaiting is shared with other coroutines
+        if registry is not None:
+            registry.record_container(inst.__class__.__name__)
+
+
+async def validate_container(container_cls, data):
+    """Asynchronously construct an instance of `container_cls` from `data`
+
+    All options are validated concurrently via `asyncio.gather`. If multiple options are invalid, the error
+    of the first one (in the same order the constructor uses) is raised.
+
+    Args:
+        container_cls: OptionContainer subclass to construct
+        data (dict): Values for the container
+
+    Returns:
+        OptionContainer
+
+    Raises:
+        InvalidOption: If validation fails
+    """
+    inst = _new_container(container_cls)
+    inst._setup()
+
+    # Catch invalid keys before invalid values
+    for key in data.keys():
+        if key not in inst.definitions:
+            raise InvalidOption(_('Invalid key {key} for {identifier}'), key=key, identifier=inst.identifier)
+
+    keys = list(data.keys()) + [key for key in container_cls.defs.keys() if key not in data]
+
+    results = await asyncio.gather(*[
+        _validate_key(inst, key, data.get(key, Undefined())) for key in keys
+    ], return_exceptions=True)
+
+    for key, result in zip(keys, results):
+        if isinstance(result, BaseException):
+            raise result
+
+        inst._assign(key, result)
+
+    inst._check_rules(inst._rules)
+
+    return inst
@@ -0,0 +1,240 @@
+"""Command-line bulk validator
+
+Validates JSON and JSON-lines files against an OptionContainer subclass using multiple worker processes.
+
+Examples:
+    $ tg-option-validate myproject.options:Settings exports/*.jsonl --workers 8
+"""
+import argparse
+import importlib
+import json
+import multiprocessing
+import sys
+import time
+
+from collections import Counter
+
+from tg_option_container.types import InvalidOption
+
+
+JSON_LINES_EXTENSIONS = ('.jsonl', '.ndjson')
+
+# Container class of the current worker process
+_worker_container_cls = None
+
+
+def import_container(path):
+    """Import an OptionContainer subclass from `module:ClassName`
+
+    Raises:
+        ValueError: If `path` is not in the correct format
+        ImportError: If the module can't be imported
+        AttributeError: If the class does not exist
+    """
+    module_name, _sep, attr = path.partition(':')
+
+    if not module_name or not attr:
+        raise ValueError('Container must be specified as module:ClassName, got {0}'.format(path))
+
+    container_cls = importlib.import_module(module_name)
+
+    for name in attr.split('.'):
+        container_cls = getattr(container_cls, name)
+
+    return container_cls
+
+
+def _init_worker(container_path):
+    global _worker_container_cls
+
+    _worker_container_cls = import_container(container_path)
+
+
+def validate_record(container_cls, record):
+    """Validate a single record
+
+    Returns:
+        None if the record is valid, otherwise a tuple of (option, message)
+    """
+    if not isinstance(record, dict):
+        return '<record>', 'Expected a JSON object, got {0}'.format(type(record).__name__)
+
+    try:
+        container_cls(**record)
+
+    except InvalidOption as e:
+        return e.format_params.get('key', '<record>'), str(e)
+
+    except (TypeError, ValueError) as e:
+        # Cleaners may raise other errors for bad input (e.g. unparseable dates)
+        return '<record>', str(e)
+
+    return None
+
+
+def validate_chunk(chunk):
+    """Validate a chunk of records in the current worker process
+
+    Args:
+        chunk (list): Items of (source, position, raw, is_encoded), JSON decoding of encoded items is also done here
+
+    Returns:
+        tuple: Number of records in the chunk and a list of errors as (source, position, option, message)
+    """
+    errors = []
+
+    for source, position, raw, is_encoded in chunk:
+        if is_encoded:
+            try:
+                raw = json.loads(raw)
+
+            except ValueError as e:
+                errors.append((source, position, '<json>', str(e)))
+
+                continue
+
+        error = validate_record(_worker_container_cls, raw)
+
+        if error is not None:
+            errors.append((source, position) + error)
+
+    return len(chunk), errors
+
+
+def iter_records(paths):
+    """Yield (source, position, raw, is_encoded) for all records in `paths`
+
+    JSON-lines files (.jsonl, .ndjson) are read lazily and decoded by the workers. Other files are decoded as JSON
+    documents containing a single record or a list of records.
+    """
+    for path in paths:
+        with open(path, 'r') as handle:
+            if path.endswith(JSON_LINES_EXTENSIONS):
+                for line_number, line in enumerate(handle, 1):
+                    if line.strip():
+                        yield path, line_number, line, True
+
+                continue
+
+            content = handle.read()
+
+        try:
+            data = json.loads(content)
+
+        except ValueError:
+            # Let the worker report the error
+            yield path, 0, content, True
+
+            continue
+
+        if not isinstance(data, list):
+            data = [data]
+
+        for index, record in enumerate(data):
+            yield path, index, record, False
+
+
+def iter_chunks(records, chunk_size):
+    chunk = []
+
+    for record in records:
+        chunk.append(record)
+
+        if len(chunk) >= chunk_size:
+            yield chunk
+
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def run(container_path, paths, workers=None, chunk_size=1000, max_errors=10, out=None):
+    """Validate all records in `paths` against a container class, streaming a report to `out`
+
+    Args:
+        container_path (str): Container class as `module:ClassName`
+        paths (list): JSON or JSON-lines files to validate
+        workers (int): Number of worker processes, defaults to the number of CPUs
+        chunk_size (int): Number of records sent to a worker at once
+        max_errors (int): Number of errors to print
+        out: File-like object for the report, defaults to stdout
+
+    Returns:
+        dict: Summary with records, invalid, errors_by_option and elapsed keys
+    """
+    out = out or sys.stdout
+    workers = workers or multiprocessing.cpu_count()
+
+    started = time.time()
+    records = 0
+    invalid = 0
+    errors_by_option = Counter()
+
+    chunks = iter_chunks(iter_records(paths), chunk_size)
+    pool = None
+
+    if workers == 1:
+        _init_worker(container_path)
+        results = (validate_chunk(chunk) for chunk in chunks)
+
+    else:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(container_path, ))
+        results = pool.imap(validate_chunk, chunks)
+
+    try:
+        for count, errors in results:
+            records += count
+
+            for source, position, option, message in errors:
+                invalid += 1
+                errors_by_option[option] += 1
+
+                if invalid <= max_errors:
+                    out.write('{0}:{1}: {2}\n'.format(source, position, message))
+
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    elapsed = time.time() - started
+
+    out.write('Validated {0} records in {1:.2f}s ({2:.0f} records/s), {3} invalid\n'.format(
+        records, elapsed, records / elapsed if elapsed else 0, invalid,
+    ))
+
+    for option, count in errors_by_option.most_common():
+        out.write('  {0}: {1}\n'.format(option, count))
+
+    return {
+        'records': records,
+        'invalid': invalid,
+        'errors_by_option': dict(errors_by_option),
+        'elapsed': elapsed,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='tg-option-validate', description='Validate JSON / JSON-lines files against an OptionContainer')
+    parser.add_argument('container', help='OptionContainer subclass as module:ClassName')
+    parser.add_argument('files', nargs='+', help='JSON files (a record or a list of records) or JSON-lines files (.jsonl, .ndjson)')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='Number of worker processes (default: number of CPUs)')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Number of records sent to a worker at once (default: 1000)')
+    parser.add_argument('--max-errors', type=int, default=10, help='Number of errors to print (default: 10)')
+
+    args = parser.parse_args(argv)
+
+    try:
+        import_container(args.container)
+
+    except (ValueError, ImportError, AttributeError) as e:
+        parser.error('Could not import {0}: {1}'.format(args.container, e))
+
+    summary = run(args.container, args.files, workers=args.workers, chunk_size=args.chunk_size, max_errors=args.max_errors)
+
+    return 1 if summary['invalid'] else 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
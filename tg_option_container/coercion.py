@@ -0,0 +1,142 @@
+"""Parsers for containers with `coerce = True`
+
+Values from environment variables, query strings or CSV files are always strings. Coercing containers convert string
+values of integer, float, boolean, iso8601, list and nested options before they are validated. The parser of each
+option is selected once per class (see `PropsMetaClass.assign_coercers`).
+"""
+import datetime
+import json
+
+from gettext import gettext as _
+
+from tg_option_container.types import InvalidOption, ListValidator, Option, TypeValidator, clean_datetime
+
+
+TRUE_STRINGS = frozenset(['1', 'true', 'yes', 'on', 'y', 't'])
+FALSE_STRINGS = frozenset(['0', 'false', 'no', 'off', 'n', 'f', ''])
+
+_fromisoformat = getattr(datetime.datetime, 'fromisoformat', None)
+
+
+def _invalid(value, expected_type):
+    return InvalidOption(_('Cannot convert {value!r} to {expected_type} for option `{key}`.'), value=value, expected_type=expected_type)
+
+
+def parse_int(value):
+    try:
+        return int(value)
+
+    except ValueError:
+        raise _invalid(value, int)
+
+
+def parse_float(value):
+    try:
+        return float(value)
+
+    except ValueError:
+        raise _invalid(value, float)
+
+
+def parse_bool(value):
+    lowered = value.strip().lower()
+
+    if lowered in TRUE_STRINGS:
+        return True
+
+    if lowered in FALSE_STRINGS:
+        return False
+
+    raise _invalid(value, bool)
+
+
+def parse_datetime(value):
+    # datetime.fromisoformat is a lot faster than dateutil, fall back to clean_datetime for other formats
+    if _fromisoformat is not None:
+        try:
+            return _fromisoformat(value)
+
+        except ValueError:
+            pass
+
+    try:
+        return clean_datetime(value)
+
+    except (ValueError, OverflowError):
+        raise _invalid(value, datetime.datetime)
+
+
+def parse_json(value):
+    try:
+        return json.loads(value)
+
+    except ValueError:
+        raise _invalid(value, dict)
+
+
+def make_list_parser(item_parser):
+    """Parse JSON arrays and comma separated values, items of the latter are converted with `item_parser`"""
+    def parse_list(value):
+        stripped = value.strip()
+
+        if stripped.startswith('['):
+            try:
+                return json.loads(stripped)
+
+            except ValueError:
+                raise _invalid(value, list)
+
+        if not stripped:
+            return []
+
+        items = [item.strip() for item in stripped.split(',')]
+
+        if item_parser is not None:
+            items = [item_parser(item) for item in items]
+
+        return items
+
+    return parse_list
+
+
+TYPE_PARSERS = [
+    (bool, parse_bool),
+    (int, parse_int),
+    (float, parse_float),
+    (datetime.datetime, parse_datetime),
+]
+
+
+def _type_parser(expected_type):
+    for python_type, parser in TYPE_PARSERS:
+        if expected_type is python_type:
+            return parser
+
+    return None
+
+
+def get_parser(option):
+    """Get the parser for string values of `option`
+
+    Returns:
+        callable: Parser or None if strings are not converted for this option
+    """
+    if getattr(option, '_is_nested', False):
+        return parse_json
+
+    if clean_datetime in option.clean:
+        return parse_datetime
+
+    for validator in option.validators:
+        if isinstance(validator, ListValidator):
+            inner = validator.expected_type
+
+            if isinstance(inner, Option):
+                return make_list_parser(get_parser(inner))
+
+            return make_list_parser(_type_parser(inner) if inner is not None else None)
+
+        if isinstance(validator, TypeValidator):
+            return _type_parser(validator.expected_type)
+
+    return None
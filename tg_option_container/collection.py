@@ -0,0 +1,370 @@
+import bisect
+
+from gettext import gettext as _
+
+from tg_option_container.types import InvalidOption
+
+
+LOOKUP_SEPARATOR = '__'
+LOOKUPS = ('exact', 'in', 'gt', 'gte', 'lt', 'lte', 'range')
+
+
+def _check(op, value, expected):
+    if op == 'exact':
+        return value == expected
+
+    elif op == 'in':
+        return value in expected
+
+    # Range lookups never match None
+    if value is None:
+        return False
+
+    if op == 'gt':
+        return value > expected
+
+    elif op == 'gte':
+        return value >= expected
+
+    elif op == 'lt':
+        return value < expected
+
+    elif op == 'lte':
+        return value <= expected
+
+    low, high = expected
+    return low <= value <= high
+
+
+class HashIndex(object):
+    """Index for exact and `in` lookups, values must be hashable"""
+
+    kind = 'hash'
+
+    def __init__(self):
+        self._ids = {}
+
+    def add(self, item_id, value):
+        self._ids.setdefault(value, set()).add(item_id)
+
+    def remove(self, item_id, value):
+        ids = self._ids.get(value)
+
+        if ids is not None:
+            ids.discard(item_id)
+
+            if not ids:
+                del self._ids[value]
+
+    def lookup(self, op, expected):
+        """Get ids matching the lookup or None if this index can't be used for `op`"""
+        if op == 'exact':
+            return set(self._ids.get(expected, ()))
+
+        elif op == 'in':
+            result = set()
+
+            for value in expected:
+                result.update(self._ids.get(value, ()))
+
+            return result
+
+        return None
+
+
+class SortedIndex(object):
+    """Index for exact, `in` and range lookups, values must be comparable
+
+    New entries are buffered and the index is sorted lazily on the next lookup, so bulk inserts stay cheap.
+    """
+
+    kind = 'sorted'
+
+    def __init__(self):
+        self._entries = []
+        self._keys = []
+        self._none = set()
+        self._dirty = False
+
+    def add(self, item_id, value):
+        if value is None:
+            self._none.add(item_id)
+
+        else:
+            self._entries.append((value, item_id))
+            self._dirty = True
+
+    def remove(self, item_id, value):
+        if value is None:
+            self._none.discard(item_id)
+
+        else:
+            self._ensure_sorted()
+
+            start = bisect.bisect_left(self._keys, value)
+            end = bisect.bisect_right(self._keys, value)
+
+            for position in range(start, end):
+                if self._entries[position][1] == item_id:
+                    del self._entries[position]
+                    del self._keys[position]
+
+                    break
+
+    def _ensure_sorted(self):
+        if self._dirty:
+            self._entries.sort(key=lambda entry: entry[0])
+            self._keys = [entry[0] for entry in self._entries]
+            self._dirty = False
+
+    def _slice(self, start, end):
+        return set([entry[1] for entry in self._entries[start:end]])
+
+    def lookup(self, op, expected):
+        """Get ids matching the lookup or None if this index can't be used for `op`"""
+        if op == 'in':
+            result = set()
+
+            for value in expected:
+                result.update(self.lookup('exact', value))
+
+            return result
+
+        if expected is None:
+            return set(self._none) if op == 'exact' else set()
+
+        self._ensure_sorted()
+        keys = self._keys
+
+        if op == 'exact':
+            return self._slice(bisect.bisect_left(keys, expected), bisect.bisect_right(keys, expected))
+
+        elif op == 'gt':
+            return self._slice(bisect.bisect_right(keys, expected), None)
+
+        elif op == 'gte':
+            return self._slice(bisect.bisect_left(keys, expected), None)
+
+        elif op == 'lt':
+            return self._slice(0, bisect.bisect_left(keys, expected))
+
+        elif op == 'lte':
+            return self._slice(0, bisect.bisect_right(keys, expected))
+
+        elif op == 'range':
+            low, high = expected
+            return self._slice(bisect.bisect_left(keys, low), bisect.bisect_right(keys, high))
+
+        return None
+
+
+INDEX_TYPES = {
+    HashIndex.kind: HashIndex,
+    SortedIndex.kind: SortedIndex,
+}
+
+
+class ContainerCollection(object):
+    """In-memory collection of OptionContainer instances with indexed field queries
+
+    Fields are specified by name, options of nested containers are referenced by joining the keys with
+    `__` (e.g. `child__host`). Lookups use the same syntax as Django querysets: a field name optionally
+    followed by one of `exact`, `in`, `gt`, `gte`, `lt`, `lte` or `range`.
+
+    Note:
+        Indexes are updated when containers are added or removed. If a container is modified after it was
+        added, `reindex` must be called for it.
+
+    Examples:
+        >>> tenants = ContainerCollection(TenantOptions, indexes={'verbosity': 'hash', 'created': 'sorted'})
+        >>> tenants.extend(load_tenants())
+
+        >>> tenants.filter(verbosity=3, created__gte=datetime.datetime(2016, 1, 1))
+
+    Args:
+        container_cls: OptionContainer subclass stored in this collection
+        indexes (Union[dict, list]): Fields to index, either a list of field names (hash indexes) or a
+            mapping of field name to index kind (`hash` or `sorted`)
+        items (list): Containers to add
+    """
+
+    def __init__(self, container_cls, indexes=None, items=None):
+        self.container_cls = container_cls
+
+        self._items = {}
+        self._ids = {}
+
+        # Values which were indexed for each item, needed to remove stale index entries
+        self._indexed = {}
+        self._next_id = 0
+        self._indexes = {}
+
+        if isinstance(indexes, (list, tuple)):
+            indexes = dict([(field, HashIndex.kind) for field in indexes])
+
+        for field, kind in (indexes or {}).items():
+            self.add_index(field, kind)
+
+        if items:
+            self.extend(items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items.values())
+
+    def __contains__(self, container):
+        return id(container) in self._ids
+
+    def _parse_field(self, field):
+        path = tuple(field.split(LOOKUP_SEPARATOR))
+
+        container_cls = self.container_cls
+
+        for i, key in enumerate(path):
+            if key not in container_cls.defs:
+                raise InvalidOption(_('Invalid key {key} for {identifier}'), key=key, identifier=container_cls.__name__)
+
+            if i + 1 < len(path):
+                if key not in container_cls.nested_keys:
+                    raise InvalidOption(_('Key {key} for {identifier} is not a nested container'),
+                                        key=key, identifier=container_cls.__name__)
+
+                container_cls = container_cls.defs[key]._container_cls
+
+        return path
+
+    def _parse_lookup(self, lookup):
+        field, _sep, op = lookup.rpartition(LOOKUP_SEPARATOR)
+
+        if not field or op not in LOOKUPS:
+            field, op = lookup, 'exact'
+
+        return field, self._parse_field(field), op
+
+    @staticmethod
+    def _resolve(container, path):
+        for key in path:
+            container = container[key]
+
+        return container
+
+    def add_index(self, field, kind=HashIndex.kind):
+        """Add an index for `field` (`hash` or `sorted`)"""
+        assert kind in INDEX_TYPES, 'Unknown index kind {0}'.format(kind)
+
+        path = self._parse_field(field)
+        index = INDEX_TYPES[kind]()
+
+        for item_id, container in self._items.items():
+            value = self._resolve(container, path)
+
+            index.add(item_id, value)
+            self._indexed[item_id][field] = value
+
+        self._indexes[field] = (path, index)
+
+    def add(self, container):
+        """Add `container` to the collection"""
+        if not isinstance(container, self.container_cls):
+            raise InvalidOption(_('Provided OptionContainer instance {value} is not a subclass {container_cls}'),
+                                value=container,
+                                container_cls=self.container_cls)
+
+        if id(container) in self._ids:
+            return
+
+        item_id = self._next_id
+        self._next_id += 1
+
+        self._items[item_id] = container
+        self._ids[id(container)] = item_id
+        self._indexed[item_id] = {}
+
+        self._add_to_indexes(item_id)
+
+    def extend(self, containers):
+        for container in containers:
+            self.add(container)
+
+    def remove(self, container):
+        """Remove `container` from the collection
+
+        Raises:
+            KeyError: If the container is not in the collection
+        """
+        item_id = self._ids.pop(id(container))
+
+        self._remove_from_indexes(item_id)
+
+        del self._items[item_id]
+        del self._indexed[item_id]
+
+    def _add_to_indexes(self, item_id):
+        container = self._items[item_id]
+        indexed = self._indexed[item_id]
+
+        for field, (path, index) in self._indexes.items():
+            value = self._resolve(container, path)
+
+            index.add(item_id, value)
+            indexed[field] = value
+
+    def _remove_from_indexes(self, item_id):
+        indexed = self._indexed[item_id]
+
+        for field, (path, index) in self._indexes.items():
+            index.remove(item_id, indexed.pop(field))
+
+    def reindex(self, container):
+        """Update indexes after `container` was modified
+
+        Raises:
+            KeyError: If the container is not in the collection
+        """
+        item_id = self._ids[id(container)]
+
+        self._remove_from_indexes(item_id)
+        self._add_to_indexes(item_id)
+
+    def filter(self, **lookups):
+        """Get all containers matching `lookups` (in insertion order)
+
+        Indexed lookups are resolved via indexes, remaining lookups are checked for the matching containers only.
+
+        Returns:
+            list
+        """
+        candidates = None
+        remaining = []
+
+        for lookup, expected in lookups.items():
+            field, path, op = self._parse_lookup(lookup)
+
+            ids = None
+
+            if field in self._indexes:
+                ids = self._indexes[field][1].lookup(op, expected)
+
+            if ids is None:
+                remaining.append((path, op, expected))
+
+            else:
+                candidates = ids if candidates is None else candidates & ids
+
+        if candidates is None:
+            candidates = self._items.keys()
+
+        result = []
+
+        for item_id in sorted(candidates):
+            container = self._items[item_id]
+
+            if all([_check(op, self._resolve(container, path), expected) for path, op, expected in remaining]):
+                result.append(container)
+
+        return result
+
+    def count(self, **lookups):
+        return len(self.filter(**lookups))
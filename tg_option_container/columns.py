@@ -0,0 +1,365 @@
+from array import array
+from gettext import gettext as _
+
+import six
+
+from tg_option_container.container import OptionContainer, container_as_dict
+from tg_option_container.types import BooleanValidator, IntegerValidator, InvalidOption, ListValidator, StringValidator, TypeValidator, Undefined
+
+
+try:
+    from collections.abc import Mapping, Sequence
+
+except ImportError:  # pragma: no cover
+    from collections import Mapping, Sequence
+
+
+# Validators which only check the type of the value (see `TypeValidator.accepts`)
+TYPE_CHECKS = (TypeValidator, IntegerValidator, BooleanValidator, StringValidator)
+
+
+def _compact(column):
+    """Store columns of plain ints or floats in arrays, other columns are kept as lists"""
+    if not column:
+        return column
+
+    first_type = type(column[0])
+
+    if first_type in (int, float) and all([type(x) is first_type for x in column]):
+        try:
+            return array('q' if first_type is int else 'd', column)
+
+        except OverflowError:
+            pass
+
+    return column
+
+
+def _cell_error(name, index, error):
+    # Add key param here, since Options don't know their key
+    error.add_params(key=name)
+
+    return InvalidOption('{key}[{index}]:{inner}', index=index, inner=str(error))
+
+
+def _run_validator(validator, value):
+    if not validator(value):
+        raise InvalidOption('Invalid value `{value}` for option `{key}`', value=value)
+
+
+def _validate_column(name, definition, column, validated=frozenset()):
+    """Clean and validate all values of `column` against `definition`
+
+    If the option has no cleaners, validators are run column by column (so each validator is looked up
+    once per column instead of once per cell).
+
+    Args:
+        validated (set): Indexes of cells which are already cleaned and validated (e.g. defaults), they are skipped
+
+    Returns:
+        list: The cleaned column
+    """
+    if definition.clean:
+        validate = definition.validate
+        result = []
+
+        for index, value in enumerate(column):
+            if index in validated:
+                result.append(value)
+                continue
+
+            try:
+                result.append(validate(value))
+
+            except InvalidOption as e:
+                raise _cell_error(name, index, e)
+
+        return result
+
+    if validated:
+        cells = [(index, value) for index, value in enumerate(column) if index not in validated]
+
+    else:
+        cells = None
+
+    for validator in definition.validators:
+        if type(validator) in TYPE_CHECKS:
+            # Fast path for plain type checks, only build the error for the first failing cell
+            accepts = validator.accepts
+            invalid = [cell for cell in (enumerate(column) if cells is None else cells) if not accepts(cell[1])]
+            failing = invalid[:1]
+
+        else:
+            failing = enumerate(column) if cells is None else cells
+
+        for index, value in failing:
+            try:
+                _run_validator(validator, value)
+
+            except InvalidOption as e:
+                raise _cell_error(name, index, e)
+
+    if definition.intern:
+        intern_value = definition.intern_value
+        column = [intern_value(value) for value in column]
+
+    return column
+
+
+class ContainerColumns(Sequence):
+    """Columnar storage for a list of containers of the same class
+
+    Values are stored in one column per option (an `array` for plain int and float columns) instead of one
+    container object per item. Items are returned as read-only `ContainerRow` proxies.
+
+    Attributes:
+        container_cls: OptionContainer subclass of the items
+    """
+
+    __slots__ = ('container_cls', '_columns', '_length')
+
+    def __init__(self, container_cls, columns, length):
+        self.container_cls = container_cls
+
+        self._columns = columns
+        self._length = length
+
+    @classmethod
+    def from_rows(cls, container_cls, rows, validate=True):
+        """Construct columns from a list of dictionaries (or `container_cls` instances)
+
+        Args:
+            container_cls: OptionContainer subclass of the items
+            rows (list): Items to store
+            validate (bool): If False the values are assumed to be valid (see `OptionContainer.from_trusted`)
+
+        Raises:
+            InvalidOption: If validation fails
+        """
+        identifier = getattr(container_cls, 'name', container_cls.__name__)
+        rows = [dict(row._items()) if isinstance(row, (OptionContainer, ContainerRow)) else row for row in rows]
+
+        # Catch invalid keys before invalid values
+        keys = set()
+
+        for row in rows:
+            keys.update(row.keys())
+
+        if not keys.issubset(container_cls.defs):
+            for index, row in enumerate(rows):
+                for key in row.keys():
+                    if key not in container_cls.defs:
+                        error = InvalidOption(_('Invalid key {key} for {identifier}'), key=key, identifier=identifier)
+
+                        raise InvalidOption('{key}[{index}]:{inner}', index=index, inner=str(error))
+
+        undefined = Undefined()
+        columns = {}
+
+        for name, definition in container_cls.defs.items():
+            column = [row.get(name, undefined) for row in rows]
+
+            if validate:
+                # String values of coercing containers are parsed before they are validated
+                parser = container_cls._coercers.get(name)
+
+                if parser is not None:
+                    for index, value in enumerate(column):
+                        if isinstance(value, six.string_types):
+                            try:
+                                column[index] = parser(value)
+
+                            except InvalidOption as e:
+                                raise _cell_error(name, index, e)
+
+                # Pre-validated class level defaults can be used for missing cells
+                default = container_cls._shared_defaults.get(name, undefined)
+
+                # Missing cells are validated here, `_validate_column` skips them so cleaners don't run twice
+                filled = set()
+
+                for index, value in enumerate(column):
+                    if value is undefined or (value is None and definition.none_to_default):
+                        filled.add(index)
+
+                        if default is not undefined:
+                            column[index] = default
+                            continue
+
+                        try:
+                            column[index] = definition.validate(value)
+
+                        except InvalidOption as e:
+                            raise _cell_error(name, index, e)
+
+                column = _validate_column(name, definition, column, filled)
+
+            else:
+                for index, value in enumerate(column):
+                    if value is undefined:
+                        column[index] = definition.validate(value)
+
+                    elif name in container_cls.nested_keys and isinstance(value, dict):
+                        column[index] = definition._container_cls.from_trusted(value)
+
+            # Set `_parent` attribute for child container instances
+            if name in container_cls.nested_keys:
+                for value in column:
+                    setattr(value, '_parent', True)
+
+            columns[name] = _compact(column)
+
+        if validate:
+            for rule in container_cls._rules:
+                for index, values in enumerate(zip(*[columns[field] for field in rule.fields])):
+                    try:
+                        rule(*values)
+
+                    except InvalidOption as e:
+                        raise InvalidOption('{key}[{index}]:{inner}', index=index, inner=str(e))
+
+        return cls(container_cls, columns, len(rows))
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            columns = dict([(name, column[index]) for name, column in self._columns.items()])
+
+            return ContainerColumns(self.container_cls, columns, len(range(*index.indices(self._length))))
+
+        if index < 0:
+            index += self._length
+
+        if not 0 <= index < self._length:
+            raise IndexError('ContainerColumns index out of range')
+
+        return ContainerRow(self, index)
+
+    def __eq__(self, other):
+        if isinstance(other, ContainerColumns):
+            return self.container_cls is other.container_cls and self.as_list() == other.as_list()
+
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __getstate__(self):
+        return self.container_cls, self._columns, self._length
+
+    def __setstate__(self, state):
+        self.container_cls, self._columns, self._length = state
+
+    def __str__(self):
+        return '<ContainerColumns {0} len={1}>'.format(self.container_cls.__name__, self._length)
+
+    def __repr__(self):
+        return self.__str__()
+
+    def column(self, name):
+        """Get all values of option `name` (an `array` for plain int and float columns)
+
+        Raises:
+            KeyError: If `name` is not a valid option
+        """
+        return self._columns[name]
+
+    def as_list(self):
+        """Get a list of dictionary representations of all items"""
+        return [row.as_dict() for row in self]
+
+
+class ContainerRow(Mapping):
+    """Read-only proxy of a single item in ContainerColumns"""
+
+    __slots__ = ('_columns', '_index')
+
+    def __init__(self, columns, index):
+        self._columns = columns
+        self._index = index
+
+    @property
+    def definitions(self):
+        return self._columns.container_cls.defs
+
+    @property
+    def identifier(self):
+        container_cls = self._columns.container_cls
+
+        return getattr(container_cls, 'name', container_cls.__name__)
+
+    def __getitem__(self, key):
+        return self._columns._columns[key][self._index]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+
+        except KeyError:
+            return default
+
+    def __iter__(self):
+        return iter(self._columns._columns)
+
+    def __len__(self):
+        return len(self._columns._columns)
+
+    def _items(self):
+        index = self._index
+
+        for name, column in self._columns._columns.items():
+            yield name, column[index]
+
+    def __str__(self):
+        return self.representation()
+
+    def __repr__(self):
+        return '<ContainerRow {0}[{1}]>'.format(self._columns.container_cls.__name__, self._index)
+
+    def to_container(self):
+        """Get a (detached) OptionContainer instance with the values of this item"""
+        return self._columns.container_cls.from_trusted(self.as_dict())
+
+    def as_dict(self):
+        return container_as_dict(self)
+
+    def representation(self, level=0):
+        return self.to_container().representation(level)
+
+
+class ColumnarListValidator(ListValidator):
+    """Validate the value is a list of I{expected_type} containers and store it as ContainerColumns
+    """
+
+    columnar = True
+
+    def __str__(self):
+        return '<ColumnarListValidator expected_type={0} allow_empty={1}>'.format(
+            self.expected_type,
+            self.allow_empty,
+        )
+
+    def _clean(self, value):
+        if isinstance(value, ContainerColumns) and value.container_cls is self.expected_type:
+            return value
+
+        # This is just a sanity check
+        if not isinstance(value, list):
+            raise InvalidOption(_('Expected type {expected_type} for option `{key}`, provided type is {value_type}.'),
+                                value_type=type(value),
+                                expected_type=list)
+
+        return ContainerColumns.from_rows(self.expected_type, value)
+
+    def __call__(self, value):
+        if not isinstance(value, ContainerColumns) or value.container_cls is not self.expected_type:
+            raise InvalidOption(_('Expected all items in list to be {expected_type} for option `{key}`.'),
+                                expected_type=self.expected_type)
+
+        return True
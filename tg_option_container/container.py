@@ -1,8 +1,27 @@
+import copy
+import threading
+
 from gettext import gettext as _
 
 import six
 
-from tg_option_container.types import InvalidOption, Undefined
+from tg_option_container import metrics
+from tg_option_container.coercion import get_parser
+from tg_option_container.types import InvalidOption, Undefined, is_immutable
+
+
+try:
+    from collections.abc import ItemsView, KeysView, Mapping, Sequence, ValuesView
+
+except ImportError:  # pragma: no cover
+    from collections import ItemsView, KeysView, Mapping, Sequence, ValuesView
+
+
+# Number of parts collected before `write_representation` writes them to the file object
+REPRESENTATION_CHUNK_PARTS = 1024
+
+# Appended to representations which exceed max_length
+TRUNCATED_MARKER = '... (truncated)'
 
 
 class PropsMetaClass(type):
@@ -32,6 +51,20 @@ class PropsMetaClass(type):
         # Assign nested_keys value
         klass = cls.assign_nested_keys(klass)
 
+        # Assign container level rules and their dependencies
+        klass = cls.assign_rules(klass, *parents)
+
+        # Assign string parsers of coercing containers
+        klass = cls.assign_coercers(klass)
+
+        # Assign pre-validated defaults
+        klass = cls.assign_defaults(klass)
+
+        # Constructor values are passed to `set` of subclasses which override it
+        roots = [x for x in klass.__mro__ if isinstance(x, PropsMetaClass)]
+        defining = [x for x in klass.__mro__ if 'set' in x.__dict__]
+        setattr(klass, '_overrides_set', bool(defining) and defining[0] is not roots[-1])
+
         return klass
 
     def __str__(self):
@@ -52,6 +85,101 @@ class PropsMetaClass(type):
 
         return klass
 
+    @staticmethod
+    def assign_rules(klass, *parents):
+        """Collect rules from the inheritance chain and map each option to the rules which read it"""
+        rules = []
+
+        for parent in parents:
+            rules.extend(parent._rules)
+
+        # Only the rules declared on this class, inherited ones were already collected from the parents
+        own_rules = klass.__dict__.get('rules', [])
+
+        if not isinstance(own_rules, list):
+            raise TypeError('{0}.rules should be a list'.format(klass.__name__))
+
+        rules.extend(own_rules)
+
+        rule_deps = {}
+
+        for index, rule in enumerate(rules):
+            for field in rule.fields:
+                assert field in klass.defs, 'Rule {0} of {1} reads unknown option {2}'.format(rule, klass.__name__, field)
+
+                rule_deps.setdefault(field, []).append(index)
+
+        setattr(klass, '_rules', tuple(rules))
+        setattr(klass, '_rule_deps', rule_deps)
+
+        return klass
+
+    @staticmethod
+    def assign_coercers(klass):
+        coercers = {}
+
+        if getattr(klass, 'coerce', False):
+            for name, definition in klass.defs.items():
+                parser = get_parser(definition)
+
+                if parser is not None:
+                    coercers[name] = parser
+
+        setattr(klass, '_coercers', coercers)
+
+        return klass
+
+    @staticmethod
+    def assign_defaults(klass):
+        """Validate defaults once per class
+
+        Immutable defaults (and nested containers which only contain immutable values, they are copied on write) are
+        shared between all instances, other defaults are deep-copied for each instance. Callable defaults
+        (`resolve_default`) and defaults which fail validation are validated on every construction.
+        """
+        shared_defaults = {}
+        copied_defaults = {}
+
+        async_keys = set([name for name, definition in klass.defs.items() if definition.is_async()])
+
+        # Used by `Option.is_async` of options containing this class, so it's only computed once per class
+        setattr(klass, '_has_async', bool(async_keys))
+
+        for name, definition in klass.defs.items():
+            if definition.resolve_default or name in async_keys:
+                continue
+
+            try:
+                value = definition.validate(Undefined())
+
+            except Exception:
+                # Invalid defaults must be provided explicitly, the error is raised when they are not. Custom
+                # validators might not expect default values so we also catch other errors here.
+                continue
+
+            if isinstance(type(value), PropsMetaClass) and _is_frozen_container(value):
+                setattr(value, '_shared', True)
+                setattr(value, '_parent', True)
+                shared_defaults[name] = value
+
+            elif is_immutable(value):
+                shared_defaults[name] = value
+
+            else:
+                copied_defaults[name] = value
+
+        setattr(klass, '_shared_defaults', shared_defaults)
+        setattr(klass, '_copied_defaults', copied_defaults)
+
+        # Keys which need work on every construction (copying or validating the default)
+        setattr(klass, '_instance_defaults', tuple([name for name in klass.defs.keys() if name not in shared_defaults]))
+
+        # Template of the stored values of non-sparse containers (in definition order), values of `_instance_defaults`
+        # are placeholders which are replaced on construction
+        setattr(klass, '_default_values', dict([(name, shared_defaults.get(name)) for name in klass.defs.keys()]))
+
+        return klass
+
     @staticmethod
     def reduce_props(klass, *parents):
         props = {}
@@ -104,63 +232,387 @@ class OptionContainer(six.with_metaclass(PropsMetaClass)):
         >>>     ]
 
         Note: `ExtendedSampleOptions` accepts both `timeout` and `verbosity` props.
+
+    Attributes:
+        rules (list): Container level validators (see `tg_option_container.types.Rule`) which check multiple options
+            together. Rules are inherited from parent containers. When a key is changed only the rules which read it
+            are evaluated, before the new value is stored.
+        thread_safe (bool): If True, writes are serialized with a lock and never modify values in place. Instead
+            the values (and nested containers on the modified path) are copied and swapped in atomically, which
+            allows lock-free reads from other threads. Use `snapshot` to get a consistent view of multiple keys.
+        sparse (bool): If True, only explicitly set values (and defaults which can't be shared) are stored on the
+            instance, reads fall back to the class level pre-validated defaults. Memory usage and construction time
+            then scale with the number of provided values instead of the number of options.
+        coerce (bool): If True, string values of integer, float, boolean, iso8601, list and nested options are parsed
+            before validation (see `tg_option_container.coercion`). Intended for data from environment variables,
+            query strings or CSV files. Lists accept JSON arrays and comma separated values, nested options accept JSON
+            objects. Nested containers only coerce their values if they also set `coerce`.
+        representation_limits (dict): Limits (max_depth, max_items and max_length) used by `__str__`, see
+            `write_representation`
     """
 
+    thread_safe = False
+    sparse = False
+    coerce = False
+    representation_limits = {}
+
+    # True while the constructor passes values to an overridden `set`
+    _constructing = False
+
     def __init__(self, **kwargs):
+        self._setup()
+
+        # First set all user defined stuff. This is needed since we want
+        # to be sure we catch invalid keys before invalid values
+        if self._overrides_set:
+            # Subclasses can normalise values in `set`, rules are checked once all values are known
+            self._constructing = True
+
+            try:
+                for key, value in kwargs.items():
+                    self.set(key, value)
+
+            finally:
+                del self._constructing
+
+        else:
+            for key, value in kwargs.items():
+                self._set(key, value, check_rules=False)
+
+        # Set all the defaults
+        self._set_defaults()
+
+        # Rules are checked once all values are known
+        self._check_rules(self._rules)
+
+    def _set_defaults(self):
+        values = self._values
+
+        # Sparse containers fall back to class level defaults, others store them on the instance. Provided values
+        # come first, then the defaults in definition order, built with dict operations instead of a loop over defs.
+        if not self.sparse:
+            if values:
+                self._values = dict(values)
+                self._values.update(self._default_values)
+                self._values.update(values)
+
+            else:
+                self._values = dict(self._default_values)
+
+        for key in self._instance_defaults:
+            if key in values:
+                continue
+
+            if key in self._copied_defaults:
+                self._assign(key, copy.deepcopy(self._copied_defaults[key]))
+
+            else:
+                self._set(key, Undefined(), check_rules=False)
+
+    def _setup(self):
         self.identifier = getattr(self, 'name', self.__class__.__name__)
-        self.definitions = {}
-        self.values = {}
+        self._values = {}
 
-        for name, definition in self.defs.items():
-            assert name == definition.name
-            self.definitions[definition.name] = definition
+        if self.thread_safe:
+            self._lock = threading.Lock()
 
-        # populate all key
-        values = dict([(x, Undefined()) for x in self.defs.keys()])
+        # Definitions are shared with the class, they must never be modified per instance
+        self.definitions = self.defs
 
-        # Update the ones that were provided
-        values.update(kwargs)
+    @classmethod
+    def from_trusted(cls, data):
+        """Construct a container from already validated data
 
-        # First set all user defined stuff. This is needed since we want
-        # to be sure we catch invalid keys before invalid values
-        for key in kwargs.keys():
-            self.set(key, values[key])
+        Values are assigned directly without running cleaners and validators, this is intended for loading
+        data that was produced by `as_dict` of a validated container. Nested containers and lists of containers
+        are constructed the same way. Options missing from `data` are set to their defaults.
+
+        Args:
+            data (dict): Already validated values for this container
+
+        Raises:
+            InvalidOption: If `data` contains a key that is not valid for this container
+        """
+        inst = cls.__new__(cls)
+        inst._setup()
+
+        # Catch invalid keys before assigning anything
+        for key in data.keys():
+            if key not in inst.definitions:
+                raise InvalidOption(_('Invalid key {key} for {identifier}'), key=key, identifier=inst.identifier)
+
+        for key, value in data.items():
+            container_cls = getattr(inst.definitions[key], '_container_cls', None)
 
-            del values[key]
+            if container_cls is not None:
+                if key in cls.nested_keys:
+                    if isinstance(value, dict):
+                        value = container_cls.from_trusted(value)
 
-        # Set all the default
-        for key, value in values.items():
-            self.set(key, value)
+                elif getattr(inst.definitions[key], '_columnar', False):
+                    from tg_option_container.columns import ContainerColumns
+
+                    if not isinstance(value, ContainerColumns):
+                        value = ContainerColumns.from_rows(container_cls, value, validate=False)
+
+                else:
+                    value = [container_cls.from_trusted(x) if isinstance(x, dict) else x for x in value]
+
+            inst._assign(key, value)
+
+        # Set all the defaults
+        inst._set_defaults()
+
+        return inst
+
+    @classmethod
+    def validate_fields(cls, data, fields):
+        """Construct a container validating only `fields` of `data`
+
+        The remaining options are validated (or set to their defaults) when they are first accessed via `get`,
+        until then they are not included when iterating the container (or in `as_dict`). Container level rules
+        are not checked since they could read options which are not validated yet.
+
+        Examples:
+            >>> options = SampleOptions.validate_fields(payload, ['verbosity', ('database', 'host')])
+
+        Args:
+            data (dict): Values for the container
+            fields (list): Option names to validate, tuples can be used to only validate some options of nested
+                containers (see `set`)
+
+        Raises:
+            InvalidOption: If `data` or `fields` contain a key that is not valid for this container or if
+                validating one of the `fields` fails
+        """
+        inst = cls.__new__(cls)
+        inst._setup()
+
+        # Catch invalid keys before invalid values
+        for key in data.keys():
+            if key not in inst.definitions:
+                raise InvalidOption(_('Invalid key {key} for {identifier}'), key=key, identifier=inst.identifier)
+
+        # Build a tree of the requested paths, None marks options which are validated fully
+        tree = {}
+
+        for field in fields:
+            path = field if isinstance(field, tuple) else (field, )
+            node = tree
+
+            for index, key in enumerate(path):
+                if index == len(path) - 1:
+                    node[key] = None
+
+                elif node.get(key, {}) is None:
+                    break
+
+                else:
+                    node = node.setdefault(key, {})
+
+        for key, subtree in tree.items():
+            if key not in inst.definitions:
+                raise InvalidOption(_('Invalid key {key} for {identifier}'), key=key, identifier=inst.identifier)
+
+            value = data.get(key, Undefined())
+
+            if subtree is not None:
+                if key not in cls.nested_keys:
+                    raise InvalidOption(_('Key {key} for {identifier} is not a nested container'), key=key, identifier=inst.identifier)
+
+                if isinstance(value, Undefined):
+                    value = {}
+
+                if isinstance(value, dict):
+                    try:
+                        value = inst.definitions[key]._container_cls.validate_fields(value, list(_iter_paths(subtree)))
+
+                    except InvalidOption as e:
+                        raise InvalidOption('{key}:{inner}', key=key, inner=str(e))
+
+            inst._set(key, value, check_rules=False)
+
+        inst._pending = dict((key, value) for key, value in data.items() if key not in tree)
+
+        return inst
+
+    @classmethod
+    def partial(cls, fields, **kwargs):
+        """Construct a container validating only `fields`, see `validate_fields`
+
+        Examples:
+            >>> options = SampleOptions.partial(['verbosity'], verbosity=1, timeout=30)
+        """
+        return cls.validate_fields(kwargs, fields)
+
+    def _resolve_pending(self, key):
+        """Validate a value which was skipped by `validate_fields`"""
+        # The raw value is kept until it is valid, so reading an invalid value raises every time
+        self._set(key, self._pending.get(key, Undefined()), allow_nested_set=True, check_rules=False)
+        self._pending.pop(key, None)
+
+        return self._values[key]
+
+    def __getstate__(self):
+        state = {
+            'values': self._values,
+        }
+
+        if hasattr(self, '_parent'):
+            state['_parent'] = True
+
+        if hasattr(self, '_pending'):
+            state['_pending'] = self._pending
+
+        return state
+
+    def __setstate__(self, state):
+        self._setup()
+        self._values = state['values']
+
+        if state.get('_parent', False):
+            setattr(self, '_parent', True)
+
+        if '_pending' in state:
+            self._pending = dict(state['_pending'])
+
+    def __reduce__(self):
+        # Only the class reference and values are serialized, definitions are restored from the class
+        return _new_container, (self.__class__, ), self.__getstate__()
+
+    def __copy__(self):
+        inst = _new_container(self.__class__)
+        inst.__setstate__(self.__getstate__())
+        inst._values = dict(self._values)
+
+        # Nested containers are shared with the copy, mark them so they are copied before modification
+        for key in self.nested_keys:
+            if key in inst._values:
+                setattr(inst._values[key], '_shared', True)
+
+        return inst
+
+    def __deepcopy__(self, memo):
+        inst = _new_container(self.__class__)
+        memo[id(self)] = inst
+
+        state = self.__getstate__()
+        state['values'] = copy.deepcopy(self._values, memo)
+        inst.__setstate__(state)
+
+        return inst
+
+    def clone(self, changes=None):
+        """Create a copy of this container with `changes` applied
+
+        Uses structural sharing: only the containers on the paths of changed keys are copied, all other
+        values are shared with the original container.
+
+        Note:
+            Lists (including lists of containers) are also shared, they should be replaced via `set` instead of
+            being modified in place.
+
+        Args:
+            changes (dict): Mapping of keys to their new values, keys can also be tuples (see `set`)
+
+        Returns:
+            OptionContainer
+
+        Raises:
+            InvalidOption: If validation fails
+        """
+        inst = copy.copy(self)
+        inst._apply_changes(changes or {})
+
+        return inst
+
+    @classmethod
+    def avalidate(cls, **kwargs):
+        """Asynchronously construct a container, see `tg_option_container.aio.validate_container`
+
+        Coroutine cleaners and validators of all options (including nested containers) are executed
+        concurrently, synchronous ones behave exactly like they do in the constructor.
+
+        Examples:
+            >>> options = await SampleOptions.avalidate(verbosity=1)
+
+        Returns:
+            Awaitable which resolves to an instance of this container
+
+        Raises:
+            InvalidOption: If validation fails (when awaited)
+        """
+        from tg_option_container.aio import validate_container
+
+        return validate_container(cls, kwargs)
+
+    @classmethod
+    def validate_frame(cls, frame):
+        """Validate the rows of a pandas DataFrame (or pyarrow Table), see `tg_option_container.frames.validate_frame`
+
+        Returns:
+            FrameValidationResult: with a boolean mask of invalid rows and the error details
+        """
+        from tg_option_container.frames import validate_frame
+
+        return validate_frame(cls, frame)
+
+    @classmethod
+    def to_frame(cls, containers):
+        """Build a pandas DataFrame from a list of containers, see `tg_option_container.frames.to_frame`
+
+        Returns:
+            pandas.DataFrame
+        """
+        from tg_option_container.frames import to_frame
+
+        return to_frame(cls, containers)
 
     def __str__(self):
-        return self.representation()
+        return self.representation(**self.representation_limits)
 
-    def representation(self, level=0):
-        name = self.__class__.__name__
+    def representation(self, level=0, max_depth=None, max_items=None, max_length=None):
+        """Get a human readable representation of this OptionContainer (and all nested containers)
 
-        if self.identifier and self.identifier != name:
-            name = '{0} {1}'.format(name, self.identifier)
+        Args:
+            level (int): Indentation level
+            max_depth, max_items, max_length: Limits, see `write_representation`
 
-        definitions = []
+        Returns:
+            str
+        """
+        parts = []
+        _write_representation(parts.append, self, level, max_depth, max_items, max_length)
 
-        for key, value in self.values.items():
-            if isinstance(value, OptionContainer):
-                value = value.representation(level + 1)
+        return ''.join(parts)
 
-            elif getattr(self.definitions[key], '_list_of_containers', None):
-                glue = '\n{0}'.format('\t' * (level + 2))
-                value = '{0}{1}'.format(
-                    glue,
-                    glue.join(['{0}: {1}'.format(i, x.representation(level + 2)) for i, x in enumerate(value)])
-                )
+    def write_representation(self, fp, level=0, max_depth=None, max_items=None, max_length=None):
+        """Stream the human readable representation of this OptionContainer to a file-like object
 
-            definitions.append('{0}{1}: {2}'.format('\t' * (level + 1), key, value))
+        Nested containers are traversed iteratively and the output is produced lazily, so with limits set the cost
+        is bounded by the size of the output instead of the size of the container.
 
-        return '<{name}>:\n{defs}'.format(
-            name=name,
+        Args:
+            fp: Text file-like object to write to
+            level (int): Indentation level
+            max_depth (int): Nested containers deeper than this are shown as `<Name>: ...`
+            max_items (int): Only the first items of lists (and lists of containers) are shown, followed by the number
+                of remaining items
+            max_length (int): Maximum number of characters, longer output is cut and ends with a truncation marker
+        """
+        buffer = []
 
-            defs='\n'.join(definitions),
-        )
+        def write(part):
+            buffer.append(part)
+
+            if len(buffer) >= REPRESENTATION_CHUNK_PARTS:
+                fp.write(''.join(buffer))
+                del buffer[:]
+
+        _write_representation(write, self, level, max_depth, max_items, max_length)
+
+        if buffer:
+            fp.write(''.join(buffer))
 
     def typedef(self):
         return str(self.__class__)
@@ -169,38 +621,127 @@ class OptionContainer(six.with_metaclass(PropsMetaClass)):
         return self.get(item)
 
     def __len__(self):
-        return len(self.values)
+        if self.sparse:
+            # Only the stored (and pending) values are scanned, so this scales with the number of overrides
+            shared_defaults = self._shared_defaults
+            pending = [key for key in getattr(self, '_pending', ()) if key in shared_defaults]
+
+            return len(shared_defaults) + len([key for key in self._values if key not in shared_defaults]) - len(pending)
+
+        return len(self._values)
 
     def __iter__(self):
-        return iter(self.values.items())
+        return (key for key, value in self._items())
+
+    def __contains__(self, key):
+        if key in self._values:
+            return True
+
+        return self.sparse and key in self._shared_defaults and key not in getattr(self, '_pending', ())
+
+    def __eq__(self, other):
+        # Same semantics as `Mapping.__eq__`, which registered classes don't inherit
+        if not isinstance(other, Mapping):
+            return NotImplemented
+
+        return dict(self._items()) == dict(other.items())
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def keys(self):
+        return KeysView(self)
+
+    def items(self):
+        return ItemsView(self)
+
+    def values(self):
+        return ValuesView(self)
+
+    def _items(self):
+        """Iterate over (key, value) pairs including the class level defaults of sparse containers"""
+        values = self._values
+
+        for item in values.items():
+            yield item
+
+        if self.sparse:
+            # Pending values (see `validate_fields`) replace the defaults once they are validated
+            pending = getattr(self, '_pending', ())
+
+            for key, value in self._shared_defaults.items():
+                if key not in values and key not in pending:
+                    yield key, value
 
     def as_dict(self):
         """Get a dictionary representation of this OptionContainer
         Returns:
             dict
         """
+        return container_as_dict(self)
 
-        result = {}
+    def to_json(self, fp=None, **opts):
+        """Encode this OptionContainer as JSON, see `tg_option_container.serialization.to_json`
 
-        for key, value in self.values.items():
-            if key in self.nested_keys:
-                result[key] = value.as_dict()
+        Values are encoded directly (datetime values as ISO 8601 strings) without building an intermediate
+        dictionary via `as_dict`. Uses orjson if it is installed.
 
-            elif getattr(self.definitions[key], '_list_of_containers', None):
-                result[key] = [inner.as_dict() for inner in value]
+        Args:
+            fp: File-like object to stream the output to, if not provided the result is returned as bytes
+            **opts: sort_keys, default and backend, see `tg_option_container.serialization.to_json`
 
-            else:
-                result[key] = value
+        Returns:
+            bytes: If `fp` is not provided
+        """
+        from tg_option_container.serialization import to_json
 
-        return result
+        return to_json(self, fp=fp, **opts)
+
+    def as_mapping(self):
+        """Get a read-only view of this OptionContainer
+
+        Unlike `as_dict` nothing is copied, nested containers and lists of containers are wrapped in views
+        when they are accessed.
+
+        Returns:
+            ContainerView
+        """
+        return ContainerView(self)
 
-    def get(self, key):
+    def get(self, key, default=Undefined):
         """Get value of `key`
 
+        Args:
+            key (str): Key to get
+            default: If provided, returned when `key` does not exist
+
         Raises:
-            KeyError: If key does not exist
+            KeyError: If key does not exist and `default` is not provided
         """
-        return self.values[key]
+        try:
+            return self._values[key]
+
+        except KeyError:
+            pending = getattr(self, '_pending', None)
+
+            # Options skipped by `validate_fields` are validated on first access
+            if pending is not None and key in pending:
+                return self._resolve_pending(key)
+
+            if self.sparse and key in self._shared_defaults:
+                return self._shared_defaults[key]
+
+            if pending is not None and key in self.definitions:
+                return self._resolve_pending(key)
+
+            if default is not Undefined:
+                return default
+
+            raise
 
     def set(self, key, value):
         """Set `key` to `value`
@@ -218,25 +759,107 @@ class OptionContainer(six.with_metaclass(PropsMetaClass)):
             NotImplementedError: If the current option container instance is nested
         """
 
+        if self._constructing:
+            return self._set(key, value, check_rules=False)
+
+        if self.thread_safe:
+            return self.update({key: value})
+
         return self._set(key, value)
 
-    def _set(self, key, value, allow_nested_set=False):
+    def update(self, changes):
+        """Set multiple keys at once
+
+        Changes are applied to a copy of this container and the values are swapped in with a single
+        assignment, so either all or none of the changes are applied. In `thread_safe` mode concurrent
+        readers see either the old or the new values, never a mix of them.
+
+        Args:
+            changes (dict): Mapping of keys to their new values, keys can also be tuples (see `set`)
+
+        Raises:
+            InvalidOption: If validation fails
+            NotImplementedError: If the current option container instance is nested
+        """
+        self._check_not_nested()
+
+        if self.thread_safe:
+            with self._lock:
+                self._update(changes)
+
+        else:
+            self._update(changes)
+
+    def _update(self, changes):
+        # Nested containers are shared with the working copy, so ones on changed paths are copied on write
+        working = copy.copy(self)
+        working._apply_changes(changes)
+
+        self._values = working._values
+
+    def _apply_changes(self, changes):
+        for key, value in changes.items():
+            self._set(key, value, allow_nested_set=True, check_rules=False)
+
+        # Rules are checked once all changes are applied, so related keys can be changed together
+        self._check_rules(self._rules_for([key[0] if isinstance(key, tuple) else key for key in changes.keys()]))
+
+    def _rules_for(self, keys):
+        """Get the rules which read any of `keys` (in declaration order)"""
+        indices = set()
+
+        for key in keys:
+            indices.update(self._rule_deps.get(key, ()))
+
+        return [self._rules[index] for index in sorted(indices)]
+
+    def _check_rules(self, rules, candidates=None):
+        """Evaluate `rules`, values in `candidates` are used instead of the stored ones"""
+        for rule in rules:
+            rule(*[candidates[field] if candidates and field in candidates else self.get(field) for field in rule.fields])
+
+    def snapshot(self):
+        """Get a consistent point-in-time view of this container
+
+        In `thread_safe` mode values are never modified in place, so the snapshot shares them with this
+        container and creating it is O(1).
+
+        Returns:
+            OptionContainer
+        """
+        if not self.thread_safe:
+            return copy.copy(self)
+
+        inst = _new_container(self.__class__)
+        inst.__setstate__(self.__getstate__())
+
+        return inst
+
+    def _check_not_nested(self):
+        if hasattr(self, '_parent'):
+            raise NotImplementedError(_('Calling set on nested option containers is not allowed, '
+                                        'please use set method of root container'))
+
+    def _set(self, key, value, allow_nested_set=False, check_rules=True):
         if not allow_nested_set:
-            if hasattr(self, '_parent'):
-                raise NotImplementedError(_('Calling set on nested option containers is not allowed, '
-                                            'please use set method of root container'))
+            self._check_not_nested()
 
         if isinstance(key, tuple):
             assert len(key) > 0, 'Nested keys must contain items'
 
-            self._set_nested(key, value, root=True)
+            self._set_nested(key, value, root=True, check_rules=check_rules)
 
         else:
             if key not in self.definitions:
                 raise InvalidOption(_('Invalid key {key} for {identifier}'), key=key, identifier=self.identifier)
 
+            registry = metrics.registry
+
+            if registry is not None:
+                started = registry.start_container()
+
             try:
-                value = self.definitions[key].validate(value)
+                value = self.definitions[key].validate(self._coerce(key, value))
 
             except InvalidOption as e:
                 # Add key param here, since Options don't know their key
@@ -245,45 +868,277 @@ class OptionContainer(six.with_metaclass(PropsMetaClass)):
                 # Re-raise
                 raise e
 
-            # Set `_parent` attribute for child container instance
-            if key in self.nested_keys:
-                setattr(value, '_parent', True)
+            finally:
+                if registry is not None:
+                    registry.record_container(self.__class__.__name__, started)
+
+            if check_rules and key in self._rule_deps:
+                self._check_rules(self._rules_for([key]), {key: value})
+
+            self._assign(key, value)
+
+    def _coerce(self, key, value):
+        """Parse string `value` if this container coerces values of `key`"""
+        parser = self._coercers.get(key)
+
+        if parser is not None and isinstance(value, six.string_types):
+            return parser(value)
 
-            self.values[key] = value
+        return value
 
-    def _set_nested(self, key_path, value, root=False):
+    def _assign(self, key, value):
+        """Store an already validated `value` for `key`"""
+
+        # Set `_parent` attribute for child container instance
+        if key in self.nested_keys:
+            setattr(value, '_parent', True)
+
+        self._values[key] = value
+
+    def _set_nested(self, key_path, value, root=False, check_rules=True):
         keys = list(key_path)
 
-        key = keys.pop(0)
-        children_count = len(keys)
-        was_single_set_error = False
+        # Containers on the path (walked iteratively), items are (container, key, child, check_child_rules)
+        path = []
+        container = self
 
         try:
-            if key not in self.definitions:
-                was_single_set_error = True
-                raise InvalidOption(_('Invalid key {key} for {identifier}'), key=key, identifier=self.identifier)
+            for key in keys[:-1]:
+                if key not in container.definitions:
+                    raise InvalidOption(_('Invalid key {key} for {identifier}'), key=key, identifier=container.identifier)
 
-            if children_count and key not in self.nested_keys:
-                was_single_set_error = True
-                raise InvalidOption(_('Key {key} for {identifier} is not a nested container'), key=key, identifier=self.identifier)
+                if key not in container.nested_keys:
+                    raise InvalidOption(_('Key {key} for {identifier} is not a nested container'), key=key, identifier=container.identifier)
 
-            if children_count:
-                # Has child, use it's _set directly (so we can set allow_nested_set to True)
-                self.values[key]._set(tuple(keys), value, allow_nested_set=True)
+                child = container.get(key)
 
-            else:
-                try:
-                    # We have reached the end of the chain, use self.set
-                    self._set(key, value, allow_nested_set=True)
+                # Only rules of the root can be deferred (see `_apply_changes`)
+                check_child_rules = (check_rules or container is not self) and key in container._rule_deps
+
+                # Child is shared with a copy of its parent (or rules of the parent must accept the modified
+                # child before it is stored), copy it before modifying
+                if check_child_rules or getattr(child, '_shared', False):
+                    child = copy.copy(child)
+
+                path.append((container, key, child, check_child_rules))
+                container = child
 
-                except InvalidOption:
-                    was_single_set_error = True
+            # We have reached the end of the chain, use _set of the last container
+            container._set(keys[-1], value, allow_nested_set=True, check_rules=check_rules or container is not self)
 
-                    raise
+            # Store modified children bottom-up, rules of each parent are checked before its child is stored. The
+            # parent is removed from the path first, so errors of its rules are prefixed with the keys above it.
+            while path:
+                container, key, child, check_child_rules = path.pop()
+
+                if check_child_rules:
+                    container._check_rules(container._rules_for([key]), {key: child})
+
+                container._values[key] = child
 
         except InvalidOption as e:
-            if not children_count or (root and was_single_set_error):
+            # Errors are prefixed with the keys of the containers above the one which raised it
+            depth = len(path)
+
+            if not depth:
                 raise e
 
+            inner = ''.join(['{0}:'.format(item[1]) for item in path[1:]])
+
+            raise InvalidOption('{key}{inner}', inner=inner + str(e), key='{0}:'.format(path[0][1]))
+
+
+def _is_frozen_container(container):
+    """Check if all values of `container` (and its nested containers) are immutable
+
+    Copy on write only copies the containers on the modified path, so containers with mutable values (e.g. lists)
+    can't be shared.
+    """
+    stack = [container]
+
+    while stack:
+        for key, value in stack.pop()._items():
+            if isinstance(value, OptionContainer):
+                stack.append(value)
+
+            elif not is_immutable(value):
+                return False
+
+    return True
+
+
+# Option containers are read-only mappings (writes only happen through `set`)
+Mapping.register(OptionContainer)
+
+
+class ContainerView(Mapping):
+    """Read-only view of an OptionContainer
+
+    Nested containers and lists of containers are returned as views too.
+    """
+
+    __slots__ = ('_container', )
+
+    def __init__(self, container):
+        self._container = container
+
+    def __getitem__(self, key):
+        value = self._container[key]
+
+        if isinstance(value, OptionContainer):
+            return ContainerView(value)
+
+        elif getattr(self._container.definitions[key], '_list_of_containers', None):
+            return ContainerListView(value)
+
+        return value
+
+    def __iter__(self):
+        return iter(self._container)
+
+    def __len__(self):
+        return len(self._container)
+
+    def __contains__(self, key):
+        return key in self._container
+
+    def __repr__(self):
+        return '<ContainerView {0}>'.format(self._container.identifier)
+
+
+class ContainerListView(Sequence):
+    """Read-only view of a list of OptionContainers"""
+
+    __slots__ = ('_items', )
+
+    def __init__(self, items):
+        self._items = items
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ContainerListView(self._items[index])
+
+        return ContainerView(self._items[index])
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return '<ContainerListView len={0}>'.format(len(self._items))
+
+
+def _format_value(value, max_items):
+    if max_items is not None and isinstance(value, (list, tuple)) and len(value) > max_items:
+        return '[{0}, ... ({1} more)]'.format(', '.join([repr(x) for x in value[:max_items]]), len(value) - max_items)
+
+    return '{0}'.format(value)
+
+
+def _representation_parts(container, level, depth, max_depth, max_items):
+    """Yield the representation of `container`, nested containers are yielded as (container, level, depth)"""
+    if not isinstance(container, OptionContainer):
+        # Rows of columnar lists
+        container = container.to_container()
+
+    name = container.__class__.__name__
+
+    if container.identifier and container.identifier != name:
+        name = '{0} {1}'.format(name, container.identifier)
+
+    if max_depth is not None and depth > max_depth:
+        yield '<{0}>: ...'.format(name)
+        return
+
+    yield '<{0}>:\n'.format(name)
+
+    indent = '\t' * (level + 1)
+
+    for index, (key, value) in enumerate(container._items()):
+        yield '{0}{1}{2}: '.format('\n' if index else '', indent, key)
+
+        if isinstance(value, OptionContainer):
+            yield value, level + 1, depth + 1
+
+        elif getattr(container.definitions[key], '_list_of_containers', None):
+            glue = '\n{0}'.format('\t' * (level + 2))
+            yield glue
+
+            for i, inner in enumerate(value):
+                if max_items is not None and i >= max_items:
+                    yield '{0}... ({1} more)'.format(glue, len(value) - i)
+                    break
+
+                yield '{0}{1}: '.format(glue if i else '', i)
+                yield inner, level + 2, depth + 1
+
+        else:
+            yield _format_value(value, max_items)
+
+
+def _write_representation(write, root, level, max_depth, max_items, max_length):
+    # Explicit stack of generators (one per container being written)
+    stack = [_representation_parts(root, level, 0, max_depth, max_items)]
+    written = 0
+
+    while stack:
+        try:
+            part = next(stack[-1])
+
+        except StopIteration:
+            stack.pop()
+            continue
+
+        if isinstance(part, tuple):
+            stack.append(_representation_parts(part[0], part[1], part[2], max_depth, max_items))
+            continue
+
+        if max_length is not None and written + len(part) > max_length:
+            write(part[:max_length - written])
+            write(TRUNCATED_MARKER)
+            return
+
+        written += len(part)
+        write(part)
+
+
+def container_as_dict(root):
+    """Convert `root` (an OptionContainer or a row of ContainerColumns) to a dictionary iteratively"""
+    result = {}
+    stack = [(root, result)]
+
+    while stack:
+        container, target = stack.pop()
+        definitions = container.definitions
+
+        for key, value in container._items():
+            if isinstance(value, OptionContainer):
+                target[key] = {}
+                stack.append((value, target[key]))
+
+            elif getattr(definitions[key], '_list_of_containers', None):
+                items = target[key] = []
+
+                for inner in value:
+                    items.append({})
+                    stack.append((inner, items[-1]))
+
             else:
-                raise InvalidOption('{key}{inner}', inner=str(e), key='{0}:'.format(key))
+                target[key] = value
+
+    return result
+
+
+def _iter_paths(tree, prefix=()):
+    """Convert a tree built by `OptionContainer.validate_fields` back to a list of paths"""
+    for key, subtree in tree.items():
+        if subtree is None:
+            yield prefix + (key, )
+
+        else:
+            for path in _iter_paths(subtree, prefix + (key, )):
+                yield path
+
+
+def _new_container(container_cls):
+    """Create an empty instance of `container_cls` without running validation (used for unpickling and copying)"""
+    return container_cls.__new__(container_cls)
@@ -0,0 +1,304 @@
+"""pandas (and pyarrow) bridge for validating and exporting tabular data
+
+Note:
+    pandas is an optional dependency, it's only imported when `OptionContainer.validate_frame` or
+    `OptionContainer.to_frame` is used.
+"""
+from gettext import gettext as _
+
+import pandas as pd
+import six
+
+from pandas.api import types as dtypes
+
+from tg_option_container.columns import ContainerColumns
+from tg_option_container.types import (ChoicesValidator, InvalidOption, ListValidator, MaxValueValidator, MinValueValidator, RangeValidator,
+                                       TypeValidator, Undefined, clean_datetime)
+
+
+VECTORIZED_VALIDATORS = (TypeValidator, ChoicesValidator, MinValueValidator, MaxValueValidator, RangeValidator)
+
+
+class FrameValidationResult(object):
+    """Result of `validate_frame`
+
+    Attributes:
+        invalid (pandas.Series): Boolean mask of invalid rows (indexed like the validated frame)
+        errors (list): Error details, dictionaries with `row` (index label), `option` and `error` (message) keys
+    """
+
+    def __init__(self, invalid, errors):
+        self.invalid = invalid
+        self.errors = errors
+
+    def __str__(self):
+        return '<FrameValidationResult invalid_rows={0} errors={1}>'.format(int(self.invalid.sum()), len(self.errors))
+
+    def __repr__(self):  # pragma: no cover
+        return self.__str__()
+
+    def __bool__(self):
+        return not bool(self.invalid.any())
+
+    __nonzero__ = __bool__
+
+    @property
+    def valid(self):
+        """Boolean mask of valid rows"""
+        return ~self.invalid
+
+
+def _to_python(value):
+    """Convert numpy/pandas scalars to the python values `Container(**row)` would receive"""
+    if value is pd.NaT:
+        return None
+
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+
+    if hasattr(value, 'item') and dtypes.is_scalar(value):
+        value = value.item()
+
+    try:
+        if pd.isna(value):
+            return None
+
+    except (TypeError, ValueError):
+        pass
+
+    return value
+
+
+def _cell_value(container_cls, name, value):
+    """Convert a cell to the value `Container(**row)` would validate (string cells of coercing containers are parsed)"""
+    value = _to_python(value)
+    parser = container_cls._coercers.get(name)
+
+    if parser is not None and isinstance(value, six.string_types):
+        return parser(value)
+
+    return value
+
+
+def _is_vectorizable(definition):
+    if any([x is not clean_datetime for x in definition.clean]):
+        return False
+
+    return all([isinstance(x, VECTORIZED_VALIDATORS) and not isinstance(x, ListValidator) for x in definition.validators])
+
+
+def _passes(validator, value):
+    try:
+        return bool(validator(value))
+
+    except InvalidOption:
+        return False
+
+
+def _type_mask(series, validator):
+    """Boolean mask of cells which pass the type `validator`, checked via dtype where possible"""
+    expected_type = validator.expected_type
+    checks = [
+        (bool, dtypes.is_bool_dtype),
+        (int, lambda x: dtypes.is_integer_dtype(x) and not dtypes.is_bool_dtype(x)),
+        (float, dtypes.is_float_dtype),
+        (str, dtypes.is_string_dtype),
+    ]
+
+    for python_type, check in checks:
+        if expected_type is python_type and check(series.dtype) and not dtypes.is_object_dtype(series.dtype):
+            return pd.Series(True, index=series.index)
+
+    if dtypes.is_datetime64_any_dtype(series.dtype) and isinstance(expected_type, type) and issubclass(pd.Timestamp, expected_type):
+        return pd.Series(True, index=series.index)
+
+    # Fall back to checking each cell
+    return series.map(lambda value: _passes(validator, _to_python(value)))
+
+
+def _suspect_cells(definition, series):
+    """Boolean mask of cells which might be invalid (they are validated one by one)"""
+    if not _is_vectorizable(definition):
+        return pd.Series(True, index=series.index)
+
+    suspect = series.isna()
+
+    for validator in definition.validators:
+        if isinstance(validator, TypeValidator):
+            ok = _type_mask(series, validator)
+
+        elif isinstance(validator, ChoicesValidator):
+            ok = series.isin(validator.choices)
+
+        else:
+            values = series.where(~suspect)
+            min_value = getattr(validator, 'min_value', None)
+            max_value = getattr(validator, 'max_value', None)
+
+            try:
+                ok = pd.Series(True, index=series.index)
+
+                if min_value is not None:
+                    ok = ok & (values >= min_value)
+
+                if max_value is not None:
+                    ok = ok & (values <= max_value)
+
+            except TypeError:
+                ok = pd.Series(False, index=series.index)
+
+        suspect = suspect | ~ok.astype(bool)
+
+    return suspect
+
+
+def _rule_value(container_cls, frame, name, position):
+    """Value of option `name` in row `position` as `Container(**row)` would store it"""
+    definition = container_cls.defs[name]
+
+    if name in frame.columns:
+        return definition.validate(_cell_value(container_cls, name, frame[name].iloc[position]))
+
+    if name in container_cls._shared_defaults:
+        return container_cls._shared_defaults[name]
+
+    if name in container_cls._copied_defaults:
+        return container_cls._copied_defaults[name]
+
+    return definition.validate(Undefined())
+
+
+def _check_rules(container_cls, frame, invalid, errors):
+    """Evaluate container level rules for the rows which passed the per-option checks"""
+    for position, row in enumerate(frame.index):
+        if invalid.iloc[position]:
+            continue
+
+        values = {}
+
+        for rule in container_cls._rules:
+            for field in rule.fields:
+                if field not in values:
+                    values[field] = _rule_value(container_cls, frame, field, position)
+
+            try:
+                rule(*[values[field] for field in rule.fields])
+
+            except InvalidOption as e:
+                invalid.iloc[position] = True
+                errors.append({'row': row, 'option': ', '.join(rule.fields), 'error': str(e)})
+
+                break
+
+
+def validate_frame(container_cls, frame):
+    """Validate the rows of `frame` against `container_cls`
+
+    Columns are validated column-wise: types are checked via column dtypes, choices and min/max values via
+    vectorized comparisons. Only cells which fail these checks (and cells of options with custom cleaners or
+    validators) are validated one by one to get the exact error messages. Container level rules are evaluated for
+    the rows which pass the per-option checks, errors of rules use the names of the options they read as `option`.
+
+    Args:
+        container_cls: OptionContainer subclass to validate against
+        frame: pandas.DataFrame or pyarrow.Table, columns are option names
+
+    Returns:
+        FrameValidationResult
+
+    Raises:
+        InvalidOption: If `frame` contains a column that is not a valid option
+    """
+    if not isinstance(frame, pd.DataFrame) and hasattr(frame, 'to_pandas'):
+        frame = frame.to_pandas()
+
+    identifier = getattr(container_cls, 'name', container_cls.__name__)
+
+    for column in frame.columns:
+        if column not in container_cls.defs:
+            raise InvalidOption(_('Invalid key {key} for {identifier}'), key=column, identifier=identifier)
+
+    invalid = pd.Series(False, index=frame.index)
+    errors = []
+
+    for name, definition in container_cls.defs.items():
+        if name not in frame.columns:
+            # Defaults are used for missing columns
+            if name in container_cls._shared_defaults or name in container_cls._copied_defaults:
+                continue
+
+            try:
+                definition.validate(Undefined())
+
+            except InvalidOption as e:
+                e.add_params(key=name)
+
+                invalid[:] = True
+                errors.extend([{'row': row, 'option': name, 'error': str(e)} for row in frame.index])
+
+            continue
+
+        series = frame[name]
+
+        if name in container_cls._coercers:
+            # Cells are parsed before validation, so dtypes can't be used to check them
+            suspect = pd.Series(True, index=series.index)
+
+        else:
+            suspect = _suspect_cells(definition, series)
+
+        # Rows are tracked by position, index labels don't have to be unique (e.g. after `concat`)
+        for position in suspect.to_numpy().nonzero()[0]:
+            row = frame.index[position]
+            value = series.iloc[position]
+
+            try:
+                definition.validate(_cell_value(container_cls, name, value))
+
+            except InvalidOption as e:
+                e.add_params(key=name)
+
+                invalid.iloc[position] = True
+                errors.append({'row': row, 'option': name, 'error': str(e)})
+
+            except (TypeError, ValueError) as e:
+                # Cleaners may raise other errors for bad input (e.g. unparseable dates)
+                invalid.iloc[position] = True
+                errors.append({'row': row, 'option': name, 'error': str(e)})
+
+    if container_cls._rules:
+        _check_rules(container_cls, frame, invalid, errors)
+
+    return FrameValidationResult(invalid, errors)
+
+
+def to_frame(container_cls, containers):
+    """Build a DataFrame from `containers` (one row per container, one column per option)
+
+    Nested containers are converted to dictionaries. ContainerColumns are converted column by column.
+
+    Args:
+        container_cls: OptionContainer subclass of the containers
+        containers: List of `container_cls` instances or ContainerColumns
+
+    Returns:
+        pandas.DataFrame
+    """
+    columns = list(container_cls.defs.keys())
+
+    if isinstance(containers, ContainerColumns):
+        data = dict([(name, list(containers.column(name))) for name in columns])
+
+    else:
+        data = dict([(name, [container[name] for container in containers]) for name in columns])
+
+    for name in columns:
+        definition = container_cls.defs[name]
+
+        if name in container_cls.nested_keys:
+            data[name] = [value.as_dict() for value in data[name]]
+
+        elif getattr(definition, '_list_of_containers', None):
+            data[name] = [[inner.as_dict() for inner in value] for value in data[name]]
+
+    return pd.DataFrame(data, columns=columns)
@@ -0,0 +1,218 @@
+"""Validation metrics
+
+Counts option validations, failures by option name and error, and the time spent setting values per container class.
+Times are self-time, the time spent setting values of nested containers is only recorded for the nested classes.
+Metrics are disabled by default, when disabled the hooks in `Option.validate`, `OptionContainer._set` and the asyncio
+validation (see `tg_option_container.aio`) only check a module level attribute.
+
+Values set by `OptionContainer.avalidate` are counted, but their time is not recorded since awaiting interleaves them
+with other coroutines.
+
+Examples:
+    >>> from tg_option_container import metrics
+    >>> registry = metrics.enable()
+    >>> ...
+    >>> registry.snapshot()
+    >>> registry.to_prometheus()
+"""
+import threading
+import time
+
+
+clock = getattr(time, 'perf_counter', time.time)
+
+# Active registry, None when metrics are disabled
+registry = None
+
+
+def _error_label(error):
+    # The message template (without parameters) of InvalidOption has a bounded number of values
+    message = getattr(error, 'message', None)
+
+    if isinstance(message, str):
+        return message
+
+    return type(error).__name__
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _Shard(object):
+    """Metrics of a single thread, only modified by that thread"""
+
+    __slots__ = ('validations', 'failures', 'sets', 'seconds', 'timers')
+
+    def __init__(self):
+        self.validations = {}
+        self.failures = {}
+        self.sets = {}
+        self.seconds = {}
+
+        # Time spent in nested `_set` calls of the containers currently being set (see `start_container`)
+        self.timers = []
+
+
+def _merge(target, source):
+    # dict.copy is atomic, so shards can be read while their threads update them
+    for key, value in source.copy().items():
+        target[key] = target.get(key, 0) + value
+
+
+class MetricsRegistry(object):
+    """Thread-safe collection of validation metrics
+
+    Each thread records into its own counters, so recording never takes a lock. The counters of all threads are
+    merged by `snapshot` and `to_prometheus`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._local = threading.local()
+            self._shards = []
+
+    def _shard(self):
+        local = self._local
+
+        try:
+            return local.shard
+
+        except AttributeError:
+            shard = local.shard = _Shard()
+
+            with self._lock:
+                self._shards.append(shard)
+
+            return shard
+
+    def record_option(self, option, error=None):
+        """Record a validation of `option` (name), `error` is the raised exception if it failed"""
+        shard = self._shard()
+        shard.validations[option] = shard.validations.get(option, 0) + 1
+
+        if error is not None:
+            key = (option, _error_label(error))
+            shard.failures[key] = shard.failures.get(key, 0) + 1
+
+    def start_container(self):
+        """Start timing a value set on a container, must be followed by `record_container`
+
+        Returns:
+            float: Start time to pass to `record_container`
+        """
+        self._shard().timers.append(0.0)
+
+        return clock()
+
+    def record_container(self, container, started=None):
+        """Record setting a value of `container` (class name)
+
+        Time is only recorded if `started` (see `start_container`) is provided. It is self-time: time spent setting
+        values of nested containers is recorded for their classes and excluded from the parent.
+        """
+        shard = self._shard()
+        shard.sets[container] = shard.sets.get(container, 0) + 1
+
+        if started is not None:
+            elapsed = clock() - started
+            nested = shard.timers.pop() if shard.timers else 0.0
+
+            shard.seconds[container] = shard.seconds.get(container, 0.0) + elapsed - nested
+
+            if shard.timers:
+                shard.timers[-1] += elapsed
+
+    def _merged(self):
+        with self._lock:
+            shards = list(self._shards)
+
+        validations, failures, sets, seconds = {}, {}, {}, {}
+
+        for shard in shards:
+            _merge(validations, shard.validations)
+            _merge(failures, shard.failures)
+            _merge(sets, shard.sets)
+            _merge(seconds, shard.seconds)
+
+        return validations, failures, sets, seconds
+
+    def snapshot(self):
+        """Get a copy of all metrics
+
+        Returns:
+            dict: With keys `validations` (option -> count), `failures` (option -> error -> count),
+                `sets` (container -> count) and `seconds` (container -> cumulative self-time in seconds)
+        """
+        validations, failures, sets, seconds = self._merged()
+        nested_failures = {}
+
+        for (option, error), count in failures.items():
+            nested_failures.setdefault(option, {})[error] = count
+
+        return {
+            'validations': validations,
+            'failures': nested_failures,
+            'sets': sets,
+            'seconds': seconds,
+        }
+
+    def to_prometheus(self, prefix='tg_option_container'):
+        """Get all metrics in the Prometheus text exposition format
+
+        Returns:
+            str
+        """
+        validations, failures, sets, seconds = self._merged()
+
+        metrics = [
+            ('validations_total', 'Number of option validations', [
+                ({'option': option}, count) for option, count in validations.items()
+            ]),
+            ('failures_total', 'Number of failed option validations', [
+                ({'option': option, 'error': error}, count) for (option, error), count in failures.items()
+            ]),
+            ('sets_total', 'Number of values set on containers', [
+                ({'container': container}, count) for container, count in sets.items()
+            ]),
+            ('set_seconds_total', 'Cumulative time spent setting (validating) values of containers, excluding nested containers', [
+                ({'container': container}, value) for container, value in seconds.items()
+            ]),
+        ]
+
+        lines = []
+
+        for name, description, samples in metrics:
+            lines.append('# HELP {0}_{1} {2}'.format(prefix, name, description))
+            lines.append('# TYPE {0}_{1} counter'.format(prefix, name))
+
+            for labels, value in sorted(samples, key=lambda sample: sorted(sample[0].items())):
+                lines.append('{0}_{1}{{{2}}} {3}'.format(
+                    prefix, name, ','.join(['{0}="{1}"'.format(key, _escape(labels[key])) for key in sorted(labels)]), value,
+                ))
+
+        return '\n'.join(lines) + '\n'
+
+
+def enable(new_registry=None):
+    """Start collecting metrics into `new_registry` (or a new MetricsRegistry)
+
+    Returns:
+        MetricsRegistry
+    """
+    global registry
+
+    registry = new_registry or MetricsRegistry()
+
+    return registry
+
+
+def disable():
+    """Stop collecting metrics"""
+    global registry
+
+    registry = None
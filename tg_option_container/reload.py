@@ -0,0 +1,260 @@
+"""Hot reloading of containers from JSON / YAML files
+
+`ConfigLoader` binds a container class to a file and polls it for changes. On change only the subtrees whose raw
+data differs are re-validated, unchanged nested containers and list items are shared with the previous container
+(see `OptionContainer.clone`). The new container is swapped in atomically, readers always see either the old or the
+new container.
+"""
+import io
+import json
+import logging
+import os
+import threading
+
+from tg_option_container.types import InvalidOption, Undefined, freeze_value
+
+
+try:
+    import yaml
+
+except ImportError:  # pragma: no cover
+    yaml = None
+
+
+YAML_EXTENSIONS = ('.yml', '.yaml')
+
+logger = logging.getLogger(__name__)
+
+
+def load_file(path):
+    """Load raw data from a JSON or YAML (requires PyYAML) file"""
+    with io.open(path, 'r', encoding='utf-8') as handle:
+        if path.endswith(YAML_EXTENSIONS):
+            if yaml is None:
+                raise ImportError('PyYAML is required to load {0}'.format(path))
+
+            return yaml.safe_load(handle) or {}
+
+        return json.load(handle)
+
+
+def _only_container_clean(option):
+    # Children can only be reused if no custom cleaners would receive them instead of the raw data
+    if len(option.clean) != 1:
+        return False
+
+    clean = option.clean[0]
+
+    return getattr(clean, 'container_cls', None) is not None or any(clean == getattr(x, 'clean', None) for x in option.validators)
+
+
+def _rebuild_list(container_cls, data, previous, previous_data):
+    if not isinstance(previous, list) or not isinstance(previous_data, list) or len(previous) != len(previous_data):
+        return data
+
+    available = {}
+
+    try:
+        for raw, item in zip(previous_data, previous):
+            available.setdefault(freeze_value(raw), []).append(item)
+
+        result = []
+
+        for raw in data:
+            reusable = available.get(freeze_value(raw))
+
+            if reusable:
+                item = reusable.pop(0)
+                setattr(item, '_shared', True)
+
+                result.append(item)
+
+            else:
+                result.append(raw)
+
+        return result
+
+    except TypeError:
+        return data
+
+
+def _unchanged(value, previous):
+    """Check if `value` equals `previous` including the types of all values (`1`, `1.0` and `True` differ)"""
+    try:
+        return freeze_value(value) == freeze_value(previous)
+
+    except TypeError:
+        return False
+
+
+def rebuild(container_cls, data, previous=None, previous_data=None):
+    """Construct a `container_cls` instance from `data`, reusing unchanged parts of `previous`
+
+    Args:
+        container_cls: OptionContainer subclass
+        data (dict): New raw data
+        previous (OptionContainer): Container previously built from `previous_data`
+        previous_data (dict): Raw data of the previous container
+
+    Returns:
+        OptionContainer
+
+    Raises:
+        InvalidOption: If validation fails
+    """
+    if previous is None or not isinstance(previous_data, dict) or not isinstance(data, dict):
+        return container_cls(**data)
+
+    changes = {}
+
+    for key in set(data) | set(previous_data):
+        if key not in data:
+            changes[key] = Undefined()
+
+            continue
+
+        value = data[key]
+
+        if key in previous_data and _unchanged(value, previous_data[key]):
+            continue
+
+        option = container_cls.defs.get(key)
+
+        if option is not None and key in previous_data and _only_container_clean(option):
+            if getattr(option, '_is_nested', False) and isinstance(value, dict):
+                try:
+                    value = rebuild(option._container_cls, value, previous.get(key), previous_data[key])
+
+                except InvalidOption as e:
+                    raise InvalidOption('{key}:{inner}', key=key, inner=str(e))
+
+            elif getattr(option, '_list_of_containers', False) and not option._columnar and isinstance(value, list):
+                value = _rebuild_list(option._container_cls, value, previous.get(key), previous_data[key])
+
+        changes[key] = value
+
+    return previous.clone(changes)
+
+
+class ConfigLoader(object):
+    """Keep a container in sync with a JSON / YAML file
+
+    Examples:
+        loader = ConfigLoader(Settings, '/etc/app/settings.yml', interval=2)
+        loader.start()
+
+        # Always returns the latest valid settings
+        loader.container['timeout']
+
+    Args:
+        container_cls: OptionContainer subclass
+        path (str): File to load, YAML files (.yml, .yaml) require PyYAML
+        interval (float): Polling interval in seconds used by `start`
+        on_reload (callable): Called with the new container after every successful reload
+        on_error (callable): Called with the exception if reloading fails, the previous container is kept. If not set,
+            `check` raises the exception and the background thread logs it
+
+    Raises:
+        InvalidOption: If the initial load fails
+    """
+
+    def __init__(self, container_cls, path, interval=1.0, on_reload=None, on_error=None):
+        self.container_cls = container_cls
+        self.path = path
+        self.interval = interval
+        self.on_reload = on_reload
+        self.on_error = on_error
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._data = None
+        self._stamp = None
+        self._container = None
+
+        self.load()
+
+    @property
+    def container(self):
+        """The current container"""
+        return self._container
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+
+        return getattr(stat, 'st_mtime_ns', stat.st_mtime), stat.st_size
+
+    def load(self):
+        """Load the file and swap in the new container
+
+        Returns:
+            bool: True if the container was replaced, False if the data did not change
+        """
+        with self._lock:
+            stamp = self._file_stamp()
+            data = load_file(self.path)
+
+            if self._container is not None and _unchanged(data, self._data):
+                self._stamp = stamp
+
+                return False
+
+            container = rebuild(self.container_cls, data, self._container, self._data)
+
+            self._data = data
+            self._stamp = stamp
+            self._container = container
+
+        if self.on_reload is not None:
+            self.on_reload(container)
+
+        return True
+
+    def check(self):
+        """Reload the file if it was modified since it was last loaded
+
+        Errors are passed to `on_error` (or raised if it is not set), the previous container is kept.
+
+        Returns:
+            bool: True if the container was replaced
+        """
+        try:
+            if self._file_stamp() == self._stamp:
+                return False
+
+            return self.load()
+
+        except (InvalidOption, ValueError, TypeError, ImportError, IOError, OSError) as e:
+            if self.on_error is None:
+                raise
+
+            self.on_error(e)
+
+            return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+
+            except Exception:
+                logger.exception('Failed to reload %s', self.path)
+
+    def start(self):
+        """Start watching the file in a background thread"""
+        assert self._thread is None, 'ConfigLoader is already running'
+
+        self._stop.clear()
+
+        self._thread = threading.Thread(target=self._run, name='ConfigLoader({0})'.format(self.path))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching the file"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+
+            self._thread = None
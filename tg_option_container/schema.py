@@ -0,0 +1,138 @@
+"""Container classes generated at runtime from schema documents
+
+Examples:
+    >>> Settings = build_container('Settings', {
+    >>>     'props': [
+    >>>         {'name': 'port', 'type': 'integer', 'default': 8080, 'min_value': 1},
+    >>>         {'name': 'hosts', 'type': 'list', 'default': [], 'inner_type': 'string'},
+    >>>         {'name': 'database', 'type': 'nested', 'spec': {'props': [{'name': 'host', 'type': 'string', 'default': 'localhost'}]}},
+    >>>     ],
+    >>> })
+"""
+import hashlib
+import json
+import threading
+
+from tg_option_container.container import OptionContainer
+from tg_option_container.types import Option, clear_shared_validators
+
+
+def _float(name, default, **kwargs):
+    kwargs.setdefault('expected_type', float)
+
+    return Option(name, default, **kwargs)
+
+
+OPTION_TYPES = {
+    'any': Option,
+    'integer': Option.integer,
+    'float': _float,
+    'boolean': Option.boolean,
+    'string': Option.string,
+    'iso8601': Option.iso8601,
+    'list': Option.list,
+}
+
+INNER_TYPES = {
+    'integer': int,
+    'float': float,
+    'boolean': bool,
+    'string': str,
+}
+
+# Class attributes which can be set by the spec
+CLASS_ATTRIBUTES = ('thread_safe', 'sparse', 'coerce')
+
+_lock = threading.RLock()
+_cache = {}
+
+
+def spec_hash(spec):
+    """Get a hash of the canonical (key order independent) form of `spec`"""
+    canonical = json.dumps(spec, sort_keys=True, separators=(',', ':'), default=repr)
+
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def _nested_name(option_name, spec):
+    # The name of the parent is not used, so nested classes can be shared between containers with different names
+    return spec.get('name', option_name)
+
+
+def _build_option(name, option_spec):
+    option_spec = dict(option_spec)
+
+    option_name = option_spec.pop('name')
+    option_type = option_spec.pop('type', 'any')
+
+    if option_type == 'nested':
+        nested_spec = option_spec.pop('spec')
+
+        return Option.nested(option_name, build_container(_nested_name(option_name, nested_spec), nested_spec, named=False), **option_spec)
+
+    if option_type not in OPTION_TYPES:
+        raise TypeError('Unknown option type {0} for {1}.{2}'.format(option_type, name, option_name))
+
+    if option_type == 'list':
+        inner_type = option_spec.get('inner_type', None)
+
+        if isinstance(inner_type, dict):
+            option_spec['inner_type'] = build_container(_nested_name(option_name, inner_type), inner_type, named=False)
+
+        elif inner_type is not None:
+            if inner_type not in INNER_TYPES:
+                raise TypeError('Unknown inner type {0} for {1}.{2}'.format(inner_type, name, option_name))
+
+            option_spec['inner_type'] = INNER_TYPES[inner_type]
+
+    return OPTION_TYPES[option_type](option_name, option_spec.pop('default', None), **option_spec)
+
+
+def build_container(name, spec, base=OptionContainer, named=True):
+    """Create an OptionContainer subclass from a schema document
+
+    Classes are cached by `name`, `base` and the hash of `spec`, building a container from an identical spec returns
+    the existing class. Nested specs are cached by `base` and their hash only, so identical nested specs are shared
+    between all containers using them. Nested classes are named after their option (or the `name` in their spec).
+
+    Args:
+        name (str): Name of the class
+        spec (dict): Schema document with `props` (list of option specs) and optionally `thread_safe`, `sparse` and
+            `coerce`. Option specs contain `name`, `type` (any, integer, float, boolean, string, iso8601, list or nested),
+            `default` and any other keyword arguments of the option (e.g. `choices`, `min_value`). Lists can have an
+            `inner_type` (a type name or a nested spec), nested options have a `spec` (which can contain a `name`).
+        base: OptionContainer subclass to extend
+        named (bool): If False, `name` is not part of the cache key. Identical specs built with different names then
+            share one class, which keeps the name it was first built with
+
+    Returns:
+        OptionContainer subclass
+
+    Raises:
+        TypeError: If the spec contains unknown option types
+    """
+    key = (name if named else None, base, spec_hash(spec))
+
+    try:
+        return _cache[key]
+
+    except KeyError:
+        pass
+
+    with _lock:
+        if key in _cache:
+            return _cache[key]
+
+        attrs = dict((attr, spec[attr]) for attr in CLASS_ATTRIBUTES if attr in spec)
+        attrs['props'] = [_build_option(name, option_spec) for option_spec in spec.get('props', [])]
+
+        container_cls = _cache[key] = type(str(name), (base, ), attrs)
+
+        return container_cls
+
+
+def clear_cache():
+    """Forget all classes created by `build_container` (and the shared validators referencing them)"""
+    with _lock:
+        _cache.clear()
+        clear_shared_validators()
@@ -0,0 +1,181 @@
+import datetime
+import io
+import json
+
+from tg_option_container.columns import ContainerColumns, ContainerRow
+from tg_option_container.container import OptionContainer
+
+
+try:
+    import orjson
+
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+# Size of the buffer which is collected before writing to the file object
+CHUNK_SIZE = 64 * 1024
+
+
+def _container_items(container, sort_keys):
+    items = container._items()
+
+    if sort_keys:
+        return sorted(items, key=lambda item: item[0])
+
+    return items
+
+
+def _make_default(default):
+    def _default(value):
+        if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+            return value.isoformat()
+
+        elif isinstance(value, (OptionContainer, ContainerRow)):
+            return dict(value._items())
+
+        elif isinstance(value, ContainerColumns):
+            return list(value)
+
+        elif default is not None:
+            return default(value)
+
+        raise TypeError('Object of type {0} is not JSON serializable'.format(type(value).__name__))
+
+    return _default
+
+
+def iter_json(container, sort_keys=False, default=None):
+    """Encode `container` as JSON, yielding the output in chunks
+
+    Values are read directly from the containers, no intermediate dictionaries are built.
+
+    Args:
+        container (OptionContainer): Container to encode
+        sort_keys (bool): If True, keys of containers and dictionaries are sorted
+        default (callable): Called for values which can't otherwise be serialized, should return a serializable value
+
+    Yields:
+        str
+    """
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), sort_keys=sort_keys, default=_make_default(default))
+    encode = encoder.encode
+
+    # Explicit stack of iterators, each item is (iterator, is_mapping, is_first)
+    stack = []
+    pending = [container]
+
+    while pending or stack:
+        if pending:
+            value = pending.pop()
+
+            if isinstance(value, (OptionContainer, ContainerRow)):
+                yield '{'
+                stack.append([iter(_container_items(value, sort_keys)), True, True])
+
+            elif isinstance(value, (list, tuple, ContainerColumns)):
+                yield '['
+                stack.append([iter(value), False, True])
+
+            elif isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+                yield encode(value.isoformat())
+
+            else:
+                yield encode(value)
+
+            continue
+
+        frame = stack[-1]
+
+        try:
+            item = next(frame[0])
+
+        except StopIteration:
+            stack.pop()
+            yield '}' if frame[1] else ']'
+
+            continue
+
+        if not frame[2]:
+            yield ','
+
+        frame[2] = False
+
+        if frame[1]:
+            key, item = item
+            yield encode(key)
+            yield ':'
+
+        pending.append(item)
+
+
+def _to_json_orjson(container, sort_keys, default):
+    # Non-string dictionary keys are converted to strings like the json module does
+    option = orjson.OPT_NON_STR_KEYS
+
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+
+    try:
+        return orjson.dumps(container, default=_make_default(default), option=option)
+
+    except TypeError:
+        # orjson doesn't support everything the json module does (e.g. integers larger than 64 bits), values which
+        # can't be serialized at all raise the error again
+        return ''.join(iter_json(container, sort_keys=sort_keys, default=default)).encode('utf-8')
+
+
+def to_json(container, fp=None, sort_keys=False, default=None, backend=None):
+    """Encode `container` as JSON
+
+    Args:
+        container (OptionContainer): Container to encode
+        fp: File-like object to write to (text or binary), if not provided the result is returned as bytes
+        sort_keys (bool): If True, keys of containers and dictionaries are sorted
+        default (callable): Called for values which can't otherwise be serialized, should return a serializable value
+        backend (str): Either `json` (streaming encoder) or `orjson`. Defaults to `orjson` if it is installed
+
+    Returns:
+        bytes: If `fp` is not provided
+    """
+    if backend is None:
+        backend = 'orjson' if orjson is not None else 'json'
+
+    assert backend in ('json', 'orjson'), 'Unknown JSON backend {0}'.format(backend)
+
+    is_text = isinstance(fp, io.TextIOBase)
+
+    if backend == 'orjson':
+        result = _to_json_orjson(container, sort_keys, default)
+
+        if fp is None:
+            return result
+
+        fp.write(result.decode('utf-8') if is_text else result)
+
+        return None
+
+    chunks = iter_json(container, sort_keys=sort_keys, default=default)
+
+    if fp is None:
+        return ''.join(chunks).encode('utf-8')
+
+    buffer = []
+    size = 0
+
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+
+        if size >= CHUNK_SIZE:
+            data = ''.join(buffer)
+            fp.write(data if is_text else data.encode('utf-8'))
+
+            buffer = []
+            size = 0
+
+    if buffer:
+        data = ''.join(buffer)
+        fp.write(data if is_text else data.encode('utf-8'))
+
+    return None
@@ -0,0 +1,314 @@
+"""Read-only container snapshots which can be shared between processes via mmap
+
+A validated container tree is frozen into a compact binary file once (e.g. in the master process of a
+pre-forking server) and opened by the workers with `open_snapshot`. Values are decoded lazily on access, so the
+tree is neither deserialized nor re-validated and the pages of the file are shared by all processes.
+
+File layout (little-endian):
+
+    header:     b'TGOC' | version (u8) | root offset (u64)
+    records:    tag (1 byte) | payload
+
+    N, T, F     None, True, False
+    i / d       int64 / float64
+    s / y       text / bytes: length (u32) | data
+    l           list: count (u32) | value offsets (u64 * count)
+    m           mapping: count (u32) | (key offset (u64), value offset (u64)) * count, sorted by the utf-8 key
+    p           any other value, pickled: length (u32) | data
+"""
+import mmap
+import os
+import struct
+
+import six
+
+from six.moves import cPickle as pickle
+
+from tg_option_container.container import OptionContainer
+
+
+try:
+    from collections.abc import Mapping, Sequence
+
+except ImportError:  # pragma: no cover
+    from collections import Mapping, Sequence
+
+
+MAGIC = b'TGOC'
+VERSION = 1
+
+HEADER = struct.Struct('<4sBQ')
+COUNT = struct.Struct('<I')
+OFFSET = struct.Struct('<Q')
+ENTRY = struct.Struct('<QQ')
+INT = struct.Struct('<q')
+FLOAT = struct.Struct('<d')
+
+INT_MIN = -2 ** 63
+INT_MAX = 2 ** 63 - 1
+
+
+class SnapshotWriter(object):
+    def __init__(self):
+        self.buffer = bytearray(HEADER.size)
+        self.strings = {}
+
+    def _append(self, tag, payload=b''):
+        offset = len(self.buffer)
+
+        self.buffer += tag
+        self.buffer += payload
+
+        return offset
+
+    def _sized(self, tag, data):
+        return self._append(tag, COUNT.pack(len(data)) + data)
+
+    def write_text(self, value):
+        # Keys and string values repeat a lot (e.g. in lists of containers), store each only once
+        try:
+            return self.strings[value]
+
+        except KeyError:
+            offset = self.strings[value] = self._sized(b's', value.encode('utf-8'))
+
+            return offset
+
+    def write(self, value):
+        if value is None:
+            return self._append(b'N')
+
+        elif value is True:
+            return self._append(b'T')
+
+        elif value is False:
+            return self._append(b'F')
+
+        elif isinstance(value, six.integer_types) and INT_MIN <= value <= INT_MAX:
+            return self._append(b'i', INT.pack(value))
+
+        elif isinstance(value, float):
+            return self._append(b'd', FLOAT.pack(value))
+
+        elif isinstance(value, six.text_type):
+            return self.write_text(value)
+
+        elif isinstance(value, six.binary_type):
+            return self._sized(b'y', value)
+
+        elif isinstance(value, (OptionContainer, Mapping)):
+            if not all(isinstance(key, six.string_types) for key in value.keys()):
+                return self._sized(b'p', pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+            items = sorted(((key.encode('utf-8'), item) for key, item in value.items()), key=lambda item: item[0])
+            entries = [(self.write_text(key.decode('utf-8')), self.write(item)) for key, item in items]
+
+            return self._append(b'm', COUNT.pack(len(entries)) + b''.join(ENTRY.pack(*entry) for entry in entries))
+
+        elif isinstance(value, (list, tuple, Sequence)):
+            offsets = [self.write(item) for item in value]
+
+            return self._append(b'l', COUNT.pack(len(offsets)) + b''.join(OFFSET.pack(offset) for offset in offsets))
+
+        return self._sized(b'p', pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+    def finish(self, root):
+        self.buffer[:HEADER.size] = HEADER.pack(MAGIC, VERSION, root)
+
+        return bytes(self.buffer)
+
+
+def freeze(container, path):
+    """Write `container` into a snapshot file at `path`
+
+    The file is written to a temporary path first and then moved into place, so processes which already opened
+    the previous snapshot keep a consistent view of it.
+
+    Args:
+        container (OptionContainer): Container to freeze, can also be a plain mapping
+        path (str): Destination file
+    """
+    writer = SnapshotWriter()
+    data = writer.finish(writer.write(container))
+
+    tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+
+    with open(tmp_path, 'wb') as handle:
+        handle.write(data)
+
+    getattr(os, 'replace', os.rename)(tmp_path, path)
+
+
+def open_snapshot(path):
+    """Open a snapshot file created with `freeze`
+
+    The file is mapped into memory, it is unmapped once all views referencing it are garbage collected.
+
+    Returns:
+        SnapshotView: Read-only view of the root container
+
+    Raises:
+        ValueError: If the file is not a valid snapshot
+    """
+    with open(path, 'rb') as handle:
+        buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(buffer) < HEADER.size:
+        raise ValueError('{0} is not a valid snapshot'.format(path))
+
+    magic, version, root = HEADER.unpack_from(buffer, 0)
+
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('{0} is not a valid snapshot'.format(path))
+
+    return _read(buffer, root)
+
+
+def _read_bytes(buffer, offset):
+    size, = COUNT.unpack_from(buffer, offset + 1)
+    start = offset + 1 + COUNT.size
+
+    return buffer[start:start + size]
+
+
+def _read(buffer, offset):
+    tag = buffer[offset:offset + 1]
+
+    if tag == b's':
+        return _read_bytes(buffer, offset).decode('utf-8')
+
+    elif tag == b'i':
+        return INT.unpack_from(buffer, offset + 1)[0]
+
+    elif tag == b'm':
+        return SnapshotView(buffer, offset)
+
+    elif tag == b'l':
+        return SnapshotList(buffer, offset)
+
+    elif tag == b'N':
+        return None
+
+    elif tag == b'T':
+        return True
+
+    elif tag == b'F':
+        return False
+
+    elif tag == b'd':
+        return FLOAT.unpack_from(buffer, offset + 1)[0]
+
+    elif tag == b'y':
+        return _read_bytes(buffer, offset)
+
+    elif tag == b'p':
+        return pickle.loads(_read_bytes(buffer, offset))
+
+    raise ValueError('Corrupt snapshot, unknown tag {0!r} at {1}'.format(tag, offset))
+
+
+def _materialize(value):
+    if isinstance(value, (SnapshotView, SnapshotList)):
+        return value.as_dict() if isinstance(value, SnapshotView) else value.as_list()
+
+    return value
+
+
+class SnapshotView(Mapping):
+    """Read-only view of a container (or dictionary) stored in a snapshot
+
+    Keys are looked up with a binary search directly in the mapped file, nested containers are returned as views.
+    """
+
+    __slots__ = ('_buffer', '_offset', '_count')
+
+    def __init__(self, buffer, offset):
+        self._buffer = buffer
+        self._offset = offset
+        self._count = COUNT.unpack_from(buffer, offset + 1)[0]
+
+    def _entry(self, index):
+        return ENTRY.unpack_from(self._buffer, self._offset + 1 + COUNT.size + index * ENTRY.size)
+
+    def _key(self, index):
+        return _read_bytes(self._buffer, self._entry(index)[0])
+
+    def __getitem__(self, key):
+        needle = key.encode('utf-8') if isinstance(key, six.text_type) else key
+
+        low, high = 0, self._count
+
+        while low < high:
+            middle = (low + high) // 2
+            current = self._key(middle)
+
+            if current < needle:
+                low = middle + 1
+
+            elif current > needle:
+                high = middle
+
+            else:
+                return _read(self._buffer, self._entry(middle)[1])
+
+        raise KeyError(key)
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self._key(index).decode('utf-8')
+
+    def __len__(self):
+        return self._count
+
+    def as_dict(self):
+        return dict((key, _materialize(value)) for key, value in self.items())
+
+    def __repr__(self):
+        return 'SnapshotView({0!r})'.format(self.as_dict())
+
+
+class SnapshotList(Sequence):
+    """Read-only view of a list stored in a snapshot"""
+
+    __slots__ = ('_buffer', '_offset', '_count')
+
+    def __init__(self, buffer, offset):
+        self._buffer = buffer
+        self._offset = offset
+        self._count = COUNT.unpack_from(buffer, offset + 1)[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+
+        if index < 0:
+            index += self._count
+
+        if not 0 <= index < self._count:
+            raise IndexError('Snapshot list index out of range')
+
+        offset, = OFFSET.unpack_from(self._buffer, self._offset + 1 + COUNT.size + index * OFFSET.size)
+
+        return _read(self._buffer, offset)
+
+    def __len__(self):
+        return self._count
+
+    def as_list(self):
+        return [_materialize(value) for value in self]
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, SnapshotList)):
+            return self.as_list() == list(other)
+
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'SnapshotList({0!r})'.format(self.as_list())
@@ -1,9 +1,19 @@
 import datetime
+import decimal
 import inspect
+import threading
+import weakref
+
+from collections import OrderedDict
 
 from gettext import gettext as _
 
 import dateutil.parser
+import six
+
+from six.moves import intern
+
+from tg_option_container import metrics
 
 
 class InvalidOption(AttributeError):
@@ -62,6 +72,30 @@ class MaxValueValidator(object):
         return True
 
 
+class RangeValidator(object):
+    """Validate the value is between I{min_value} and I{max_value} (inclusive)
+
+    Note:
+        Used instead of separate MinValueValidator and MaxValueValidator instances when an option defines both
+    """
+
+    def __init__(self, min_value, max_value):
+        self.min_value = min_value
+        self.max_value = max_value
+
+    def __str__(self):
+        return '<RangeValidator min_value={0} max_value={1}>'.format(self.min_value, self.max_value)
+
+    def __call__(self, value):
+        if value < self.min_value:
+            raise InvalidOption(_('Ensure value for option `{key}` is greater than or equal to {min_value}'), min_value=self.min_value)
+
+        if value > self.max_value:
+            raise InvalidOption(_('Ensure value for option `{key}` is less than or equal to {max_value}'), max_value=self.max_value)
+
+        return True
+
+
 class ChoicesValidator(object):
     """Validate the value is in I{choices}
     """
@@ -84,9 +118,27 @@ class ChoicesValidator(object):
 
         self.choices = choices
 
+        # Canonical choice objects by (type, value), types are part of the key so `1` and `True` don't collide
+        self._canonical = {}
+
+        for choice in choices:
+            try:
+                self._canonical.setdefault((type(choice), choice), choice)
+
+            except TypeError:
+                pass
+
     def __str__(self):
         return '<ChoicesValidator choices={0}>'.format(self.choices)
 
+    def canonical(self, value):
+        """Get the choice object equal to `value` (or `value` itself if there is none)"""
+        try:
+            return self._canonical.get((type(value), value), value)
+
+        except TypeError:
+            return value
+
     def __call__(self, value):
         if value not in self.choices:
             raise InvalidOption(_('Invalid choice {value} for option `{key}`, choices are {choices}.'), value=value, choices=self.choices)
@@ -113,13 +165,72 @@ class TypeValidator(object):
             ' append={0}'.format(self.append) if self.append else '',
         )
 
+    def accepts(self, value):
+        """Check the type of `value` without building an error"""
+        return isinstance(value, self.expected_type)
+
+    def invalid(self, value):
+        raise InvalidOption(_('{prepend}Expected type {expected_type} for option `{key}`, provided type is {value_type}.{append}'),
+                            value_type=type(value),
+                            expected_type=self.expected_type,
+                            prepend='{0} '.format(self.prepend) if self.prepend else '',
+                            append=' {0}'.format(self.append) if self.append else '')
+
     def __call__(self, value):
         if not isinstance(value, self.expected_type):
-            raise InvalidOption(_('{prepend}Expected type {expected_type} for option `{key}`, provided type is {value_type}.{append}'),
-                                value_type=type(value),
-                                expected_type=self.expected_type,
-                                prepend='{0} '.format(self.prepend) if self.prepend else '',
-                                append=' {0}'.format(self.append) if self.append else '')
+            self.invalid(value)
+
+        return True
+
+
+class IntegerValidator(TypeValidator):
+    """Validate the value is an integer, booleans are not accepted even though bool is a subclass of int
+    """
+
+    def __init__(self, prepend='', append=''):
+        super(IntegerValidator, self).__init__(int, prepend=prepend, append=append)
+
+    def accepts(self, value):
+        return type(value) is int or (isinstance(value, int) and not isinstance(value, bool))
+
+    def __call__(self, value):
+        # Exact type check first, it covers almost all values
+        if type(value) is not int and (not isinstance(value, int) or isinstance(value, bool)):
+            self.invalid(value)
+
+        return True
+
+
+class BooleanValidator(TypeValidator):
+    """Validate the value is a boolean
+    """
+
+    def __init__(self, prepend='', append=''):
+        super(BooleanValidator, self).__init__(bool, prepend=prepend, append=append)
+
+    def accepts(self, value):
+        return value is True or value is False
+
+    def __call__(self, value):
+        if value is not True and value is not False:
+            self.invalid(value)
+
+        return True
+
+
+class StringValidator(TypeValidator):
+    """Validate the value is a string
+    """
+
+    def __init__(self, prepend='', append=''):
+        super(StringValidator, self).__init__(str, prepend=prepend, append=append)
+
+    def accepts(self, value):
+        return type(value) is str or isinstance(value, str)
+
+    def __call__(self, value):
+        if type(value) is not str and not isinstance(value, str):
+            self.invalid(value)
 
         return True
 
@@ -128,6 +239,8 @@ class ListValidator(TypeValidator):
     """Validate the value is an instance of list and all items of it are I{expected_type}
     """
 
+    columnar = False
+
     def __init__(self, expected_type, allow_empty=True):
         self.allow_empty = allow_empty
 
@@ -153,7 +266,8 @@ class ListValidator(TypeValidator):
         if self.expected_type is not None:
             if inspect.isclass(self.expected_type) and issubclass(self.expected_type, OptionContainer):
                 # Expected type is an OptionContainer, lets try to construct it
-                value = [self.expected_type(**params) if not isinstance(params, self.expected_type) else params for params in value]
+                value = [build_nested(self.expected_type, params) if isinstance(params, dict) else
+                         params if isinstance(params, self.expected_type) else self.expected_type(**params) for params in value]
 
             elif isinstance(self.expected_type, Option):
                 # Expected type is an Option, lets use it to validate our value
@@ -181,6 +295,55 @@ class ListValidator(TypeValidator):
         return True
 
 
+class Rule(object):
+    """Container level validator which checks the values of multiple options together
+
+    Rules are declared in the `rules` attribute of an OptionContainer. Each rule declares the options it reads,
+    when a key is set only the rules which read it are evaluated again.
+
+    Examples:
+        >>> class Timeouts(OptionContainer):
+        >>>     props = [
+        >>>         Option.integer('min_timeout', default=1),
+        >>>         Option.integer('max_timeout', default=30),
+        >>>     ]
+        >>>
+        >>>     rules = [
+        >>>         Rule(['min_timeout', 'max_timeout'], lambda low, high: low <= high,
+        >>>              _('`min_timeout` must be less than or equal to `max_timeout`')),
+        >>>     ]
+
+    Args:
+        fields (list): Names of the options the rule reads
+        func (callable): Called with the values of `fields` (in the same order), should return False or raise
+            InvalidOption if the values are not valid
+        message (str): Error message used when `func` returns False, can use `{fields}` and the option names
+    """
+
+    def __init__(self, fields, func, message=None):
+        if isinstance(fields, str):
+            fields = [fields, ]
+
+        assert len(fields) > 0, 'Rules must read at least one option'
+        assert callable(func)
+
+        self.fields = tuple(fields)
+        self.func = func
+        self.message = message or _('Values of {fields} are not valid together')
+
+    def __str__(self):
+        return '<Rule fields={0}>'.format(', '.join(self.fields))
+
+    def __call__(self, *values):
+        if self.func(*values) is False:
+            params = dict(zip(self.fields, values))
+            params.update(key=', '.join(self.fields), fields=', '.join(self.fields))
+
+            raise InvalidOption(self.message, **params)
+
+        return True
+
+
 def clean_datetime(value):
     if value is not None:
         # Also support some more human readable variants of iso8601
@@ -193,13 +356,99 @@ def clean_datetime(value):
     return value
 
 
+def _is_plain_nested(option):
+    """Check if `option` is a nested option which only constructs its container from a dictionary"""
+    if not getattr(option, '_is_nested', False) or option.cache is not None or len(option.clean) != 1:
+        return False
+
+    return getattr(option.clean[0], 'container_cls', None) is option._container_cls
+
+
+def _has_plain_init(container_cls):
+    """Check if `container_cls` uses the constructor (and `set`) of OptionContainer, so it can be built by `build_nested`"""
+    from .container import OptionContainer
+
+    if container_cls._overrides_set:
+        return False
+
+    return six.get_unbound_function(container_cls.__init__) is six.get_unbound_function(OptionContainer.__init__)
+
+
+def _start_container(container_cls, data, parent, key):
+    inst = container_cls.__new__(container_cls)
+    inst._setup()
+
+    # Frames are [container, remaining items of data, parent frame, key in parent]
+    return [inst, iter(list(data.items())), parent, key]
+
+
+def build_nested(container_cls, data):
+    """Construct `container_cls(**data)` without recursing into nested containers
+
+    Nested dictionaries of plain nested options (see `_is_plain_nested`) are constructed with an explicit stack of
+    partially built containers, so the call depth is independent of the depth of the tree. Values are set in the same
+    order as recursive construction sets them (the values of each container in the order they are provided, each
+    nested container completely before the next value, then the defaults and rules), so the same error is reported.
+    Errors are prefixed with the path of the failing container like recursive construction does.
+
+    Note:
+        Containers which override `__init__` or `set` are constructed by calling them. Lists of containers are built per item
+        (see `ListValidator`), so every list on the path of a value adds a level of recursion.
+    """
+    if not _has_plain_init(container_cls):
+        return container_cls(**data)
+
+    frame = _start_container(container_cls, data, None, None)
+
+    try:
+        while True:
+            inst = frame[0]
+
+            for key, value in frame[1]:
+                definition = inst.definitions.get(key)
+
+                if isinstance(value, dict) and definition is not None and _is_plain_nested(definition) and \
+                        _has_plain_init(definition._container_cls):
+                    # Build the child first, the rest of the values of this container are set after it
+                    frame = _start_container(definition._container_cls, value, frame, key)
+                    break
+
+                inst._set(key, value, check_rules=False)
+
+            else:
+                inst._set_defaults()
+                inst._check_rules(inst._rules)
+
+                if frame[2] is None:
+                    return inst
+
+                child, frame = frame, frame[2]
+                frame[0]._set(child[3], child[0], check_rules=False)
+
+    except InvalidOption as e:
+        keys = []
+
+        while frame[2] is not None:
+            keys.append(frame[3])
+            frame = frame[2]
+
+        if not keys:
+            raise
+
+        keys.reverse()
+
+        inner = ''.join(['{0}:'.format(key) for key in keys[1:]])
+
+        raise InvalidOption('{key}:{inner}', inner=inner + str(e), key=keys[0])
+
+
 def clean_option_container(container_cls):
     from .container import OptionContainer
 
     def _clean_option_container(value):
         try:
             if isinstance(value, dict):
-                return container_cls(**value)
+                return build_nested(container_cls, value)
 
             elif isinstance(value, OptionContainer):
                 if not isinstance(value, container_cls):
@@ -220,6 +469,238 @@ def clean_option_container(container_cls):
     return _clean_option_container
 
 
+# Maximum number of distinct (non-string) values an interning option keeps
+INTERN_MAX_VALUES = 1024
+
+IMMUTABLE_TYPES = six.string_types + six.integer_types + (
+    six.binary_type, six.text_type, float, bool, type(None), frozenset,
+    datetime.datetime, datetime.date, datetime.time, datetime.timedelta, decimal.Decimal,
+)
+
+
+def is_immutable(value):
+    """Check if `value` is immutable (and thus can be shared between containers)"""
+    if isinstance(value, tuple):
+        return all([is_immutable(x) for x in value])
+
+    return isinstance(value, IMMUTABLE_TYPES)
+
+
+def freeze_value(value):
+    """Convert `value` into a hashable structural key
+
+    Dictionaries and lists are converted recursively, all other values must be hashable. The type of each
+    value is part of the key so values which are equal but of different types (e.g. `1` and `True`) don't collide.
+
+    Raises:
+        TypeError: If `value` contains unhashable values
+    """
+    if isinstance(value, dict):
+        return dict, frozenset([(key, freeze_value(inner)) for key, inner in value.items()])
+
+    elif isinstance(value, list):
+        return list, tuple([freeze_value(inner) for inner in value])
+
+    key = type(value), value
+    hash(key)
+
+    return key
+
+
+# Shared instances of immutable validators, see `shared_validator`. Validators are only kept alive by the options using
+# them, so validators of runtime generated container classes (and the classes themselves) can be garbage collected.
+_shared_validators = weakref.WeakValueDictionary()
+
+
+def shared_validator(validator_cls, *args):
+    """Get an instance of `validator_cls(*args)` which is shared with all other options using the same arguments
+
+    Validators are immutable once constructed, sharing them makes constructing options (and containers generated at
+    runtime) cheaper. Arguments which can't be hashed get a new instance.
+    """
+    try:
+        # Tuples (e.g. choices) are frozen item by item, so `(1, )` and `(True, )` don't collide
+        key = validator_cls, freeze_value([list(arg) if isinstance(arg, tuple) else arg for arg in args])
+
+    except TypeError:
+        return validator_cls(*args)
+
+    try:
+        return _shared_validators[key]
+
+    except KeyError:
+        return _shared_validators.setdefault(key, validator_cls(*args))
+
+
+def clear_shared_validators():
+    """Forget all shared validator instances, options keep using the instances they have"""
+    _shared_validators.clear()
+
+
+class ValidationCache(object):
+    """Bounded LRU cache for validation results of an Option
+
+    Attributes:
+        maxsize (int): Maximum number of cached results
+        hits (int): Number of lookups which returned a cached result
+        misses (int): Number of lookups which did not find a cached result
+        evictions (int): Number of results removed from the cache to make room for new ones
+    """
+
+    def __init__(self, maxsize=128):
+        assert maxsize > 0, 'maxsize must be positive'
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return '<ValidationCache maxsize={0}>'.format(self.maxsize)
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+
+            except KeyError:
+                self.misses += 1
+
+                return default
+
+            # Re-insert to mark as most recently used
+            self._data[key] = value
+            self.hits += 1
+
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """Get cache statistics
+
+        Returns:
+            dict: with keys hits, misses, evictions, size and maxsize
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+        }
+
+
+class AdaptiveOrder(object):
+    """Run the validators of an option in an order adapted to their observed cost and failure rate
+
+    Validators are sorted by `cost / failure rate` so cheap checks which often fail run first (type validators always
+    run first, other validators might not expect values of other types). The cost of each validator is measured on
+    every `sample_every`-th call and the order is updated every `reorder_every` calls.
+
+    Args:
+        validators (list): Validators in declaration order
+        strict (bool): If True and a validator fails, the validators are run again in declaration order so the error
+            is the same one the declared order would raise
+        sample_every (int): How often validator costs are measured
+        reorder_every (int): How often the order is updated
+    """
+
+    def __init__(self, validators, strict=True, sample_every=16, reorder_every=256):
+        self.declared = list(validators)
+        self.order = list(range(len(self.declared)))
+        self.strict = strict
+        self.sample_every = sample_every
+        self.reorder_every = reorder_every
+
+        self.calls = 0
+
+        # Per declared validator: runs, failures, sampled runs and sampled seconds
+        self.runs = [0] * len(self.declared)
+        self.failures = [0] * len(self.declared)
+        self.sampled = [0] * len(self.declared)
+        self.seconds = [0.0] * len(self.declared)
+
+    @property
+    def validators(self):
+        """Validators in the current order"""
+        return [self.declared[index] for index in self.order]
+
+    def _score(self, index):
+        if isinstance(self.declared[index], TypeValidator):
+            return -1.0
+
+        cost = self.seconds[index] / self.sampled[index] if self.sampled[index] else 0.0
+        failure_rate = (self.failures[index] + 1.0) / (self.runs[index] + 2.0)
+
+        return cost / failure_rate
+
+    def reorder(self):
+        self.order = sorted(range(len(self.declared)), key=self._score)
+
+    def run(self, value):
+        self.calls += 1
+        sample = self.calls % self.sample_every == 0
+
+        if self.calls % self.reorder_every == 0:
+            self.reorder()
+
+        for position, index in enumerate(self.order):
+            validator = self.declared[index]
+            self.runs[index] += 1
+
+            if sample:
+                started = metrics.clock()
+
+            try:
+                valid = validator(value)
+                error = None
+
+            except InvalidOption as e:
+                valid = False
+                error = e
+
+            if sample:
+                self.sampled[index] += 1
+                self.seconds[index] += metrics.clock() - started
+
+            if not valid:
+                self.failures[index] += 1
+
+                if self.strict:
+                    # Validators which already ran passed, only the skipped ones declared before this one can fail
+                    passed = set(self.order[:position])
+                    self.run_declared(value, [x for x in range(index) if x not in passed])
+
+                if error is not None:
+                    raise error
+
+                raise InvalidOption('Invalid value `{value}` for option `{key}`', value=value)
+
+    def run_declared(self, value, indexes=None):
+        """Run the validators (at `indexes`) in declaration order"""
+        for index in (range(len(self.declared)) if indexes is None else indexes):
+            if not self.declared[index](value):
+                raise InvalidOption('Invalid value `{value}` for option `{key}`', value=value)
+
+
 class Undefined(object):  # pragma: no cover
     """
     This class is used to represent no data being provided for a given option value.
@@ -246,10 +727,16 @@ class Option(object):
         choices: If provided adds ChoicesValidator to I{validators}
         expected_type: If provided adds TypeValidator to I{validators}. This can also be an instance of TypeValidator (or a
             subclass instance).
-        min_value: If provided adds MinValueValidator to I{validators}
-        max_value: If provided adds MaxValueValidator to I{validators}
+        min_value: If provided adds MinValueValidator to I{validators} (RangeValidator if max_value is also provided)
+        max_value: If provided adds MaxValueValidator to I{validators} (RangeValidator if min_value is also provided)
         none_to_default: If provided `None` will be treated as `Undefined` (cleaned to default)
         resolve_default: If provided default will be treated as a callable
+        cache: If provided, results of validating hashable values (and dictionaries for nested options) are memoized.
+            Can be the maximum number of cached results, `True` (for a default size) or an instance of ValidationCache.
+        intern: If True, validated values are canonicalized so equal values share a single object (see `intern_value`).
+            Enabled by default for options with choices.
+        adaptive: If True, validators are reordered based on their observed cost and failure rate (see AdaptiveOrder)
+        adaptive_strict: If True (default), errors of adaptive options are the same as with the declared order
     """
 
     def __init__(self, name, default, validators=None, clean=None, **kwargs):
@@ -284,9 +771,7 @@ class Option(object):
 
         if expected_type is not None:
             if not isinstance(expected_type, TypeValidator):
-                expected_type = TypeValidator(
-                    expected_type=expected_type, prepend=expected_type__prepend, append=expected_type__append
-                )
+                expected_type = shared_validator(TypeValidator, expected_type, expected_type__prepend, expected_type__append)
 
             self.validators.insert(0, expected_type)
 
@@ -297,26 +782,55 @@ class Option(object):
 
         # Handle choices kwarg
         choices = kwargs.get('choices', None)
+        self._choices_validator = None
         if choices is not None:
-            self.validators.insert(0, ChoicesValidator(choices=choices))
+            self._choices_validator = shared_validator(ChoicesValidator, choices)
+            self.validators.insert(0, self._choices_validator)
 
-        # Handle min_value kwarg
+        # Handle min_value and max_value kwargs
         min_value = kwargs.get('min_value', None)
-        if min_value is not None:
+        max_value = kwargs.get('max_value', None)
+
+        if min_value is not None and max_value is not None:
             self.validators.append(
-                MinValueValidator(min_value=min_value)
+                shared_validator(RangeValidator, min_value, max_value)
             )
 
-        # Handle max_value kwarg
-        max_value = kwargs.get('max_value', None)
-        if max_value is not None:
+        elif min_value is not None:
             self.validators.append(
-                MaxValueValidator(max_value=max_value)
+                shared_validator(MinValueValidator, min_value)
+            )
+
+        elif max_value is not None:
+            self.validators.append(
+                shared_validator(MaxValueValidator, max_value)
             )
 
         # Handle none_to_default kwarg
         self.none_to_default = kwargs.get('none_to_default', False)
 
+        # Handle resolve_default kwarg
+        self.resolve_default = kwargs.get('resolve_default', False)
+
+        # Handle cache kwarg
+        cache = kwargs.get('cache', None)
+        if cache is True:
+            cache = ValidationCache()
+
+        elif cache is not None and not isinstance(cache, ValidationCache):
+            cache = ValidationCache(maxsize=cache)
+
+        self.cache = cache
+
+        # Handle intern kwarg (enabled by default for options with choices)
+        self.intern = kwargs.get('intern', choices is not None)
+        self._interned = {}
+
+        # Handle adaptive kwarg
+        self.adaptive = None
+        if kwargs.get('adaptive', False):
+            self.adaptive = AdaptiveOrder(self.validators, strict=kwargs.get('adaptive_strict', True))
+
     def __str__(self):
         return "<{cls} {name}: default={default}, {typedef}>".format(
             cls=self.__class__.__name__,
@@ -344,11 +858,31 @@ class Option(object):
 
         # If value is not defined, return the default, else the value
         if isinstance(value, Undefined):
+            if self.resolve_default:
+                return self.default()
+
             return self.default
 
         else:
             return value
 
+    def is_async(self):
+        """Check if any of the cleaners or validators is a coroutine function (see `OptionContainer.avalidate`)"""
+        iscoroutinefunction = getattr(inspect, 'iscoroutinefunction', None)
+
+        if iscoroutinefunction is None:
+            return False
+
+        if any([iscoroutinefunction(fn) or iscoroutinefunction(getattr(fn, '__call__', None)) for fn in self.clean + self.validators]):
+            return True
+
+        # Nested containers and typed lists
+        container_cls = getattr(self, '_container_cls', None)
+        if container_cls is not None:
+            return container_cls._has_async
+
+        return any([x.expected_type.is_async() for x in self.validators if isinstance(x, ListValidator) and isinstance(x.expected_type, Option)])
+
     def _run_clean(self, value):
         """Run all I{clean} on the value"""
 
@@ -368,6 +902,9 @@ class Option(object):
             return True
 
     def _run_validators(self, value):
+        if self.adaptive is not None:
+            return self.adaptive.run(value)
+
         for validator in self.validators:
             if not validator(value):
                 raise InvalidOption('Invalid value `{value}` for option `{key}`', value=value)
@@ -378,21 +915,108 @@ class Option(object):
         Args:
             value: Value to validate
         """
+        registry = metrics.registry
+
+        if registry is not None:
+            return self._validate_observed(value, registry)
+
+        if self.cache is not None:
+            return self._validate_cached(value)
+
+        return self._validate(value)
+
+    def _validate_observed(self, value, registry):
+        try:
+            result = self._validate_cached(value) if self.cache is not None else self._validate(value)
+
+        except Exception as e:
+            registry.record_option(self.name, e)
+
+            raise
+
+        registry.record_option(self.name)
+
+        return result
+
+    def _validate_cached(self, value):
+        value = self._nvl(value)
+        is_nested = getattr(self, '_is_nested', False)
+
+        # Results for lists and dicts are mutable so they can't be shared, except for nested containers (see below)
+        if isinstance(value, list) or (isinstance(value, dict) and not is_nested):
+            return self._validate(value)
+
+        try:
+            key = freeze_value(value)
+
+        except TypeError:
+            # Unhashable values are not cached
+            return self._validate(value)
+
+        result = self.cache.get(key, Undefined)
+
+        if result is Undefined:
+            result = self._validate(value)
+
+            # Cached containers are shared by all parents, mark them so they are copied before modification
+            if is_nested:
+                setattr(result, '_shared', True)
+
+            self.cache.put(key, result)
+
+        return result
+
+    def _validate(self, value):
         value = self._nvl(value)
         value = self._run_clean(value)
 
         # Run validators on the cleaned value
         self._run_validators(value)
 
+        if self.intern:
+            return self.intern_value(value)
+
         # Return the cleaned value
         return value
 
+    def intern_value(self, value):
+        """Get the canonical object for a validated `value`
+
+        Choices are replaced with the choice objects, other strings are interned and other equal immutable values
+        are replaced with the first such value validated by this option (up to INTERN_MAX_VALUES distinct values).
+        """
+        if self._choices_validator is not None:
+            canonical = self._choices_validator.canonical(value)
+
+            if canonical is not value:
+                return canonical
+
+        if type(value) is str:
+            return intern(value)
+
+        if not is_immutable(value):
+            return value
+
+        key = (type(value), value)
+
+        try:
+            return self._interned[key]
+
+        except KeyError:
+            if len(self._interned) < INTERN_MAX_VALUES:
+                return self._interned.setdefault(key, value)
+
+            return value
+
+        except TypeError:
+            return value
+
     @classmethod
     def integer(cls, name, default, validators=None, clean=None, **kwargs):
         """Option of integer type
 
         Note:
-            This is a shorthand for: Option(..., expected_type=int)
+            This is a shorthand for: Option(..., expected_type=IntegerValidator(...))
 
         Args:
             name: see Option.__init__
@@ -401,7 +1025,8 @@ class Option(object):
             clean: see Option.__init__
             **kwargs: see Option.__init__
         """
-        kwargs.setdefault('expected_type', int)
+        if 'expected_type' not in kwargs:
+            kwargs['expected_type'] = shared_validator(IntegerValidator, kwargs.get('expected_type__prepend', ''), kwargs.get('expected_type__append', ''))
 
         return Option(name, default, validators=validators, clean=clean, **kwargs)
 
@@ -410,7 +1035,7 @@ class Option(object):
         """Option of boolean type
 
         Note:
-            This is a shorthand for: Option(..., expected_type=bool)
+            This is a shorthand for: Option(..., expected_type=BooleanValidator(...))
 
         Args:
             name: see Option.__init__
@@ -419,7 +1044,8 @@ class Option(object):
             clean: see Option.__init__
             **kwargs: see Option.__init__
         """
-        kwargs.setdefault('expected_type', bool)
+        if 'expected_type' not in kwargs:
+            kwargs['expected_type'] = shared_validator(BooleanValidator, kwargs.get('expected_type__prepend', ''), kwargs.get('expected_type__append', ''))
 
         return Option(name, default, validators=validators, clean=clean, **kwargs)
 
@@ -428,7 +1054,7 @@ class Option(object):
         """Option of string type
 
         Note:
-            This is a shorthand for: Option(..., expected_type=str)
+            This is a shorthand for: Option(..., expected_type=StringValidator(...))
 
         Args:
             name: see Option.__init__
@@ -437,7 +1063,8 @@ class Option(object):
             clean: see Option.__init__
             **kwargs: see Option.__init__
         """
-        kwargs.setdefault('expected_type', str)
+        if 'expected_type' not in kwargs:
+            kwargs['expected_type'] = shared_validator(StringValidator, kwargs.get('expected_type__prepend', ''), kwargs.get('expected_type__append', ''))
 
         return Option(name, default, validators=validators, clean=clean, **kwargs)
 
@@ -477,7 +1104,7 @@ class Option(object):
         return Option(name, default, validators=validators, clean=clean, **kwargs)
 
     @classmethod
-    def list(cls, name, default, validators=None, clean=None, inner_type=None, allow_empty=True, **kwargs):
+    def list(cls, name, default, validators=None, clean=None, inner_type=None, allow_empty=True, columnar=False, **kwargs):
         """Option of list type
 
         Note:
@@ -486,6 +1113,8 @@ class Option(object):
         Args:
             inner_type (any): Can be used to construct a typed list
             allow_empty (Optional[bool]): If False ListValidator will also check that the list is not empty. Defaults to **True**
+            columnar (Optional[bool]): If True and inner_type is an OptionContainer, the list is validated column-wise and stored
+                as `tg_option_container.columns.ContainerColumns` (one column per option, items are read-only row proxies).
 
             name: see Option.__init__
             default: see Option.__init__
@@ -499,13 +1128,24 @@ class Option(object):
         if callable(default):
             kwargs.setdefault('resolve_default', True)
 
+        is_container = inspect.isclass(inner_type) and issubclass(inner_type, OptionContainer)
+
+        if columnar:
+            from .columns import ColumnarListValidator
+
+            assert is_container, 'Columnar lists require an OptionContainer inner_type'
+
+            kwargs.setdefault('expected_type', ColumnarListValidator(inner_type, allow_empty))
+
         kwargs.setdefault('expected_type', ListValidator(inner_type, allow_empty))
 
         res = Option(name, default, validators=validators, clean=clean, **kwargs)
 
-        if inspect.isclass(inner_type) and issubclass(inner_type, OptionContainer):
+        if is_container:
             # This is for pretty printing and as_dict
             setattr(res, '_list_of_containers', True)
+            setattr(res, '_container_cls', inner_type)
+            setattr(res, '_columnar', columnar)
 
         return res
 
@@ -538,5 +1178,6 @@ class Option(object):
         opt = Option(name, {}, validators=validators, clean=clean, **kwargs)
 
         setattr(opt, '_is_nested', True)
+        setattr(opt, '_container_cls', container_cls)
 
         return opt